@@ -113,6 +113,19 @@ DATABASES = {
     }
 }
 
+# 商圏ダッシュボードなどの集計結果は、取得バッチ（別プロセス）からの無効化が
+# Webプロセスに届くようにファイルキャッシュで共有する
+CACHES = {
+    "default": {
+        "BACKEND": (
+            "django.core.cache.backends.locmem.LocMemCache"
+            if IS_TESTING
+            else "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": str(BASE_DIR / "cache"),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
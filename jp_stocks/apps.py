@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class JpStocksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "jp_stocks"
+
+    def ready(self):
+        from jp_stocks.signals import connect_signals
+
+        connect_signals()
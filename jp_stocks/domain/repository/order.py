@@ -1,6 +1,14 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Sum
 
-from jp_stocks.models import Order
+from jp_stocks.domain.valueobject.order import Fill
+from jp_stocks.models import Order, Trade
+
+BULK_BATCH_SIZE = 500
+VERSION_CACHE_KEY = "jp_stocks:order_book_version"
 
 
 class OrderRepository:
@@ -14,9 +22,9 @@ class OrderRepository:
         売り注文を価格帯ごとに集計して取得 (昇順にソート)
         """
         return (
-            Order.objects.filter(side="sell")
+            Order.objects.filter(side="sell", remaining_quantity__gt=0)
             .values("price")
-            .annotate(total_quantity=Sum("quantity"))
+            .annotate(total_quantity=Sum("remaining_quantity"))
             .order_by("price")
         )
 
@@ -26,12 +34,36 @@ class OrderRepository:
         買い注文を価格帯ごとに集計して取得 (降順にソート)
         """
         return (
-            Order.objects.filter(side="buy")
+            Order.objects.filter(side="buy", remaining_quantity__gt=0)
             .values("price")
-            .annotate(total_quantity=Sum("quantity"))
+            .annotate(total_quantity=Sum("remaining_quantity"))
             .order_by("price")
         )
 
+    @staticmethod
+    def get_version() -> str:
+        """
+        板の版 (注文・約定が変わるたびに bump_version で変わる印) を返す。
+        板のスナップショットがDBと一致しているかの判定に使う。キャッシュを読むだけでDBには問い合わせない。
+        キャッシュから消えていたら新しい版を作るので、スナップショットは作り直しになる
+        """
+        return cache.get_or_set(VERSION_CACHE_KEY, lambda: uuid4().hex, timeout=None)
+
+    @staticmethod
+    def bump_version() -> str:
+        """
+        板の版を新しくする。書き込み中のトランザクションがコミットされた時点で反映するので、
+        他のプロセスがコミット前のDBから板を作り直して新しい版を記録することはない。
+
+        Returns:
+            str: コミット後の版
+        """
+        version = uuid4().hex
+        transaction.on_commit(
+            lambda: cache.set(VERSION_CACHE_KEY, version, timeout=None)
+        )
+        return version
+
     @staticmethod
     def get_all_orders():
         """
@@ -40,3 +72,48 @@ class OrderRepository:
         return Order.objects.values("side", "price", "quantity").order_by(
             "price", "-side"
         )
+
+    @staticmethod
+    def get_resting_orders():
+        """
+        約定していない数量が残っている注文を、時間優先の順 (受付順) で取得
+
+        約定させる間に別の約定で残数量が変わらないよう、行をロックする (トランザクション内で呼ぶ)
+        """
+        return (
+            Order.objects.select_for_update()
+            .filter(remaining_quantity__gt=0)
+            .values("id", "side", "price", "remaining_quantity")
+            .order_by("created_at", "id")
+        )
+
+    @staticmethod
+    def save_fills(fills: list[Fill], remaining_by_order_id: dict[int, int]) -> None:
+        """
+        約定と、約定で変わった注文の残数量をまとめて保存する
+
+        Args:
+            fills: 約定の一覧
+            remaining_by_order_id: 注文ID → 約定後の残数量 (変わった注文のみ)
+        """
+        # bulk_update は主キーと更新列しか使わないので、注文を読み直さずに済む
+        orders = [
+            Order(id=order_id, remaining_quantity=remaining)
+            for order_id, remaining in remaining_by_order_id.items()
+        ]
+        with transaction.atomic():
+            Trade.objects.bulk_create(
+                [
+                    Trade(
+                        buy_order_id=fill.buy_order_id,
+                        sell_order_id=fill.sell_order_id,
+                        price=fill.price,
+                        quantity=fill.quantity,
+                    )
+                    for fill in fills
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+            Order.objects.bulk_update(
+                orders, ["remaining_quantity"], batch_size=BULK_BATCH_SIZE
+            )
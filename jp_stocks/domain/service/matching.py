@@ -0,0 +1,172 @@
+import heapq
+from dataclasses import dataclass
+from itertools import count
+
+from django.db import transaction
+
+from jp_stocks.domain.repository.order import OrderRepository
+from jp_stocks.domain.service.order import OrderBookService
+from jp_stocks.domain.valueobject.order import Fill
+from jp_stocks.models import Order
+
+
+@dataclass
+class RestingOrder:
+    """板に並んでいる注文。remaining は約定のたびに減る"""
+
+    order_id: int
+    side: str
+    price: int
+    remaining: int
+
+
+class OrderBook:
+    """
+    価格優先・時間優先の板。
+
+    買いは (-価格, 受付順)、売りは (価格, 受付順) をキーにしたヒープで持つので、
+    最良気配の参照は O(1)、注文の追加と約定済み注文の取り除きは O(log n) で済む。
+    """
+
+    def __init__(self):
+        self._bids: list[tuple[int, int, RestingOrder]] = []
+        self._asks: list[tuple[int, int, RestingOrder]] = []
+        self._sequence = count()
+        # 注文ID → 板に並んでいる注文 (全量約定したら取り除く)
+        self._resting: dict[int, RestingOrder] = {}
+
+    def add(self, order_id: int, side: str, price: int, quantity: int) -> None:
+        """
+        約定させずに板へ並べる (保存済みの注文から板を作り直すとき用)
+        """
+        resting = RestingOrder(order_id, side, price, quantity)
+        self._resting[order_id] = resting
+        if side == "buy":
+            heapq.heappush(self._bids, (-price, next(self._sequence), resting))
+        else:
+            heapq.heappush(self._asks, (price, next(self._sequence), resting))
+
+    def submit(self, order_id: int, side: str, price: int, quantity: int) -> list[Fill]:
+        """
+        注文を受け付け、反対側の最良気配から順に約定させる。残った数量は板に並べる。
+
+        約定価格は板に先に並んでいた注文の価格。同じ価格なら先に並んだ注文から約定する。
+
+        Returns:
+            list[Fill]: この注文で発生した約定 (約定順)
+        """
+        fills = []
+        if side == "buy":
+            asks = self._asks
+            while quantity and asks and asks[0][0] <= price:
+                resting = asks[0][2]
+                traded = min(quantity, resting.remaining)
+                fills.append(Fill(order_id, resting.order_id, resting.price, traded))
+                quantity -= traded
+                resting.remaining -= traded
+                if not resting.remaining:
+                    heapq.heappop(asks)
+                    del self._resting[resting.order_id]
+        else:
+            bids = self._bids
+            while quantity and bids and -bids[0][0] >= price:
+                resting = bids[0][2]
+                traded = min(quantity, resting.remaining)
+                fills.append(Fill(resting.order_id, order_id, resting.price, traded))
+                quantity -= traded
+                resting.remaining -= traded
+                if not resting.remaining:
+                    heapq.heappop(bids)
+                    del self._resting[resting.order_id]
+
+        if quantity:
+            self.add(order_id, side, price, quantity)
+        return fills
+
+    def best_bid(self) -> int | None:
+        return -self._bids[0][0] if self._bids else None
+
+    def best_ask(self) -> int | None:
+        return self._asks[0][0] if self._asks else None
+
+    def remaining(self, order_id: int) -> int:
+        """注文の残数量 (板に無ければ全量約定済みとして 0)"""
+        resting = self._resting.get(order_id)
+        return resting.remaining if resting else 0
+
+
+class MatchingEngineService:
+    @staticmethod
+    def load_order_book(exclude_ids: set[int] | None = None) -> OrderBook:
+        """
+        残数量のある保存済み注文から、受付順を保ったまま板を作る
+        (板に並べる注文をロックするので、トランザクション内で呼ぶ)
+
+        Args:
+            exclude_ids: 板に並べない注文ID (これから約定させる新規注文)
+        """
+        exclude_ids = exclude_ids or set()
+        order_book = OrderBook()
+        for order in OrderRepository.get_resting_orders():
+            if order["id"] in exclude_ids:
+                continue
+            order_book.add(
+                order["id"], order["side"], order["price"], order["remaining_quantity"]
+            )
+        return order_book
+
+    @staticmethod
+    def execute(orders: list[Order], order_book: OrderBook | None = None) -> list[Fill]:
+        """
+        保存済みの新規注文を受付順に約定させ、約定と残数量をまとめて保存する
+
+        Args:
+            orders: 新規注文 (保存済みで、まだ板に並んでいないもの。
+                他の約定に板の注文として読まれないよう、同じトランザクション内で保存しておく)
+            order_book: 使う板。省略時は保存済みの注文 (orders を除く) から作る
+
+        Returns:
+            list[Fill]: 発生した約定 (約定順)
+        """
+        fills = []
+        # 板のスナップショット (OrderBookService) に反映する (売買, 価格, 数量の増減)
+        deltas = []
+        opposite = {"buy": "sell", "sell": "buy"}
+        # 板の読み込みから保存までを1つのトランザクションにし、並んでいる注文をロックしておく
+        # (別の約定が同じ注文の残数量を読んで二重に約定させないため)
+        with transaction.atomic():
+            new_order_ids = {order.id for order in orders}
+            # 書き込み前の版。板のスナップショットがこの版のものなら差分で進められる
+            # (新規注文の保存による版の更新は、同じトランザクションのコミット時まで反映されない)
+            previous_version = OrderRepository.get_version()
+            if order_book is None:
+                order_book = MatchingEngineService.load_order_book(new_order_ids)
+
+            for order in orders:
+                order_fills = order_book.submit(
+                    order.id, order.side, order.price, order.quantity
+                )
+                for fill in order_fills:
+                    deltas.append((opposite[order.side], fill.price, -fill.quantity))
+                remaining = order_book.remaining(order.id)
+                if remaining:
+                    deltas.append((order.side, order.price, remaining))
+                fills.extend(order_fills)
+
+            if fills:
+                # 新規注文と約定した注文の残数量をまとめて保存する
+                order_ids = set(new_order_ids)
+                for fill in fills:
+                    order_ids.add(fill.buy_order_id)
+                    order_ids.add(fill.sell_order_id)
+                OrderRepository.save_fills(
+                    fills,
+                    {
+                        order_id: order_book.remaining(order_id)
+                        for order_id in order_ids
+                    },
+                )
+            version = OrderRepository.bump_version()
+
+        OrderBookService.apply_changes(previous_version, version, deltas)
+        return fills
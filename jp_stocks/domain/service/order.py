@@ -1,101 +1,111 @@
+import threading
+
 from jp_stocks.domain.repository.order import OrderRepository
 from jp_stocks.domain.valueobject.order import OrderPair
 
 
 class OrderBookService:
-    @staticmethod
-    def calculate_order_book():
-        # 集計済みの売り注文と買い注文を取得
-        sell_orders = OrderRepository.get_sell_orders_grouped()
-        buy_orders = OrderRepository.get_buy_orders_grouped()
+    """
+    価格帯ごとの残数量 (板) をプロセス内に持ち、約定エンジンで注文を約定させるたびに差分で更新する。
 
-        # 結果を格納するリスト
-        result_list = []
+    板は初回の参照時にDBから作る。板の版 (OrderRepository.get_version) が変わっていたら、
+    別プロセスや管理画面での更新を取り込むために作り直す。版は約定エンジンと、Order・Trade の
+    保存・削除のシグナルで更新される (queryset.update など、シグナルを出さない一括更新をしたら
+    OrderRepository.bump_version を呼ぶ)。
 
-        # 売り注文と買い注文のポインタ
-        sell_pointer = 0
-        buy_pointer = 0
+    板はクラス変数でプロセス内のスレッドが共有するので、読み書きは _lock の中で行う。
+    """
 
-        # 売り注文と買い注文を順番に処理
-        while sell_pointer < len(sell_orders) and buy_pointer < len(buy_orders):
-            sell_order = sell_orders[sell_pointer]
-            buy_order = buy_orders[buy_pointer]
+    _lock = threading.RLock()
 
-            sell_price = sell_order["price"]
-            buy_price = buy_order["price"]
+    # 売買 → {価格: 残数量}
+    _levels: dict[str, dict[int, int]] | None = None
+    # _levels を作った (最後に差分を反映した) 時点の板の版
+    _version: str | None = None
+    # calculate_order_book の結果。板が変わるまで使い回す
+    _snapshot: list[OrderPair] | None = None
 
-            if sell_price == buy_price:
-                # 売りと買いの価格が一致する場合
-                sell_quantity: int = sell_order["total_quantity"]
-                buy_quantity: int = buy_order["total_quantity"]
+    @classmethod
+    def calculate_order_book(cls) -> list[OrderPair]:
+        """
+        価格の昇順に、同じ価格の売りと買いを相殺した残数量を返す
+        """
+        version = OrderRepository.get_version()
+        with cls._lock:
+            if cls._levels is None or cls._version != version:
+                cls._rebuild(version)
+            if cls._snapshot is None:
+                cls._snapshot = cls._net_levels(cls._levels["sell"], cls._levels["buy"])
+            return list(cls._snapshot)
 
-                if sell_quantity > buy_quantity:  # 売りが多い場合
-                    result_list.append(
-                        OrderPair(
-                            price=sell_price,
-                            sell_quantity=sell_quantity - buy_quantity,
-                            buy_quantity=0,
-                        )
-                    )
-                elif buy_quantity > sell_quantity:  # 買いが多い場合
-                    result_list.append(
-                        OrderPair(
-                            price=buy_price,
-                            sell_quantity=0,
-                            buy_quantity=buy_quantity - sell_quantity,
-                        )
-                    )
-                else:  # 完全に一致する場合
-                    result_list.append(
-                        OrderPair(
-                            price=sell_price,
-                            sell_quantity=0,
-                            buy_quantity=0,
-                        )
-                    )
-                sell_pointer += 1
-                buy_pointer += 1
+    @classmethod
+    def apply_changes(
+        cls,
+        previous_version: str,
+        version: str,
+        deltas: list[tuple[str, int, int]],
+    ) -> None:
+        """
+        約定エンジンの書き込みを板に差分で反映する。板が未作成なら何もしない。
 
-            elif sell_price < buy_price:  # 売り価格が買い価格より低い場合
-                result_list.append(
-                    OrderPair(
-                        price=sell_price,
-                        sell_quantity=sell_order["total_quantity"],
-                        buy_quantity=0,
-                    )
-                )
-                sell_pointer += 1
-            else:  # 売り価格が買い価格より高い場合
-                result_list.append(
-                    OrderPair(
-                        price=buy_price,
-                        sell_quantity=0,
-                        buy_quantity=buy_order["total_quantity"],
-                    )
-                )
-                buy_pointer += 1
+        板が書き込み前の版 (previous_version) のものなら、差分 (売買, 価格, 数量の増減。
+        板に並んだ注文は +数量、約定は -数量) を反映して書き込み後の版 (version) に進める。
+        それ以外 (間に別の更新があった) なら板を捨て、次の参照でDBから作り直す
+        """
+        with cls._lock:
+            if cls._levels is None:
+                return
+            if cls._version != previous_version:
+                cls.invalidate()
+                return
+            for side, price, delta in deltas:
+                level = cls._levels[side]
+                quantity = level.get(price, 0) + delta
+                if quantity > 0:
+                    level[price] = quantity
+                else:
+                    level.pop(price, None)
+            cls._version = version
+            cls._snapshot = None
 
-        # 残りの売り注文を結果に追加
-        for i in range(sell_pointer, len(sell_orders)):
-            sell_order = sell_orders[i]
-            result_list.append(
-                OrderPair(
-                    price=sell_order["price"],
-                    sell_quantity=sell_order["total_quantity"],
-                    buy_quantity=0,
-                )
-            )
-        # 残りの買い注文を結果に追加
-        for i in range(buy_pointer, len(buy_orders)):
-            buy_order = buy_orders[i]
+    @classmethod
+    def invalidate(cls) -> None:
+        """板を捨て、次の参照でDBから作り直す"""
+        with cls._lock:
+            cls._levels = None
+            cls._version = None
+            cls._snapshot = None
+
+    @classmethod
+    def _rebuild(cls, version: str) -> None:
+        cls._levels = {
+            "sell": {
+                order["price"]: order["total_quantity"]
+                for order in OrderRepository.get_sell_orders_grouped()
+            },
+            "buy": {
+                order["price"]: order["total_quantity"]
+                for order in OrderRepository.get_buy_orders_grouped()
+            },
+        }
+        cls._version = version
+        cls._snapshot = None
+
+    @staticmethod
+    def _net_levels(sells: dict[int, int], buys: dict[int, int]) -> list[OrderPair]:
+        """
+        同じ価格に売りと買いがあれば多い側の差分だけを残す (完全に一致すれば両方0)
+        """
+        result_list = []
+        for price in sorted(sells.keys() | buys.keys()):
+            sell_quantity = sells.get(price, 0)
+            buy_quantity = buys.get(price, 0)
+            traded = min(sell_quantity, buy_quantity)
             result_list.append(
                 OrderPair(
-                    price=buy_order["price"],
-                    sell_quantity=0,
-                    buy_quantity=buy_order["total_quantity"],
+                    price=price,
+                    sell_quantity=sell_quantity - traded,
+                    buy_quantity=buy_quantity - traded,
                 )
             )
-
-        # 価格順にソートして結果を返す
-        result_list.sort(key=lambda x: x.price)  # リスト内の価格順を昇順にソート
         return result_list
@@ -6,3 +6,13 @@ class OrderPair:
     price: int
     sell_quantity: int = 0
     buy_quantity: int = 0
+
+
+@dataclass
+class Fill:
+    """1回の約定。price は板に先に並んでいた注文の価格"""
+
+    buy_order_id: int
+    sell_order_id: int
+    price: int
+    quantity: int
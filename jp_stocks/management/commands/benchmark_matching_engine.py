@@ -0,0 +1,98 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jp_stocks.domain.service.matching import MatchingEngineService, OrderBook
+from jp_stocks.models import Order
+
+
+class Command(BaseCommand):
+    """
+    約定エンジンのベンチマーク
+
+    合成した注文列 (中心価格のまわりに正規分布で指値を置く) を OrderBook に流し、
+    1秒あたりの注文処理数と約定数を計測する (DBは使わない)。
+    --persist を指定すると、同じ注文列の先頭を保存して MatchingEngineService.execute で
+    約定させ、約定の一括保存まで含めた時間も計測する (保存はロールバックするのでデータは残らない)。
+
+    使用方法:
+        python manage.py benchmark_matching_engine --orders 200000 --persist 2000
+    """
+
+    help = "Benchmark the matching engine on a synthetic order stream"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200000, help="注文数")
+        parser.add_argument("--repeat", type=int, default=3, help="計測回数")
+        parser.add_argument(
+            "--persist",
+            type=int,
+            default=0,
+            help="DBへの保存まで含めて計測する注文数 (0 なら計測しない)",
+        )
+
+    def handle(self, *args, **options):
+        orders = self._create_orders(options["orders"])
+
+        best = None
+        for _ in range(options["repeat"]):
+            order_book = OrderBook()
+            started = time.perf_counter()
+            fill_count = 0
+            for order_id, side, price, quantity in orders:
+                fill_count += len(order_book.submit(order_id, side, price, quantity))
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        self.stdout.write(
+            f"orders={len(orders):,}, fills={fill_count:,}, "
+            f"repeat={options['repeat']} (best of)"
+        )
+        self.stdout.write(f"  in-memory : {best * 1000:.1f} ms")
+        if best > 0:
+            self.stdout.write(f"  throughput: {len(orders) / best:,.0f} orders/sec")
+
+        if options["persist"]:
+            self._benchmark_persist(orders[: options["persist"]])
+
+    def _benchmark_persist(self, orders: list[tuple[int, str, int, int]]):
+        with transaction.atomic():
+            saved = Order.objects.bulk_create(
+                [
+                    Order(
+                        side=side,
+                        price=price,
+                        quantity=quantity,
+                        remaining_quantity=quantity,
+                    )
+                    for _, side, price, quantity in orders
+                ]
+            )
+            # MySQL では bulk_create で主キーが返らないので引き直す
+            if saved and saved[0].id is None:
+                saved = list(Order.objects.order_by("-id")[: len(saved)])[::-1]
+
+            started = time.perf_counter()
+            fills = MatchingEngineService.execute(saved, OrderBook())
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"  persist   : {elapsed * 1000:.1f} ms "
+            f"({len(orders):,} orders, {len(fills):,} fills, rolled back)"
+        )
+
+    @staticmethod
+    def _create_orders(count: int) -> list[tuple[int, str, int, int]]:
+        """(注文ID, 売買, 価格, 数量) の注文列。買いと売りが半々で、中心価格付近で交差する"""
+        rng = random.Random(0)
+        mid_price = 1000
+        orders = []
+        for order_id in range(1, count + 1):
+            side = "buy" if rng.random() < 0.5 else "sell"
+            offset = round(rng.gauss(0, 10))
+            price = mid_price - offset if side == "buy" else mid_price + offset
+            orders.append((order_id, side, max(price, 1), rng.randint(1, 100)))
+        return orders
@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-19 15:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_remaining_quantity(apps, schema_editor):
+    Order = apps.get_model("jp_stocks", "Order")
+    Order.objects.update(remaining_quantity=F("quantity"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jp_stocks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="remaining_quantity",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_remaining_quantity, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name="Trade",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("price", models.PositiveIntegerField()),
+                ("quantity", models.PositiveIntegerField()),
+                ("executed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "buy_order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="buy_trades",
+                        to="jp_stocks.order",
+                    ),
+                ),
+                (
+                    "sell_order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sell_trades",
+                        to="jp_stocks.order",
+                    ),
+                ),
+            ],
+        ),
+    ]
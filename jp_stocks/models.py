@@ -8,6 +8,7 @@ class Order(models.Model):
         - side: 売買の区分 ('buy' または 'sell')。
         - price: 注文の価格。
         - quantity: 初期注文の数量。
+        - remaining_quantity: 約定していない残りの数量 (未指定なら quantity)。
         - created_at: 注文が作成された日時 (自動登録)。
     """
 
@@ -19,7 +20,38 @@ class Order(models.Model):
     side = models.CharField(max_length=4, choices=SIDE_CHOICES)
     price = models.PositiveIntegerField()
     quantity = models.PositiveIntegerField()
+    remaining_quantity = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.side} {self.quantity} @ {self.price}"
+
+    def save(self, *args, **kwargs):
+        if self.remaining_quantity is None:
+            self.remaining_quantity = self.quantity
+        super().save(*args, **kwargs)
+
+
+class Trade(models.Model):
+    """
+    約定のデータを管理するモデル。
+    フィールド:
+        - buy_order: 買い注文。
+        - sell_order: 売り注文。
+        - price: 約定価格 (板に先に並んでいた注文の価格)。
+        - quantity: 約定数量。
+        - executed_at: 約定した日時 (自動登録)。
+    """
+
+    buy_order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="buy_trades"
+    )
+    sell_order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="sell_trades"
+    )
+    price = models.PositiveIntegerField()
+    quantity = models.PositiveIntegerField()
+    executed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.quantity} @ {self.price}"
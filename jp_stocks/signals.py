@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+
+from jp_stocks.domain.repository.order import OrderRepository
+from jp_stocks.models import Order, Trade
+
+
+def bump_order_book_version(sender, **kwargs) -> None:
+    """
+    注文・約定が保存・削除されたら板の版を更新し、板のスナップショットを作り直させます。
+    """
+    OrderRepository.bump_version()
+
+
+def connect_signals() -> None:
+    """
+    フォームや管理画面・loaddata から保存される注文・約定にレシーバを登録します。
+    """
+    for model in (Order, Trade):
+        for signal in (post_save, post_delete):
+            signal.connect(bump_order_book_version, sender=model)
@@ -1,16 +1,19 @@
 from django.test import TestCase
 
+from jp_stocks.domain.repository.order import OrderRepository
+from jp_stocks.domain.service.matching import MatchingEngineService, OrderBook
 from jp_stocks.domain.service.order import OrderBookService
-from jp_stocks.domain.valueobject.order import OrderPair
-from jp_stocks.models import Order
+from jp_stocks.domain.valueobject.order import Fill, OrderPair
+from jp_stocks.models import Order, Trade
 
 
 class OrderBookServiceTest(TestCase):
     def setUp(self):
         """
-        テスト実行時にデータベースのOrderテーブルを初期化。
+        テスト実行時にデータベースのOrderテーブルと板のスナップショットを初期化。
         """
         Order.objects.all().delete()
+        OrderBookService.invalidate()
 
     def test_complete_cancellation(self):
         """
@@ -94,3 +97,259 @@ class OrderBookServiceTest(TestCase):
             OrderPair(price=105, sell_quantity=10, buy_quantity=0),
         ]
         self.assertEqual(result, expected_result)
+
+
+class OrderBookMatchingTest(TestCase):
+    def test_price_priority(self):
+        """
+        シナリオ:
+        - 入力: 102円・100円・101円の売り注文が並んだ板と、101円で25株の買い注文
+        - 処理: 買い注文を OrderBook.submit で約定させる
+        - 期待値: 安い売り注文から順に約定し、約定価格は板に並んでいた注文の価格になる。
+          約定しなかった5株は買いの最良気配として板に残る
+        """
+        # Given
+        order_book = OrderBook()
+        order_book.submit(1, "sell", 102, 10)
+        order_book.submit(2, "sell", 100, 10)
+        order_book.submit(3, "sell", 101, 10)
+
+        # When
+        fills = order_book.submit(4, "buy", 101, 25)
+
+        # Then
+        self.assertEqual([Fill(4, 2, 100, 10), Fill(4, 3, 101, 10)], fills)
+        self.assertEqual(101, order_book.best_bid())
+        self.assertEqual(102, order_book.best_ask())
+        self.assertEqual(5, order_book.remaining(4))
+
+    def test_time_priority(self):
+        """
+        シナリオ:
+        - 入力: 同じ100円で先に並んだ買い注文1と後に並んだ買い注文2、99円で15株の売り注文
+        - 処理: 売り注文を OrderBook.submit で約定させる
+        - 期待値: 先に並んだ注文1が全量約定し、注文2は5株だけ約定して残りが板に残る
+        """
+        # Given
+        order_book = OrderBook()
+        order_book.submit(1, "buy", 100, 10)
+        order_book.submit(2, "buy", 100, 10)
+
+        # When
+        fills = order_book.submit(3, "sell", 99, 15)
+
+        # Then
+        self.assertEqual([Fill(1, 3, 100, 10), Fill(2, 3, 100, 5)], fills)
+        self.assertEqual(0, order_book.remaining(1))
+        self.assertEqual(5, order_book.remaining(2))
+        self.assertIsNone(order_book.best_ask())
+
+    def test_no_cross(self):
+        """
+        シナリオ:
+        - 入力: 99円の買い注文と100円の売り注文
+        - 処理: 2つの注文を OrderBook.submit で順に受け付ける
+        - 期待値: 価格が交差しないので約定せず、両側の最良気配として並ぶ
+        """
+        # Given
+        order_book = OrderBook()
+
+        # When
+        buy_fills = order_book.submit(1, "buy", 99, 10)
+        sell_fills = order_book.submit(2, "sell", 100, 10)
+
+        # Then
+        self.assertEqual([], buy_fills)
+        self.assertEqual([], sell_fills)
+        self.assertEqual((99, 100), (order_book.best_bid(), order_book.best_ask()))
+
+
+class MatchingEngineServiceTest(TestCase):
+    def setUp(self):
+        OrderBookService.invalidate()
+
+    def test_execute_persists_fills_and_remaining(self):
+        """
+        シナリオ:
+        - 入力: 100円で30株ずつ並んだ2つの売り注文と、101円で40株の新規の買い注文
+        - 処理: MatchingEngineService.execute で新規注文を約定させる
+        - 期待値: 先に並んだ売り注文から約定し、約定と残数量がDBに保存される。
+          板のスナップショットには約定しなかった残りだけが並ぶ
+        """
+        # Given
+        first = Order.objects.create(side="sell", price=100, quantity=30)
+        second = Order.objects.create(side="sell", price=100, quantity=30)
+        new_order = Order.objects.create(side="buy", price=101, quantity=40)
+
+        # When
+        fills = MatchingEngineService.execute([new_order])
+
+        # Then
+        self.assertEqual(
+            [
+                Fill(new_order.id, first.id, 100, 30),
+                Fill(new_order.id, second.id, 100, 10),
+            ],
+            fills,
+        )
+        self.assertEqual(
+            [(new_order.id, first.id, 100, 30), (new_order.id, second.id, 100, 10)],
+            list(
+                Trade.objects.order_by("id").values_list(
+                    "buy_order_id", "sell_order_id", "price", "quantity"
+                )
+            ),
+        )
+        remaining = dict(Order.objects.values_list("id", "remaining_quantity"))
+        self.assertEqual({first.id: 0, second.id: 20, new_order.id: 0}, remaining)
+
+        # 板には約定しなかった残りだけが並ぶ
+        self.assertEqual(
+            [OrderPair(price=100, sell_quantity=20, buy_quantity=0)],
+            OrderBookService.calculate_order_book(),
+        )
+
+
+class OrderBookSnapshotTest(TestCase):
+    def setUp(self):
+        OrderBookService.invalidate()
+        Order.objects.create(side="sell", price=101, quantity=50)
+        Order.objects.create(side="buy", price=99, quantity=30)
+
+    def test_snapshot_served_from_memory(self):
+        """
+        シナリオ:
+        - 入力: 一度作った板のスナップショット
+        - 処理: DBを変えずにもう一度 calculate_order_book を呼ぶ
+        - 期待値: 版の確認 (キャッシュの参照) だけで、DBに問い合わせずに同じ結果を返す
+        """
+        # Given
+        expected = OrderBookService.calculate_order_book()
+
+        # When
+        with self.assertNumQueries(0):
+            result = OrderBookService.calculate_order_book()
+
+        # Then
+        self.assertEqual(expected, result)
+
+    def test_snapshot_updated_incrementally_on_execute(self):
+        """
+        シナリオ:
+        - 入力: 作成済みの板のスナップショットと、約定する注文を含む3つの新規注文
+        - 処理: 画面と同じく1つのトランザクションで新規注文を保存し、
+          MatchingEngineService.execute で約定させてコミットする
+        - 期待値: 差分で板に反映され、次の参照はDBに問い合わせず、DBから作り直した板と一致する
+        """
+        # Given
+        OrderBookService.calculate_order_book()
+
+        # When
+        with self.captureOnCommitCallbacks(execute=True):
+            orders = [
+                Order.objects.create(side="buy", price=101, quantity=20),
+                Order.objects.create(side="sell", price=98, quantity=40),
+                Order.objects.create(side="buy", price=100, quantity=5),
+            ]
+            MatchingEngineService.execute(orders)
+
+        # Then
+        with self.assertNumQueries(0):
+            incremental = OrderBookService.calculate_order_book()
+        OrderBookService.invalidate()
+        self.assertEqual(OrderBookService.calculate_order_book(), incremental)
+        self.assertEqual(
+            [
+                OrderPair(price=98, sell_quantity=5, buy_quantity=0),
+                OrderPair(price=101, sell_quantity=30, buy_quantity=0),
+            ],
+            incremental,
+        )
+
+    def test_snapshot_rebuilt_when_database_changes(self):
+        """
+        シナリオ:
+        - 入力: 作成済みの板のスナップショット
+        - 処理: 約定エンジンを通さずに (別プロセスなど) 注文を追加してコミットする
+        - 期待値: 保存のシグナルで版が変わり、次の参照でDBから作り直して追加した注文が板に並ぶ
+        """
+        # Given
+        OrderBookService.calculate_order_book()
+
+        # When
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(side="buy", price=99, quantity=10)
+
+        # Then
+        self.assertEqual(
+            [
+                OrderPair(price=99, sell_quantity=0, buy_quantity=40),
+                OrderPair(price=101, sell_quantity=50, buy_quantity=0),
+            ],
+            OrderBookService.calculate_order_book(),
+        )
+
+    def test_snapshot_rebuilt_when_order_deleted_or_bulk_updated(self):
+        """
+        シナリオ:
+        - 入力: 作成済みの板のスナップショット
+        - 処理: 注文の削除と、シグナルを出さない一括更新 (bump_version を呼ぶ) をコミットする
+        - 期待値: どちらも版が変わるので、DBから作り直した板を返す
+        """
+        # Given
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = Order.objects.create(side="sell", price=102, quantity=10)
+        OrderBookService.calculate_order_book()
+
+        # When
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(side="buy").delete()
+        after_delete = OrderBookService.calculate_order_book()
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.filter(pk=extra.pk).update(remaining_quantity=4)
+            OrderRepository.bump_version()
+        after_update = OrderBookService.calculate_order_book()
+
+        # Then
+        self.assertEqual(
+            [
+                OrderPair(price=101, sell_quantity=50, buy_quantity=0),
+                OrderPair(price=102, sell_quantity=10, buy_quantity=0),
+            ],
+            after_delete,
+        )
+        self.assertEqual(
+            [
+                OrderPair(price=101, sell_quantity=50, buy_quantity=0),
+                OrderPair(price=102, sell_quantity=4, buy_quantity=0),
+            ],
+            after_update,
+        )
+
+    def test_execute_discards_snapshot_missing_other_changes(self):
+        """
+        シナリオ:
+        - 入力: 作成済みの板のスナップショットと、その後に約定エンジンを通さずに追加された注文
+        - 処理: MatchingEngineService.execute で新規注文を約定させる
+        - 期待値: 板が書き込み前の版のものではないので、差分で進めずに捨て、
+          次の参照でDBから作り直した板 (外から追加された注文を含む) を返す
+        """
+        # Given
+        OrderBookService.calculate_order_book()
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.create(side="buy", price=97, quantity=15)
+
+        # When
+        with self.captureOnCommitCallbacks(execute=True):
+            new_order = Order.objects.create(side="sell", price=99, quantity=10)
+            MatchingEngineService.execute([new_order])
+
+        # Then
+        self.assertEqual(
+            [
+                OrderPair(price=97, sell_quantity=0, buy_quantity=15),
+                OrderPair(price=99, sell_quantity=0, buy_quantity=20),
+                OrderPair(price=101, sell_quantity=50, buy_quantity=0),
+            ],
+            OrderBookService.calculate_order_book(),
+        )
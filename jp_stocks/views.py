@@ -1,7 +1,10 @@
+from django.db import transaction
+from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView, CreateView, ListView
 
 from jp_stocks.domain.repository.order import OrderRepository
+from jp_stocks.domain.service.matching import MatchingEngineService
 from jp_stocks.domain.service.order import OrderBookService
 from jp_stocks.models import Order
 
@@ -28,6 +31,12 @@ class CreateOrderView(CreateView):
     success_url = reverse_lazy("jpn:order_book")
 
     def form_valid(self, form):
-        new_order = form.save(commit=True)
-        print(f"[INFO] New order created: {new_order}")
-        return super().form_valid(form)
+        # 注文の保存と約定を1つのトランザクションにする。super().form_valid は
+        # 保存し直して約定後の残数量を上書きするので呼ばずにリダイレクトする
+        with transaction.atomic():
+            self.object = form.save(commit=True)
+            print(f"[INFO] New order created: {self.object}")
+            fills = MatchingEngineService.execute([self.object])
+        for fill in fills:
+            print(f"[INFO] Trade executed: {fill.quantity} @ {fill.price}")
+        return HttpResponseRedirect(self.get_success_url())
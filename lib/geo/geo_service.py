@@ -1,3 +1,6 @@
+import os
+from functools import lru_cache
+
 import matplotlib.pyplot as plt
 import numpy as np
 import rasterio
@@ -9,6 +12,45 @@ from lib.geo.valueobject.coord import (
 )
 from lib.geo.valueobject.tiff import MetaData, RectangleCoords, Coord
 
+# 復号済みタイルの一辺（ピクセル）。GeoTIFF の内部ブロックと揃えやすい 256 とする
+TILE_SIZE = 256
+# LRU キャッシュに保持するタイル数（float32 でも 1 タイル 256KB 程度）
+TILE_CACHE_SIZE = 256
+
+
+def _open_dataset(file_path: str, overview_level: int | None = None):
+    """
+    GeoTIFF を開く。overview_level を指定した場合はそのオーバービューを
+    独立したデータセット（専用の transform を持つ）として開く。
+    """
+    if overview_level is None:
+        return rasterio.open(file_path)
+    return rasterio.open(file_path, overview_level=overview_level)
+
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def _read_tile(
+    file_path: str,
+    mtime_ns: int,
+    band_index: int,
+    overview_level: int | None,
+    tile_row: int,
+    tile_col: int,
+) -> np.ndarray:
+    """
+    TILE_SIZE 単位のタイルを 1 枚だけ読み込み、復号結果を LRU キャッシュする。
+
+    mtime_ns はキャッシュキーにのみ使い、ファイルが差し替えられたら別エントリになる。
+    キャッシュした配列を呼び出し側が書き換えないよう読み取り専用で返す。
+    """
+    with _open_dataset(file_path, overview_level) as dataset:
+        window = Window(
+            tile_col * TILE_SIZE, tile_row * TILE_SIZE, TILE_SIZE, TILE_SIZE
+        ).intersection(Window(0, 0, dataset.width, dataset.height))
+        tile = dataset.read(band_index, window=window)
+    tile.setflags(write=False)
+    return tile
+
 
 class GeoService:
     @staticmethod
@@ -105,19 +147,116 @@ class GeoService:
             return GoogleMapsCoord(latitude=lat, longitude=lon)
 
     @staticmethod
-    def read_band_as_array(file_path: str, band_index: int = 1) -> np.ndarray:
+    def select_overview_level(
+        dataset, band_index: int, pixel_count: int, max_pixels: int | None
+    ) -> int | None:
+        """
+        読み込むピクセル数が max_pixels 以下になる最も細かいオーバービューを選ぶ。
+
+        Args:
+            dataset: rasterio で開いたフル解像度のデータセット。
+            band_index (int): 対象バンドのインデックス。
+            pixel_count (int): フル解像度で読み込む場合のピクセル数。
+            max_pixels (int | None): 許容するピクセル数。None ならフル解像度。
+
+        Returns:
+            int | None: オーバービューのレベル（0始まり）。フル解像度なら None。
+                どのオーバービューでも収まらない場合は最も粗いものを返す。
+        """
+        if max_pixels is None or pixel_count <= max_pixels:
+            return None
+        factors = dataset.overviews(band_index)
+        if not factors:
+            return None
+        for level, factor in enumerate(factors):
+            if pixel_count / (factor * factor) <= max_pixels:
+                return level
+        return len(factors) - 1
+
+    @staticmethod
+    def read_window(
+        file_path: str,
+        row_start: int,
+        row_stop: int,
+        col_start: int,
+        col_stop: int,
+        band_index: int = 1,
+        overview_level: int | None = None,
+    ) -> np.ndarray:
+        """
+        指定したピクセル範囲だけをタイル単位で読み込んで組み立てる。
+
+        タイルは LRU キャッシュされるため、同じ圃場やその近傍を繰り返し
+        問い合わせてもディスクの読み込みと復号は 1 回で済む。
+
+        Args:
+            file_path (str): GeoTIFFファイルのパス。
+            row_start (int): 開始行（含む）。
+            row_stop (int): 終了行（含まない）。
+            col_start (int): 開始列（含む）。
+            col_stop (int): 終了列（含まない）。
+            band_index (int): 読み込むバンドのインデックス（デフォルトは1）。
+            overview_level (int | None): 読み込むオーバービュー。None ならフル解像度。
+
+        Returns:
+            np.ndarray: 指定範囲のデータ（ラスター外の部分は切り詰める）。
+        """
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        with _open_dataset(file_path, overview_level) as dataset:
+            height, width = dataset.height, dataset.width
+            dtype = dataset.dtypes[band_index - 1]
+        row_start, row_stop = max(row_start, 0), min(row_stop, height)
+        col_start, col_stop = max(col_start, 0), min(col_stop, width)
+        result = np.empty(
+            (max(row_stop - row_start, 0), max(col_stop - col_start, 0)), dtype=dtype
+        )
+        if result.size == 0:
+            return result
+
+        for tile_row in range(row_start // TILE_SIZE, (row_stop - 1) // TILE_SIZE + 1):
+            for tile_col in range(
+                col_start // TILE_SIZE, (col_stop - 1) // TILE_SIZE + 1
+            ):
+                tile = _read_tile(
+                    file_path,
+                    mtime_ns,
+                    band_index,
+                    overview_level,
+                    tile_row,
+                    tile_col,
+                )
+                top, left = tile_row * TILE_SIZE, tile_col * TILE_SIZE
+                r0, r1 = max(row_start, top), min(row_stop, top + tile.shape[0])
+                c0, c1 = max(col_start, left), min(col_stop, left + tile.shape[1])
+                result[
+                    r0 - row_start : r1 - row_start, c0 - col_start : c1 - col_start
+                ] = tile[r0 - top : r1 - top, c0 - left : c1 - left]
+        return result
+
+    @staticmethod
+    def read_band_as_array(
+        file_path: str, band_index: int = 1, max_pixels: int | None = None
+    ) -> np.ndarray:
         """
         GeoTIFF ファイルの指定されたバンドを numpy 配列として読み込む。
 
         Args:
             file_path (str): GeoTIFFファイルのパス。
             band_index (int): 読み込むバンドのインデックス（デフォルトは1）。
+            max_pixels (int | None): 指定するとピクセル数がこれ以下になる
+                オーバービューから読み込む（全体図の描画など粗い用途向け）。
 
         Returns:
             np.ndarray: 指定バンドのデータ。
         """
         with rasterio.open(file_path) as dataset:
-            return dataset.read(band_index)
+            overview_level = GeoService.select_overview_level(
+                dataset, band_index, dataset.width * dataset.height, max_pixels
+            )
+            if overview_level is None:
+                return dataset.read(band_index)
+        with _open_dataset(file_path, overview_level) as overview:
+            return overview.read(band_index)
 
     @staticmethod
     def get_value_by_coord(file_path: str, coord: GoogleMapsCoord) -> float:
@@ -133,19 +272,28 @@ class GeoService:
         """
         with rasterio.open(file_path) as dataset:
             py, px = dataset.index(coord.longitude, coord.latitude)
-            return dataset.read(1)[py, px]
+        return GeoService.read_window(file_path, py, py + 1, px, px + 1)[0, 0]
 
     @staticmethod
     def crop_by_bbox(
-        file_path: str, min_coord: GoogleMapsCoord, max_coord: GoogleMapsCoord
+        file_path: str,
+        min_coord: GoogleMapsCoord,
+        max_coord: GoogleMapsCoord,
+        band_index: int = 1,
+        max_pixels: int | None = None,
     ) -> np.ndarray:
         """
         指定した緯度経度範囲のデータを切り取る。
 
+        バンド全体は読み込まず、範囲に掛かるタイルだけを読み込む。
+
         Args:
             file_path (str): GeoTIFFファイルのパス。
             min_coord (GoogleMapsCoord): 左下の緯度経度。
             max_coord (GoogleMapsCoord): 右上の緯度経度。
+            band_index (int): 読み込むバンドのインデックス（デフォルトは1）。
+            max_pixels (int | None): 指定すると切り取り範囲のピクセル数が
+                これ以下になるオーバービューから読み込む。
 
         Returns:
             np.ndarray: 指定範囲のデータ。
@@ -153,10 +301,20 @@ class GeoService:
         with rasterio.open(file_path) as src:
             py, px = src.index(min_coord.longitude, min_coord.latitude)
             py2, px2 = src.index(max_coord.longitude, max_coord.latitude)
+            overview_level = GeoService.select_overview_level(
+                src, band_index, (py - py2 + 1) * (px2 - px + 1), max_pixels
+            )
+
+        if overview_level is not None:
+            # オーバービューは専用の transform を持つので、そちらで引き直す
+            with _open_dataset(file_path, overview_level) as overview:
+                py, px = overview.index(min_coord.longitude, min_coord.latitude)
+                py2, px2 = overview.index(max_coord.longitude, max_coord.latitude)
 
-            # 左上 (y: py2), 右下 (y: py) のピクセル範囲を指定
-            window = Window.from_slices((py2, py + 1), (px, px2 + 1))
-            return src.read(1, window=window)
+        # 左上 (y: py2), 右下 (y: py) のピクセル範囲を指定
+        return GeoService.read_window(
+            file_path, py2, py + 1, px, px2 + 1, band_index, overview_level
+        )
 
     @staticmethod
     def draw_bbox_on_cropped_image(
@@ -215,6 +373,37 @@ class GeoService:
 
         return forest_pixels / total_pixels if total_pixels > 0 else 0
 
+    @staticmethod
+    def calculate_forest_percentage_from_bbox(
+        file_path: str,
+        min_coord: GoogleMapsCoord,
+        max_coord: GoogleMapsCoord,
+        forest_threshold: float,
+        max_pixels: int | None = None,
+    ) -> float:
+        """
+        緯度経度範囲を指定して森が占める割合を計算する。
+
+        範囲に掛かるタイルだけを読み込むため、1 圃場分の問い合わせなら
+        読み込み量は数 KB〜数百 KB に収まる。
+
+        Args:
+            file_path (str): GeoTIFFファイルのパス。
+            min_coord (GoogleMapsCoord): 左下の緯度経度。
+            max_coord (GoogleMapsCoord): 右上の緯度経度。
+            forest_threshold (float): 森と判定するピクセル値の閾値。
+            max_pixels (int | None): 粗い集計でよい場合の読み込みピクセル数の上限。
+
+        Returns:
+            float: 森が占める割合（0～1）。
+        """
+        return GeoService.calculate_forest_percentage_from_array(
+            data_array=GeoService.crop_by_bbox(
+                file_path, min_coord, max_coord, max_pixels=max_pixels
+            ),
+            forest_threshold=forest_threshold,
+        )
+
     @staticmethod
     def rescale_cropped_data_and_save(cropped_data: np.ndarray, output_path: str):
         """
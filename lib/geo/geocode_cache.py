@@ -0,0 +1,110 @@
+import os
+import re
+import sqlite3
+import unicodedata
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+from django.conf import settings
+
+from lib.geo.valueobject.coord import GoogleMapsCoord
+
+# 逆ジオコーディングのキーに使う小数点以下の桁数（5桁で約1m）
+COORD_PRECISION = 5
+
+# SQLite のプレースホルダ上限（古いビルドでは 999）に掛からないよう分割して引く
+QUERY_CHUNK_SIZE = 500
+
+KIND_FORWARD = "forward"
+KIND_REVERSE = "reverse"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_address(address: str) -> str:
+    """
+    住所文字列をキャッシュキー用に正規化する。
+    全角英数・記号を NFKC で半角に寄せ、空白をすべて取り除く。
+    """
+    return _WHITESPACE.sub("", unicodedata.normalize("NFKC", address))
+
+
+def coord_key(coord: GoogleMapsCoord) -> str:
+    """
+    緯度経度を COORD_PRECISION 桁に丸めたキャッシュキーを返す。
+    GPS の微小な揺れで同じ地点が別キーにならないようにする。
+    """
+    return (
+        f"{round(coord.latitude, COORD_PRECISION):.{COORD_PRECISION}f},"
+        f"{round(coord.longitude, COORD_PRECISION):.{COORD_PRECISION}f}"
+    )
+
+
+class GeocodeCache:
+    """
+    ジオコーダーのレスポンス（XML）を SQLite ファイルに永続化するキャッシュ。
+
+    パースは呼び出し側で行うため、YDF の構造が変わってもキャッシュは作り直さずに済む。
+    接続は操作ごとに開くので、スレッドをまたいで使ってよい。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                " kind TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " xml TEXT NOT NULL,"
+                " created_at TEXT NOT NULL,"
+                " PRIMARY KEY (kind, key))"
+            )
+
+    @classmethod
+    def default(cls) -> "GeocodeCache":
+        """
+        settings.GEOCODE_CACHE_PATH（未設定なら BASE_DIR/cache/geocode_cache.sqlite3）を使う。
+        MEDIA_ROOT は公開配信されるため、キャッシュは置かない。
+        """
+        path = getattr(settings, "GEOCODE_CACHE_PATH", None) or os.path.join(
+            settings.BASE_DIR, "cache", "geocode_cache.sqlite3"
+        )
+        return cls(str(path))
+
+    @contextmanager
+    def _connect(self):
+        """コミットしてから接続を閉じる"""
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def get(self, kind: str, key: str) -> str | None:
+        return self.get_many(kind, [key]).get(key)
+
+    def get_many(self, kind: str, keys: list[str]) -> dict[str, str]:
+        """
+        複数キーをまとめて引く。見つかったものだけを {key: xml} で返す。
+        """
+        found = {}
+        if not keys:
+            return found
+        with self._connect() as conn:
+            for i in range(0, len(keys), QUERY_CHUNK_SIZE):
+                chunk = keys[i : i + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, xml FROM geocode_cache"
+                    f" WHERE kind = ? AND key IN ({placeholders})",
+                    [kind, *chunk],
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def set(self, kind: str, key: str, xml: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (kind, key, xml, created_at)"
+                " VALUES (?, ?, ?, ?)",
+                (kind, key, xml, datetime.now().isoformat()),
+            )
@@ -0,0 +1,125 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+from lib.geo.geo_service import GeoService, _read_tile
+from lib.geo.valueobject.coord import GoogleMapsCoord
+
+
+class TestGeoServiceWindowedRead(TestCase):
+    """
+    GeoService の部分読み込み（タイル単位・オーバービュー）をテストする
+
+    1000x1200 ピクセルのタイル化 GeoTIFF（オーバービュー 2/4/8 付き）を作り、
+    緯度経度範囲の切り取りがバンド全体を読まずに同じ結果を返すことを確認します。
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmpdir.name, "sample.tif")
+        self.data = (np.arange(1000 * 1200) % 251).astype("uint8").reshape(1000, 1200)
+        with rasterio.open(
+            self.file_path,
+            "w",
+            driver="GTiff",
+            width=1200,
+            height=1000,
+            count=1,
+            dtype="uint8",
+            crs="EPSG:4326",
+            transform=from_origin(136.0, 38.0, 0.001, 0.001),
+            tiled=True,
+        ) as dataset:
+            dataset.write(self.data, 1)
+        with rasterio.open(self.file_path, "r+") as dataset:
+            dataset.build_overviews([2, 4, 8], Resampling.average)
+        self.min_coord = GoogleMapsCoord(latitude=37.5, longitude=136.3)
+        self.max_coord = GoogleMapsCoord(latitude=37.7, longitude=136.9)
+        _read_tile.cache_clear()
+
+    def tearDown(self):
+        _read_tile.cache_clear()
+        self.tmpdir.cleanup()
+
+    def test_crop_by_bbox_reads_only_covering_tiles(self):
+        """
+        シナリオ:
+        - 入力: 1000x1200 のラスターと、201x601 ピクセルに当たる緯度経度範囲。
+        - 処理: crop_by_bbox を2回実行する。
+        - 期待値: 従来の全体ウィンドウ読み込みと同じ配列が返り、読み込まれるタイルは
+          範囲に掛かる3枚だけで、2回目はキャッシュから返ること。
+        """
+        # Given
+        with rasterio.open(self.file_path) as src:
+            py, px = src.index(self.min_coord.longitude, self.min_coord.latitude)
+            py2, px2 = src.index(self.max_coord.longitude, self.max_coord.latitude)
+            expected = src.read(
+                1, window=Window.from_slices((py2, py + 1), (px, px2 + 1))
+            )
+
+        # When
+        cropped = GeoService.crop_by_bbox(
+            self.file_path, self.min_coord, self.max_coord
+        )
+        first_misses = _read_tile.cache_info().misses
+        GeoService.crop_by_bbox(self.file_path, self.min_coord, self.max_coord)
+
+        # Then
+        np.testing.assert_array_equal(expected, cropped)
+        self.assertEqual(3, first_misses)
+        self.assertEqual(3, _read_tile.cache_info().misses)
+        self.assertEqual(3, _read_tile.cache_info().hits)
+
+    def test_max_pixels_selects_overview(self):
+        """
+        シナリオ:
+        - 入力: オーバービュー 2/4/8 付きのラスター。
+        - 処理: max_pixels の有無を変えてバンド全体と範囲を読み込む。
+        - 期待値: ピクセル数が上限に収まる最も細かいオーバービューの解像度で返ること。
+        """
+        # Given
+        file_path = self.file_path
+
+        # When
+        full = GeoService.read_band_as_array(file_path)
+        overview = GeoService.read_band_as_array(file_path, max_pixels=100_000)
+        cropped = GeoService.crop_by_bbox(
+            file_path, self.min_coord, self.max_coord, max_pixels=10_000
+        )
+
+        # Then
+        self.assertEqual((1000, 1200), full.shape)
+        self.assertEqual((250, 300), overview.shape)
+        self.assertLessEqual(cropped.size, 10_000)
+
+    def test_forest_percentage_and_point_value(self):
+        """
+        シナリオ:
+        - 入力: 値が 0～250 を周期的に取るラスター。
+        - 処理: 緯度経度範囲で森林率を計算し、左下地点の値を取得する。
+        - 期待値: 配列から計算した森林率・元データの値と一致すること。
+        """
+        # Given
+        cropped = GeoService.crop_by_bbox(
+            self.file_path, self.min_coord, self.max_coord
+        )
+        with rasterio.open(self.file_path) as src:
+            py, px = src.index(self.min_coord.longitude, self.min_coord.latitude)
+
+        # When
+        percentage = GeoService.calculate_forest_percentage_from_bbox(
+            self.file_path, self.min_coord, self.max_coord, 128
+        )
+        value = GeoService.get_value_by_coord(self.file_path, self.min_coord)
+
+        # Then
+        self.assertAlmostEqual(
+            GeoService.calculate_forest_percentage_from_array(cropped, 128), percentage
+        )
+        self.assertEqual(self.data[py, px], value)
@@ -1,12 +1,26 @@
+import os
+import tempfile
 from unittest import mock
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from lib.geo.geocode_cache import GeocodeCache, normalize_address, coord_key
 from lib.geo.valueobject.coord import GoogleMapsCoord
 from lib.geo.yahoo_geocoder import ReverseGeocoderService, ForwardGeocoderService
 
 
+def use_temp_geocode_cache(test_case: TestCase):
+    """テストごとに空のジオコードキャッシュを使う"""
+    tmpdir = tempfile.TemporaryDirectory()
+    test_case.addCleanup(tmpdir.cleanup)
+    override = override_settings(
+        GEOCODE_CACHE_PATH=os.path.join(tmpdir.name, "geocode_cache.sqlite3")
+    )
+    override.enable()
+    test_case.addCleanup(override.disable)
+
+
 class TestReverseGeocoderService(TestCase):
     """
     ReverseGeocoderService の逆ジオコーディング機能をテストする
@@ -22,6 +36,9 @@ class TestReverseGeocoderService(TestCase):
     - 圃場や測定地点の座標から所在地を特定する
     """
 
+    def setUp(self):
+        use_temp_geocode_cache(self)
+
     @patch("requests.get")
     def test_get_ydf_from_coord(self, mock_get):
         """
@@ -142,6 +159,9 @@ class TestForwardGeocoderService(TestCase):
     Yahoo Geocoding API を使って住所から緯度経度を取得するテスト
     """
 
+    def setUp(self):
+        use_temp_geocode_cache(self)
+
     @patch("requests.get")
     def test_get_coord_from_address(self, mock_get):
         """
@@ -312,3 +332,237 @@ class TestForwardGeocoderService(TestCase):
         with self.assertRaises(ValueError) as ctx:
             ForwardGeocoderService.get_coord_from_address("存在しない住所")
         self.assertEqual(str(ctx.exception), "No results found")
+
+
+class TestGeocodeCache(TestCase):
+    """
+    ジオコーディング結果の永続キャッシュのテスト
+
+    【テストシナリオ】
+    一度解決した住所・座標は SQLite のキャッシュから返し、結果が得られなかった入力はキャッシュしないこと、
+    一括解決では正規化後に同じになる入力を1回だけ問い合わせることを確認します。
+    """
+
+    FORWARD_XML = """
+    <YDF xmlns="http://olp.yahooapis.jp/ydf/1.0">
+        <ResultInfo>
+            <Count>1</Count>
+            <Total>1</Total>
+            <Start>1</Start>
+            <Status>200</Status>
+            <Description>住所から緯度経度を検索する機能を提供します。</Description>
+            <Latency>0.010</Latency>
+        </ResultInfo>
+        <Feature>
+            <Name>東京都港区赤坂9-7-1</Name>
+            <Geometry>
+                <Type>point</Type>
+                <Coordinates>139.731342,35.666049</Coordinates>
+            </Geometry>
+        </Feature>
+    </YDF>
+    """
+
+    NO_RESULT_XML = """
+    <YDF xmlns="http://olp.yahooapis.jp/ydf/1.0">
+        <ResultInfo>
+            <Count>0</Count>
+            <Total>0</Total>
+            <Start>1</Start>
+            <Status>200</Status>
+            <Description>住所から緯度経度を検索する機能を提供します。</Description>
+            <Latency>0.005</Latency>
+        </ResultInfo>
+    </YDF>
+    """
+
+    REVERSE_XML = """
+    <YDF xmlns="http://olp.yahooapis.jp/ydf/1.0">
+        <ResultInfo>
+            <Count>1</Count>
+            <Total>1</Total>
+            <Start>1</Start>
+            <Latency>0.1</Latency>
+            <Status>200</Status>
+            <Description>指定の地点の住所情報を取得する機能を提供します。</Description>
+        </ResultInfo>
+        <Feature>
+            <Property>
+                <Country>
+                    <Code>JP</Code>
+                    <Name>日本</Name>
+                </Country>
+                <Address>東京都港区赤坂９丁目７－１</Address>
+                <AddressElement>
+                    <Name>東京都</Name>
+                    <Kana>とうきょうと</Kana>
+                    <Level>prefecture</Level>
+                    <Code>13</Code>
+                </AddressElement>
+                <AddressElement>
+                    <Name>港区</Name>
+                    <Kana>みなとく</Kana>
+                    <Level>city</Level>
+                    <Code>13103</Code>
+                </AddressElement>
+            </Property>
+            <Geometry>
+                <Type>point</Type>
+                <Coordinates>139.731342,35.666049</Coordinates>
+            </Geometry>
+        </Feature>
+    </YDF>
+    """
+
+    def setUp(self):
+        use_temp_geocode_cache(self)
+
+    @staticmethod
+    def _response(xml: str) -> mock.Mock:
+        response = mock.Mock()
+        response.text = xml
+        response.status_code = 200
+        return response
+
+    def test_normalize_address_and_coord_key(self):
+        """
+        シナリオ:
+        - 入力: 全角英数・空白だけが異なる住所と、小数点以下7桁の座標。
+        - 処理: キャッシュキーを生成する。
+        - 期待値: 住所は同じキーになり、座標は小数点以下5桁に丸めたキーになること。
+        """
+        # Given
+        coord = GoogleMapsCoord(latitude=35.6812360, longitude=139.7671251)
+
+        # When
+        full_width_key = normalize_address("東京都港区赤坂９－７－１")
+        spaced_key = normalize_address(" 東京都 港区赤坂9-7-1 ")
+
+        # Then
+        self.assertEqual(full_width_key, spaced_key)
+        self.assertEqual("35.68124,139.76713", coord_key(coord))
+
+    @patch("requests.get")
+    def test_forward_result_is_reused_from_cache(self, mock_get):
+        """
+        シナリオ:
+        - 入力: 一度ジオコーディングした住所と、表記ゆれのある同じ住所。
+        - 処理: 2回ジオコーディングする。
+        - 期待値: API は1回しか呼ばれず、同じ座標が返ること。
+        """
+        # Given
+        mock_get.return_value = self._response(self.FORWARD_XML)
+
+        # When
+        first = ForwardGeocoderService.get_coord_from_address("東京都港区赤坂9-7-1")
+        second = ForwardGeocoderService.get_coord_from_address(
+            "東京都港区赤坂９－７－１"
+        )
+
+        # Then
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual(first.to_tuple(), second.to_tuple())
+
+    @patch("requests.get")
+    def test_forward_no_results_is_not_cached(self, mock_get):
+        """
+        シナリオ:
+        - 入力: 見つからない住所。
+        - 処理: 2回ジオコーディングする。
+        - 期待値: どちらも ValueError となり、結果がキャッシュされず API が2回呼ばれること。
+        """
+        # Given
+        mock_get.return_value = self._response(self.NO_RESULT_XML)
+
+        # When
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                ForwardGeocoderService.get_coord_from_address("存在しない住所")
+
+        # Then
+        self.assertEqual(2, mock_get.call_count)
+
+    @patch("requests.get")
+    def test_reverse_rounds_nearby_coords(self, mock_get):
+        """
+        シナリオ:
+        - 入力: 小数点以下6桁目以降だけが異なる2地点。
+        - 処理: それぞれ逆ジオコーディングする。
+        - 期待値: API は1回だけ呼ばれ、どちらも同じ住所が返ること。
+        """
+        # Given
+        mock_get.return_value = self._response(self.REVERSE_XML)
+
+        # When
+        first = ReverseGeocoderService.get_ydf_from_coord(
+            GoogleMapsCoord(latitude=35.6660491, longitude=139.7313421)
+        )
+        second = ReverseGeocoderService.get_ydf_from_coord(
+            GoogleMapsCoord(latitude=35.6660493, longitude=139.7313424)
+        )
+
+        # Then
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual("東京都港区赤坂９丁目７－１", first.feature.address_full)
+        self.assertEqual(first, second)
+
+    @patch("requests.get")
+    def test_batch_forward_dedups_and_skips_caching_no_results(self, mock_get):
+        """
+        シナリオ:
+        - 入力: 表記ゆれの重複を含む住所リストと、見つからない住所。
+        - 処理: get_coords_from_addresses で一括解決し、同じ住所でもう一度一括解決する。
+        - 期待値: 重複は1回だけ問い合わせ、入力順に結果が返ること。
+          見つからない住所は None でキャッシュされず、2回目はその住所だけを問い合わせること。
+        """
+        # Given
+        mock_get.side_effect = lambda url, params: self._response(
+            self.NO_RESULT_XML
+            if params["query"] == "存在しない住所"
+            else self.FORWARD_XML
+        )
+
+        # When
+        coords = ForwardGeocoderService.get_coords_from_addresses(
+            ["東京都港区赤坂9-7-1", "存在しない住所", "東京都港区赤坂 9-7-1"]
+        )
+        calls_after_first = mock_get.call_count
+        ForwardGeocoderService.get_coords_from_addresses(
+            ["東京都港区赤坂9-7-1", "存在しない住所"]
+        )
+
+        # Then
+        self.assertEqual(2, calls_after_first)
+        self.assertAlmostEqual(35.666049, coords[0].latitude, places=5)
+        self.assertIsNone(coords[1])
+        self.assertEqual(coords[0].to_tuple(), coords[2].to_tuple())
+        self.assertEqual(3, mock_get.call_count)
+
+    @patch("requests.get")
+    def test_batch_reverse_rounds_nearby_coords(self, mock_get):
+        """
+        シナリオ:
+        - 入力: 小数点以下6桁目以降だけが異なる2地点。
+        - 処理: get_ydfs_from_coords で一括解決し、その後1地点を単独で解決する。
+        - 期待値: キャッシュは一括で1回だけ引き、API は1回だけ呼ばれ、どちらも同じ住所が返ること。
+        """
+        # Given
+        mock_get.return_value = self._response(self.REVERSE_XML)
+        coords = [
+            GoogleMapsCoord(latitude=35.6660491, longitude=139.7313421),
+            GoogleMapsCoord(latitude=35.6660493, longitude=139.7313424),
+        ]
+
+        # When
+        with patch.object(
+            GeocodeCache, "get_many", autospec=True, side_effect=GeocodeCache.get_many
+        ) as get_many:
+            ydfs = ReverseGeocoderService.get_ydfs_from_coords(coords)
+        ydf = ReverseGeocoderService.get_ydf_from_coord(coords[0])
+
+        # Then
+        self.assertEqual(1, get_many.call_count)
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual("東京都港区赤坂９丁目７－１", ydfs[0].feature.address_full)
+        self.assertEqual(ydfs[0], ydfs[1])
+        self.assertEqual(ydfs[0], ydf)
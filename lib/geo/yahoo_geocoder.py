@@ -1,11 +1,23 @@
 import os
 import xml.etree.ElementTree as et
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+from lib.geo.geocode_cache import (
+    KIND_FORWARD,
+    KIND_REVERSE,
+    GeocodeCache,
+    coord_key,
+    normalize_address,
+)
 from lib.geo.valueobject.coord import GoogleMapsCoord
 from lib.geo.valueobject.yahoo_geocoder import YDF
 
+# キャッシュに無い入力をまとめて問い合わせるときの同時接続数
+MAX_WORKERS = 4
+
 
 def _parse_xml_and_result_info(xml_str: str) -> tuple:
     ns = {"ns": "http://olp.yahooapis.jp/ydf/1.0"}
@@ -23,6 +35,46 @@ def _parse_xml_and_result_info(xml_str: str) -> tuple:
     return root, ns, result_info
 
 
+def _resolve_one(
+    kind: str, key: str, item, fetch_xml: Callable, xml_to_ydf: Callable
+) -> YDF:
+    """
+    キャッシュにあればそれをパースし、無ければ問い合わせてパースできたものだけを保存する。
+    """
+    cache = GeocodeCache.default()
+    xml_str = cache.get(kind, key)
+    if xml_str is not None:
+        return xml_to_ydf(xml_str)
+    xml_str = fetch_xml(item)
+    ydf = xml_to_ydf(xml_str)
+    cache.set(kind, key, xml_str)
+    return ydf
+
+
+def _resolve_many(
+    kind: str, items: dict, fetch_xml: Callable, xml_to_ydf: Callable
+) -> dict[str, YDF | None]:
+    """
+    重複を除いた {key: 入力} を受け取り、キャッシュを一括で引いてから
+    残りだけを並列に問い合わせる。結果が得られなかったキーは None とし、保存しない。
+    """
+    cache = GeocodeCache.default()
+    cached = cache.get_many(kind, list(items))
+    resolved = {key: xml_to_ydf(xml_str) for key, xml_str in cached.items()}
+
+    missing = [key for key in items if key not in cached]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        fetched = executor.map(lambda key: fetch_xml(items[key]), missing)
+        for key, xml_str in zip(missing, fetched):
+            try:
+                resolved[key] = xml_to_ydf(xml_str)
+            except ValueError:
+                resolved[key] = None
+                continue
+            cache.set(kind, key, xml_str)
+    return resolved
+
+
 class ReverseGeocoderService:
     @staticmethod
     def get_ydf_from_coord(coord: GoogleMapsCoord) -> YDF:
@@ -32,8 +84,36 @@ class ReverseGeocoderService:
         Returns:
             An instance of the YDF obtained from the GoogleMapsCoord
         """
-        xml_str = ReverseGeocoderService._fetch_xml(coord)
-        return ReverseGeocoderService._xml_to_ydf(xml_str)
+        return _resolve_one(
+            KIND_REVERSE,
+            coord_key(coord),
+            coord,
+            ReverseGeocoderService._fetch_xml,
+            ReverseGeocoderService._xml_to_ydf,
+        )
+
+    @staticmethod
+    def get_ydfs_from_coords(coords: list[GoogleMapsCoord]) -> list[YDF | None]:
+        """
+        複数の緯度経度をまとめて逆ジオコーディングする。
+        丸めた座標が同じものは1回だけ問い合わせる。
+
+        Args:
+            coords: The list of GoogleMapsCoord
+        Returns:
+            入力と同じ順序の YDF のリスト（住所が得られなかった地点は None）
+        """
+        keys = [coord_key(coord) for coord in coords]
+        unique_coords = {}
+        for key, coord in zip(keys, coords):
+            unique_coords.setdefault(key, coord)
+        resolved = _resolve_many(
+            KIND_REVERSE,
+            unique_coords,
+            ReverseGeocoderService._fetch_xml,
+            ReverseGeocoderService._xml_to_ydf,
+        )
+        return [resolved[key] for key in keys]
 
     @staticmethod
     def _fetch_xml(coord: GoogleMapsCoord) -> str:
@@ -142,8 +222,13 @@ class ForwardGeocoderService:
         """
         住所文字列から詳細なYDF情報を取得する
         """
-        xml_str = ForwardGeocoderService._fetch_xml(address)
-        return ForwardGeocoderService._xml_to_ydf(xml_str)
+        return _resolve_one(
+            KIND_FORWARD,
+            normalize_address(address),
+            address,
+            ForwardGeocoderService._fetch_xml,
+            ForwardGeocoderService._xml_to_ydf,
+        )
 
     @staticmethod
     def get_coord_from_address(address: str) -> GoogleMapsCoord:
@@ -151,6 +236,40 @@ class ForwardGeocoderService:
         住所文字列から緯度経度を取得する
         """
         ydf = ForwardGeocoderService.get_ydf_from_address(address)
+        return ForwardGeocoderService._ydf_to_coord(ydf)
+
+    @staticmethod
+    def get_coords_from_addresses(
+        addresses: list[str],
+    ) -> list[GoogleMapsCoord | None]:
+        """
+        複数の住所文字列をまとめて緯度経度に変換する。
+        正規化後に同じ住所になるものは1回だけ問い合わせる。
+
+        Returns:
+            入力と同じ順序の緯度経度のリスト（見つからなかった住所は None）
+        """
+        keys = [normalize_address(address) for address in addresses]
+        unique_addresses = {}
+        for key, address in zip(keys, addresses):
+            unique_addresses.setdefault(key, address)
+        resolved = _resolve_many(
+            KIND_FORWARD,
+            unique_addresses,
+            ForwardGeocoderService._fetch_xml,
+            ForwardGeocoderService._xml_to_ydf,
+        )
+        return [
+            (
+                ForwardGeocoderService._ydf_to_coord(resolved[key])
+                if resolved[key] is not None
+                else None
+            )
+            for key in keys
+        ]
+
+    @staticmethod
+    def _ydf_to_coord(ydf: YDF) -> GoogleMapsCoord:
         # YahooのCoordinatesは "lon,lat" の順序
         lon_str, lat_str = ydf.feature.geometry.coordinates.split(",")
         return GoogleMapsCoord(latitude=float(lat_str), longitude=float(lon_str))
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import feedparser
+import requests
+from django.conf import settings
+
+# これより古いコピーは、表示には使いつつ裏で取り直す
+DEFAULT_MAX_AGE = timedelta(minutes=30)
+FETCH_TIMEOUT = 10
+
+_refreshing: set[tuple[str, str]] = set()
+_refreshing_lock = threading.Lock()
+
+
+@lru_cache(maxsize=32)
+def _parse(content_path: str, mtime_ns: int) -> feedparser.FeedParserDict:
+    with open(content_path, "rb") as f:
+        return feedparser.parse(f.read())
+
+
+class RssFeedStore:
+    """
+    RSSフィードの最後に取得できた正常なコピーを、URLごとにファイルへ保存するストア。
+
+    - refresh(): 条件付きGET（ETag / Last-Modified）で取り直す。取得・パースに失敗しても
+      既存のコピーは残すので、表示側は常に最後の正常なコピーを使える
+    - get(): 画面表示用。コピーが古ければそれを返しつつ裏のスレッドで取り直す
+      （stale-while-revalidate）。コピーが無いときだけその場で取得する
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "RssFeedStore":
+        """
+        settings.RSS_FEED_CACHE_DIR（未設定なら MEDIA_ROOT/rss_cache）を使う。
+        """
+        directory = getattr(settings, "RSS_FEED_CACHE_DIR", None) or os.path.join(
+            settings.MEDIA_ROOT, "rss_cache"
+        )
+        return cls(str(directory))
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return (
+            os.path.join(self.directory, f"{name}.xml"),
+            os.path.join(self.directory, f"{name}.json"),
+        )
+
+    def _read_meta(self, url: str) -> dict:
+        _, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, url: str, meta: dict) -> None:
+        _, meta_path = self._paths(url)
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def fetched_at(self, url: str) -> datetime | None:
+        """最後に取得（304を含む）できた日時"""
+        fetched_at = self._read_meta(url).get("fetched_at")
+        return datetime.fromisoformat(fetched_at) if fetched_at else None
+
+    def parsed(self, url: str) -> feedparser.FeedParserDict | None:
+        """
+        保存済みのコピーをパースして返す。コピーが無ければ None。
+        パース結果はファイルが書き換わるまでプロセス内で使い回す。
+        """
+        content_path, _ = self._paths(url)
+        try:
+            mtime_ns = os.stat(content_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return _parse(content_path, mtime_ns)
+
+    def refresh(self, url: str, timeout: float = FETCH_TIMEOUT) -> bool:
+        """
+        フィードを取り直して保存する。
+
+        Returns:
+            bool: 内容が更新された場合 True（304 Not Modified なら False）
+
+        Raises:
+            requests.exceptions.RequestException: 通信エラー
+            ValueError: 取得した内容がフィードとして読めない場合（既存のコピーは残る）
+        """
+        content_path, _ = self._paths(url)
+        meta = self._read_meta(url)
+        headers = {}
+        if os.path.exists(content_path):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=timeout)
+        now = datetime.now(timezone.utc).isoformat()
+        if response.status_code == 304:
+            self._write_meta(url, {**meta, "fetched_at": now})
+            return False
+        response.raise_for_status()
+
+        parsed = feedparser.parse(response.content)
+        if not parsed.get("entries") and (
+            parsed.get("bozo") or not parsed.get("version")
+        ):
+            # メンテナンス画面のHTMLなどで最後の正常なコピーを上書きしない
+            raise ValueError(
+                f"RSSとして読めませんでした: {parsed.get('bozo_exception', url)}"
+            )
+        if parsed.get("bozo"):
+            logging.warning(
+                f"RSSのパース中に不完全なデータが検出されました: {parsed.bozo_exception}"
+            )
+
+        tmp_path = f"{content_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, content_path)
+        self._write_meta(
+            url,
+            {
+                "url": url,
+                "fetched_at": now,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            },
+        )
+        return True
+
+    def get(
+        self, url: str, max_age: timedelta = DEFAULT_MAX_AGE
+    ) -> feedparser.FeedParserDict:
+        """
+        画面表示用にフィードを返す。
+
+        コピーがあれば必ずそれを返し（古ければ裏で取り直す）、外部フィードの応答を待たない。
+        コピーが無いときだけその場で取得する。
+
+        Raises:
+            requests.exceptions.RequestException, ValueError:
+                コピーが無く、その場での取得にも失敗した場合
+        """
+        parsed = self.parsed(url)
+        if parsed is None:
+            self.refresh(url)
+            return self.parsed(url)
+
+        fetched_at = self.fetched_at(url)
+        if fetched_at is None or datetime.now(timezone.utc) - fetched_at > max_age:
+            self._refresh_in_background(url)
+        return parsed
+
+    def _refresh_in_background(self, url: str) -> None:
+        key = (self.directory, url)
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def run():
+            try:
+                self.refresh(url)
+            except Exception as e:
+                logging.warning(
+                    f"RSSの再取得に失敗しました（前回のコピーを使用）: {url}: {e}"
+                )
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
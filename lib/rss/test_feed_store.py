@@ -0,0 +1,90 @@
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from unittest.mock import patch
+
+import requests
+from django.test import TestCase, override_settings
+
+from lib.rss.feed_store import RssFeedStore
+
+FEED_URL = "https://example.com/rss.xml"
+FEED_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<title>Example</title>
+<item><title>First</title><link>https://example.com/1</link>
+<description>Summary 1</description><pubDate>Mon, 19 Oct 2026 09:00:00 +0000</pubDate></item>
+</channel></rss>
+"""
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict | None = None):
+    response = mock.Mock(
+        status_code=status_code, content=content, headers=headers or {}
+    )
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            str(status_code)
+        )
+    return response
+
+
+class TestRssFeedStore(TestCase):
+    """
+    RssFeedStore の保存・条件付き取得・最後の正常なコピーへのフォールバックをテストする
+    """
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        override = override_settings(RSS_FEED_CACHE_DIR=tmpdir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.store = RssFeedStore.default()
+
+    @patch("lib.rss.feed_store.requests.get")
+    def test_refresh_stores_copy_and_sends_conditional_request(self, mock_get):
+        mock_get.return_value = _response(200, FEED_XML, {"ETag": '"v1"'})
+        self.assertTrue(self.store.refresh(FEED_URL))
+        self.assertEqual("First", self.store.parsed(FEED_URL).entries[0].title)
+
+        mock_get.return_value = _response(304)
+        self.assertFalse(self.store.refresh(FEED_URL))
+        self.assertEqual('"v1"', mock_get.call_args.kwargs["headers"]["If-None-Match"])
+        self.assertEqual("First", self.store.parsed(FEED_URL).entries[0].title)
+
+    @patch("lib.rss.feed_store.requests.get")
+    def test_failed_refresh_keeps_last_good_copy(self, mock_get):
+        mock_get.return_value = _response(200, FEED_XML)
+        self.store.refresh(FEED_URL)
+
+        mock_get.return_value = _response(200, b"<html>maintenance</html>")
+        with self.assertRaises(ValueError):
+            self.store.refresh(FEED_URL)
+        mock_get.return_value = _response(503)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.store.refresh(FEED_URL)
+
+        entries = self.store.get(FEED_URL).entries
+        self.assertEqual(
+            [("First", "https://example.com/1")],
+            [(entry.title, entry.link) for entry in entries],
+        )
+
+    @patch("lib.rss.feed_store.requests.get")
+    def test_get_serves_stale_copy_and_refreshes_in_background(self, mock_get):
+        mock_get.return_value = _response(200, FEED_XML)
+        self.store.get(FEED_URL)
+        self.assertEqual(1, mock_get.call_count)
+
+        with patch.object(RssFeedStore, "_refresh_in_background") as refresh:
+            self.store.get(FEED_URL)
+            refresh.assert_not_called()
+
+            later = datetime.now(timezone.utc) + timedelta(hours=1)
+            stale = later - timedelta(hours=2)
+            with patch.object(RssFeedStore, "fetched_at", return_value=stale):
+                parsed = self.store.get(FEED_URL)
+            refresh.assert_called_once_with(FEED_URL)
+        self.assertEqual("First", parsed.entries[0].title)
+        self.assertEqual(1, mock_get.call_count)
@@ -2,5 +2,10 @@ from django.apps import AppConfig
 
 
 class SoilAnalysisConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'soil_analysis'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "soil_analysis"
+
+    def ready(self):
+        from soil_analysis.signals import connect_signals
+
+        connect_signals()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+class JmaApiClient:
+    """
+    気象庁（bosai）の JSON エンドポイントを取得するクライアントです。
+
+    - 同じ URL は1回の実行で1度だけ取得します（重複 URL は除外）
+    - 複数 URL はスレッドプール（上限 max_workers）で並列に取得します
+    - cache_dir を指定すると ETag / Last-Modified を保存し、次回以降は条件付きリクエストを送ります。
+      304 Not Modified の場合は保存済みの JSON を再利用します
+    - 取得した検証子は commit_cache を呼ぶまで保存しません。DB への反映が完了してから
+      保存することで、反映に失敗した内容が次回 304 で読み飛ばされることを防ぎます
+    """
+
+    TIMEOUT_SECONDS = 20
+    MAX_WORKERS = 4
+
+    def __init__(self, cache_dir: str | None = None, max_workers: int = MAX_WORKERS):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.not_modified_urls: set[str] = set()
+        self._pending_cache: dict[str, dict] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def fetch_many(self, urls: list[str]) -> dict[str, dict | list]:
+        """
+        複数の URL を並列に取得します。
+
+        Args:
+            urls: 取得する URL のリスト（重複可）
+
+        Returns:
+            dict[str, dict | list]: URL をキーとするパース済み JSON
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(unique_urls))
+        ) as executor:
+            documents = list(executor.map(self.fetch, unique_urls))
+
+        return dict(zip(unique_urls, documents))
+
+    def fetch(self, url: str) -> dict | list:
+        """
+        URL を取得します。保存済みの検証子があれば条件付きリクエストを送ります。
+
+        Args:
+            url: 取得する URL
+
+        Returns:
+            dict | list: パース済み JSON
+        """
+        cached = self._load_cache(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = requests.get(url, headers=headers, timeout=self.TIMEOUT_SECONDS)
+
+        if response.status_code == 304 and cached:
+            self.not_modified_urls.add(url)
+            return cached["body"]
+
+        response.raise_for_status()
+        body = response.json()
+        self._pending_cache[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        }
+        return body
+
+    def commit_cache(self) -> None:
+        """
+        取得済みの検証子と JSON を保存します。取得内容を DB に反映した後に呼び出してください。
+        """
+        for url, entry in self._pending_cache.items():
+            self._save_cache(url, entry)
+        self._pending_cache.clear()
+
+    def is_all_not_modified(self, urls: list[str]) -> bool:
+        """
+        指定した URL がすべて 304 Not Modified だったかどうかを返します。
+
+        Args:
+            urls: 判定対象の URL のリスト
+
+        Returns:
+            bool: すべて前回から変化がなければ True
+        """
+        return bool(urls) and set(urls) <= self.not_modified_urls
+
+    def _cache_path(self, url: str) -> str:
+        filename = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(self.cache_dir, filename)
+
+    def _load_cache(self, url: str) -> dict | None:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, url: str, entry: dict) -> None:
+        if not self.cache_dir or not (entry["etag"] or entry["last_modified"]):
+            return
+        with open(self._cache_path(url), "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
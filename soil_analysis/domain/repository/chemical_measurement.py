@@ -19,6 +19,47 @@ class SoilChemicalMeasurementRepository:
         """
         return SoilChemicalMeasurement.objects.filter(land_ledger=land_ledger).first()
 
+    @staticmethod
+    def get_by_ledger_ids(
+        land_ledger_ids: list[int],
+    ) -> dict[int, SoilChemicalMeasurement]:
+        """
+        複数の帳簿に紐づく化学分析データを1クエリで取得します
+
+        Args:
+            land_ledger_ids: 帳簿IDのリスト
+
+        Returns:
+            dict[int, SoilChemicalMeasurement]: 帳簿ID → 化学分析データ
+        """
+        return {
+            measurement.land_ledger_id: measurement
+            for measurement in SoilChemicalMeasurement.objects.filter(
+                land_ledger_id__in=land_ledger_ids
+            )
+        }
+
+    @staticmethod
+    def iter_by_company(company_id: int, chunk_size: int = 500):
+        """
+        会社に属する圃場の化学分析データを、台帳・圃場・時期とあわせて少しずつ取得します
+
+        Args:
+            company_id: 会社ID
+            chunk_size: 1回のフェッチで取得する件数
+
+        Returns:
+            Iterator[SoilChemicalMeasurement]: 圃場名・時期順のイテレータ
+        """
+        return (
+            SoilChemicalMeasurement.objects.filter(
+                land_ledger__land__company_id=company_id
+            )
+            .select_related("land_ledger__land", "land_ledger__land_period")
+            .order_by("land_ledger__land__name", "land_ledger__land_period__year", "pk")
+            .iterator(chunk_size=chunk_size)
+        )
+
     @staticmethod
     def validate_analysis_numbers(rows: list) -> list[str]:
         """
@@ -1,4 +1,4 @@
-from django.db.models import Count, Min, Max, Avg
+from django.db.models import Count, Min, Max, Avg, OuterRef, Subquery, Sum
 
 from soil_analysis.domain.valueobject.hardness import FolderStats
 from soil_analysis.models import SoilHardnessMeasurement, LandLedger, Land
@@ -216,6 +216,75 @@ class SoilHardnessMeasurementRepository:
             .order_by("land_block__name", "depth")
         )
 
+    @staticmethod
+    def get_block_averages_for_ledgers(
+        land_ledger_ids: list[int],
+    ) -> dict[int, dict[str, float | None]]:
+        """
+        複数台帳のブロックごとの平均圧力を1クエリで取得します。
+
+        Args:
+            land_ledger_ids: 台帳IDのリスト
+
+        Returns:
+            dict[int, dict[str, float | None]]: 台帳ID → {ブロック名: 平均圧力}
+        """
+        stats = (
+            SoilHardnessMeasurement.objects.filter(land_ledger_id__in=land_ledger_ids)
+            .values("land_ledger_id", "land_block__name")
+            .annotate(avg_pressure=Avg("pressure"))
+        )
+        result: dict[int, dict[str, float | None]] = {}
+        for item in stats:
+            if item["land_block__name"]:
+                result.setdefault(item["land_ledger_id"], {})[
+                    item["land_block__name"]
+                ] = item["avg_pressure"]
+        return result
+
+    @staticmethod
+    def get_depth_averages_for_ledgers(land_ledger_ids: list[int]) -> list[dict]:
+        """
+        複数台帳のブロックごと、深度ごとの平均圧力を1クエリで取得します。
+
+        Args:
+            land_ledger_ids: 台帳IDのリスト
+
+        Returns:
+            list[dict]: 台帳ID、ブロック名、深度、平均圧力を含む辞書のリスト
+        """
+        return list(
+            SoilHardnessMeasurement.objects.filter(land_ledger_id__in=land_ledger_ids)
+            .values("land_ledger_id", "land_block__name", "depth")
+            .annotate(avg_pressure=Avg("pressure"))
+            .order_by("land_ledger_id", "land_block__name", "depth")
+        )
+
+    @staticmethod
+    def get_ledger_signatures(land_ledger_ids: list[int]) -> dict[int, dict]:
+        """
+        台帳ごとの測定データの変化を検知するための要約値を取得します。
+        件数・最大ID・最終更新日時・圧力合計のいずれかが変われば集計をやり直す必要があります。
+
+        Args:
+            land_ledger_ids: 台帳IDのリスト
+
+        Returns:
+            dict[int, dict]: 台帳ID → 要約値
+        """
+        stats = (
+            SoilHardnessMeasurement.objects.filter(land_ledger_id__in=land_ledger_ids)
+            .values("land_ledger_id")
+            .annotate(
+                count=Count("id"),
+                max_id=Max("id"),
+                max_updated_at=Max("updated_at"),
+                pressure_sum=Sum("pressure"),
+            )
+            .order_by()
+        )
+        return {item.pop("land_ledger_id"): item for item in stats}
+
     @staticmethod
     def get_total_groups_count() -> int:
         """
@@ -246,54 +315,56 @@ class SoilHardnessMeasurementRepository:
         """
         関連付け用のフォルダグループを取得します。
 
+        フォルダ単位の件数・メモリー範囲・測定日時範囲・代表データIDを
+        1本の集計クエリで取得し、代表データは in_bulk でまとめて読み込むため、
+        フォルダ数に関係なくクエリ数は一定（2本）です。
+
         Returns:
             list[dict]: フォルダグループ情報のリスト
         """
-        # フォルダ単位でグループ化されたデータを取得
-        folder_groups = (
-            SoilHardnessMeasurement.objects.filter(land_block__isnull=True)
-            .values("folder")
-            .distinct()
+        unassociated = SoilHardnessMeasurement.objects.filter(land_block__isnull=True)
+
+        # 代表データ: フォルダ内で (set_memory, depth) が最小のレコード
+        representative_id = (
+            unassociated.filter(folder=OuterRef("folder"))
+            .order_by("set_memory", "depth")
+            .values("id")[:1]
+        )
+        folder_groups = list(
+            unassociated.values("folder")
+            .annotate(
+                count=Count("id"),
+                min_memory=Min("set_memory"),
+                max_memory=Max("set_memory"),
+                min_datetime=Min("set_datetime"),
+                max_datetime=Max("set_datetime"),
+                sample_id=Subquery(representative_id),
+            )
+            .order_by("folder")
         )
 
+        representatives = SoilHardnessMeasurement.objects.select_related(
+            "land_ledger__land__company"
+        ).in_bulk([group["sample_id"] for group in folder_groups])
+
         result = []
-        for folder_group in folder_groups:
-            folder_name = folder_group["folder"]
-
-            # 該当フォルダのレコード数を取得
-            total_count = SoilHardnessMeasurement.objects.filter(
-                folder=folder_name, land_block__isnull=True
-            ).count()
-
-            # 代表データとして最初の1レコードのみを取得
-            representative_measurement = (
-                SoilHardnessMeasurement.objects.filter(
-                    folder=folder_name, land_block__isnull=True
-                )
-                .order_by("set_memory", "depth")
-                .first()
-            )
+        for group in folder_groups:
+            representative_measurement = representatives.get(group["sample_id"])
+            if representative_measurement is None:
+                continue
 
-            if representative_measurement:
-                # メモリー番号の範囲を計算
-                memory_numbers = list(
-                    SoilHardnessMeasurement.objects.filter(
-                        folder=folder_name, land_block__isnull=True
-                    )
-                    .values_list("set_memory", flat=True)
-                    .distinct()
-                )
-                min_memory = min(memory_numbers)
-                max_memory = max(memory_numbers)
-
-                group = {
+            result.append(
+                {
                     "memory_anchor": representative_measurement.set_memory,
                     "measurements": [representative_measurement],
-                    "folder_name": folder_name,
-                    "count": total_count,
-                    "min_memory": min_memory,
-                    "max_memory": max_memory,
+                    "folder_name": group["folder"],
+                    "count": group["count"],
+                    "min_memory": group["min_memory"],
+                    "max_memory": group["max_memory"],
+                    "min_datetime": group["min_datetime"],
+                    "max_datetime": group["max_datetime"],
+                    "sample_id": group["sample_id"],
                 }
-                result.append(group)
+            )
 
         return result
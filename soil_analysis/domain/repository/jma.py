@@ -1,4 +1,12 @@
-from soil_analysis.models import JmaPrefecture, JmaRegion, JmaAmedas
+from django.db import transaction
+
+from soil_analysis.models import (
+    JmaPrefecture,
+    JmaRegion,
+    JmaAmedas,
+    JmaWeather,
+    JmaWarning,
+)
 
 
 class JmaRepository:
@@ -44,3 +52,33 @@ class JmaRepository:
             )
 
         return amedas_code_in_region
+
+    @staticmethod
+    def replace_weathers(jma_weather_list: list[JmaWeather]) -> None:
+        """
+        天気予報テーブルの中身を、組み立て済みの新しい行で丸ごと入れ替える。
+
+        取得・組み立てはトランザクションの外で済ませ、削除と一括登録だけを
+        1つの短いトランザクションで行う。読み手は入れ替え前か入れ替え後のどちらかを参照し、
+        空のテーブルを見ることはない。登録に失敗した場合はロールバックされ、旧データが残る。
+
+        Args:
+            jma_weather_list (list[JmaWeather]): 登録する天気予報（未保存のインスタンス）
+        """
+        with transaction.atomic():
+            JmaWeather.objects.all().delete()
+            JmaWeather.objects.bulk_create(jma_weather_list)
+
+    @staticmethod
+    def replace_warnings(jma_warning_list: list[JmaWarning]) -> None:
+        """
+        警報・注意報テーブルの中身を、組み立て済みの新しい行で丸ごと入れ替える。
+
+        入れ替えの考え方は replace_weathers と同じ。
+
+        Args:
+            jma_warning_list (list[JmaWarning]): 登録する警報・注意報（未保存のインスタンス）
+        """
+        with transaction.atomic():
+            JmaWarning.objects.all().delete()
+            JmaWarning.objects.bulk_create(jma_warning_list)
@@ -0,0 +1,87 @@
+from django.db import connection, transaction
+
+from soil_analysis.models import LandLedgerAssessment
+
+
+class LandLedgerAssessmentRepository:
+    """
+    LandLedgerAssessment（台帳ごとの判定集計キャッシュ）のデータアクセスを担当するRepository
+    """
+
+    UPDATE_FIELDS = [
+        "measurement_digest",
+        "chemical_values",
+        "hardness_block_averages",
+        "hardness_depth_averages",
+        "updated_at",
+    ]
+
+    @staticmethod
+    def get_by_ledger_ids(
+        land_ledger_ids: list[int],
+    ) -> dict[int, LandLedgerAssessment]:
+        """
+        台帳IDをキーとした集計キャッシュを取得します
+
+        Args:
+            land_ledger_ids: 台帳IDのリスト
+
+        Returns:
+            dict[int, LandLedgerAssessment]: 台帳ID → 集計キャッシュ
+        """
+        return {
+            assessment.land_ledger_id: assessment
+            for assessment in LandLedgerAssessment.objects.filter(
+                land_ledger_id__in=land_ledger_ids
+            )
+        }
+
+    @staticmethod
+    def save_all(
+        to_create: list[LandLedgerAssessment], to_update: list[LandLedgerAssessment]
+    ) -> None:
+        """
+        新規分は bulk_create、既存分は bulk_update でまとめて保存します
+
+        同じ台帳を同時に作成した場合に一意制約違反にならないよう、新規分は upsert で書き込みます。
+
+        Args:
+            to_create: 新規に作成する集計キャッシュ
+            to_update: 更新する集計キャッシュ
+        """
+        with transaction.atomic():
+            if to_create:
+                LandLedgerAssessment.objects.bulk_create(
+                    to_create,
+                    update_conflicts=True,
+                    # MySQL の ON DUPLICATE KEY UPDATE は一意キーを指定できない
+                    unique_fields=(
+                        ["land_ledger"]
+                        if connection.features.supports_update_conflicts_with_target
+                        else None
+                    ),
+                    update_fields=LandLedgerAssessmentRepository.UPDATE_FIELDS,
+                )
+            if to_update:
+                LandLedgerAssessment.objects.bulk_update(
+                    to_update, LandLedgerAssessmentRepository.UPDATE_FIELDS
+                )
+
+    @staticmethod
+    def delete_by_ledger_ids(land_ledger_ids) -> None:
+        """
+        指定した台帳の集計キャッシュを削除します（取り込み時の無効化用）
+
+        Args:
+            land_ledger_ids: 台帳IDの集合
+        """
+        LandLedgerAssessment.objects.filter(
+            land_ledger_id__in=list(land_ledger_ids)
+        ).delete()
+
+    @staticmethod
+    def delete_all() -> None:
+        """
+        全台帳の集計キャッシュを削除します（測定データの全件削除時の無効化用）
+        """
+        LandLedgerAssessment.objects.all().delete()
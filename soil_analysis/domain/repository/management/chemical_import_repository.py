@@ -1,3 +1,5 @@
+import re
+
 from django.db import transaction
 
 from soil_analysis.domain.repository.chemical_import_error import (
@@ -17,6 +19,8 @@ class ChemicalImportRepository:
     化学分析データの永続化を担当するリポジトリ
     """
 
+    BULK_BATCH_SIZE = 500
+
     @classmethod
     def exists_ledger(cls, land_ledger_id: int) -> bool:
         """
@@ -49,6 +53,23 @@ class ChemicalImportRepository:
             remark=remark,
         )
 
+    @classmethod
+    def create_errors(cls, messages: list[str]):
+        """
+        エラーメッセージ（"row=N: ..." 形式）から行番号を拾い、まとめて記録する
+        """
+        errors = []
+        for message in messages:
+            match = re.search(r"row=(\d+):", message)
+            errors.append(
+                {
+                    "row_number": int(match.group(1)) if match else None,
+                    "land_name": None,
+                    "message": message,
+                }
+            )
+        ChemicalImportErrorRepository.bulk_create(errors)
+
     @classmethod
     def validate_analysis_numbers(cls, rows: list) -> list[str]:
         """
@@ -106,13 +127,15 @@ class ChemicalImportRepository:
                         created_count += 1
 
                 if to_create:
-                    SoilChemicalMeasurement.objects.bulk_create(to_create)
+                    SoilChemicalMeasurement.objects.bulk_create(
+                        to_create, batch_size=cls.BULK_BATCH_SIZE
+                    )
                 if to_update:
                     update_fields = list(measurements_data[0]["record_values"].keys())
                     if source_file:
                         update_fields.append("source_file")
                     SoilChemicalMeasurement.objects.bulk_update(
-                        to_update, update_fields
+                        to_update, update_fields, batch_size=cls.BULK_BATCH_SIZE
                     )
 
             return {"created": created_count, "updated": updated_count}
@@ -9,6 +9,7 @@ from soil_analysis.domain.repository.chemical_import_error import (
 from soil_analysis.domain.repository.chemical_measurement import (
     SoilChemicalMeasurementRepository,
 )
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
 from soil_analysis.domain.valueobject.management.chemical_import_parser import (
     ChemicalImportParser,
     ChemicalKawadaRow as KawadaRow,
@@ -261,6 +262,8 @@ class ChemicalImportService:
                     update_fields.append("source_file")
                 SoilChemicalMeasurement.objects.bulk_update(to_update, update_fields)
 
+            ReportAssessmentService.invalidate(ledger_stats.keys())
+
         summary = []
         for stat in ledger_stats.values():
             ledger = stat["ledger"]
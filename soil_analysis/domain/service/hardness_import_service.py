@@ -9,6 +9,7 @@ from soil_analysis.domain.repository.hardness_measurement import (
     SoilHardnessMeasurementRepository,
 )
 from soil_analysis.domain.repository.sampling_order import SamplingOrderRepository
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
 from soil_analysis.domain.valueobject.management.hardness_import_parser import (
     HardnessImportParser,
     HardnessRow,
@@ -166,6 +167,10 @@ class HardnessImportService:
         max_depth = max(m.set_depth for m in hardness_measurements)
         records_per_block = max_depth * cls.SAMPLING_TIMES_PER_BLOCK
 
+        # 付け替え前の帳簿も集計が変わるので、あとで判定キャッシュを無効化する
+        affected_ledger_ids = {m.land_ledger_id for m in hardness_measurements}
+        affected_ledger_ids.add(land_ledger.id)
+
         needle = 0
         land_block_count = len(land_block_orders)
         current_time = timezone.now()
@@ -183,4 +188,5 @@ class HardnessImportService:
         SoilHardnessMeasurementRepository.bulk_update(
             hardness_measurements, fields=["land_block", "land_ledger", "updated_at"]
         )
+        ReportAssessmentService.invalidate(affected_ledger_ids)
         return True
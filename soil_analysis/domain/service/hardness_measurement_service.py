@@ -31,6 +31,25 @@ class HardnessMeasurementService:
         # 2. ブロックごと、深度ごとの平均圧力を計算（スパークライン用）
         depth_stats = SoilHardnessMeasurementRepository.get_depth_averages(land_ledger)
 
+        return HardnessMeasurementService.build_assessment(
+            measurements_by_block, depth_stats
+        )
+
+    @staticmethod
+    def build_assessment(
+        measurements_by_block: dict[str, float | None], depth_stats: list[dict]
+    ) -> HardnessAssessmentVO:
+        """
+        ブロック別・深度別の平均圧力から、9ブロック分を補完した HardnessAssessmentVO を作る。
+
+        Args:
+            measurements_by_block: ブロック名 → 平均圧力
+            depth_stats: land_block__name, depth, avg_pressure を含む辞書のリスト
+
+        Returns:
+            HardnessAssessmentVO: 集計結果
+        """
+        measurements_by_block = dict(measurements_by_block)
         depth_data_by_block = {}
         for item in depth_stats:
             block_name = item["land_block__name"]
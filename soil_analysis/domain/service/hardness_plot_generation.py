@@ -1,63 +1,102 @@
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from django.core.files.base import ContentFile
 
-from config import settings
 from soil_analysis.domain.service.management.commands.soil_hardness_plotter import (
     SoilHardnessPlotterService,
 )
 from soil_analysis.domain.valueobject.management.commands.soil_hardness_plot import (
-    SoilHardnessPlotName,
+    SoilHardnessPlotData,
+    SoilHardnessPlotImage,
 )
 from soil_analysis.models import SoilHardnessMeasurement, LandLedger
 
+logger = logging.getLogger(__name__)
 
-def _generate_single_plot(land_ledger_id: int) -> bool:
+
+def _save_plot_image(land_ledger: LandLedger, image: SoilHardnessPlotImage) -> None:
     """
-    単一のプロットを生成してLandLedgerモデルに保存
+    描画済みのプロットをストレージへ保存し、ダイジェストをLandLedgerに記録
 
     Args:
-        land_ledger_id: LandLedgerのID
-
-    Returns:
-        bool: 生成成功フラグ
+        land_ledger: 保存先のLandLedger
+        image: 描画済みのプロット
     """
-    land_ledger = LandLedger.objects.get(id=land_ledger_id)
+    land_ledger.hardness_image_digest = image.digest
+    land_ledger.hardness_image.save(
+        image.filename, ContentFile(image.content), save=False
+    )
+    land_ledger.save(update_fields=["hardness_image", "hardness_image_digest"])
 
-    plotter = SoilHardnessPlotterService(output_dir=settings.MEDIA_ROOT)
-    plot_path = plotter.plot_3d_surface(land_ledger_id)
 
-    if plot_path:
-        try:
-            with open(plot_path, "rb") as f:
-                filename = SoilHardnessPlotName.build_filename(
-                    land_ledger_id=land_ledger_id,
-                    sampling_date=land_ledger.sampling_date,
-                )
-                land_ledger.hardness_image.save(
-                    filename, ContentFile(f.read()), save=True
-                )
-            os.remove(plot_path)
-            return True
-        except (OSError, PermissionError) as e:
-            # ファイル削除エラーは無視して続行
-            # OneDriveなどの同期フォルダではこの例外が発生することがある
-            print(f"File operation error (ignoring): {e}")
-            return True
+class HardnessPlotGenerationService:
+    # プロセスプールの起動コストに見合わない件数ではインプロセスで描画する
+    MIN_PLOTS_FOR_POOL = 2
 
-    return False
+    @staticmethod
+    def _render_all(
+        plot_data_list: list[SoilHardnessPlotData], parallel: bool
+    ) -> tuple[list[SoilHardnessPlotImage], list[str]]:
+        """
+        プロットを描画（parallel指定かつ2件以上はプロセスプールで並列描画）
 
+        Args:
+            plot_data_list: 描画対象のプロット用データ
+            parallel: プロセスプールを使うか（バッチ処理専用。Webリクエストでは使わない）
+
+        Returns:
+            tuple[list[SoilHardnessPlotImage], list[str]]: (描画結果, エラーメッセージリスト)
+        """
+        images = []
+        errors = []
+
+        if (
+            not parallel
+            or len(plot_data_list) < HardnessPlotGenerationService.MIN_PLOTS_FOR_POOL
+        ):
+            for plot_data in plot_data_list:
+                try:
+                    images.append(plot_data.render())
+                except Exception as e:
+                    errors.append(
+                        f"圃場ID {plot_data.land_ledger_id}の画像生成でエラー: {str(e)}"
+                    )
+            return images, errors
+
+        max_workers = min(len(plot_data_list), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(plot_data.render): plot_data.land_ledger_id
+                for plot_data in plot_data_list
+            }
+            for future in as_completed(futures):
+                try:
+                    images.append(future.result())
+                except Exception as e:
+                    errors.append(
+                        f"圃場ID {futures[future]}の画像生成でエラー: {str(e)}"
+                    )
+
+        return images, errors
 
-class HardnessPlotGenerationService:
     @staticmethod
     def generate_and_save_plots(
         land_ledger_ids: list[int] | None = None,
+        parallel: bool = False,
     ) -> tuple[int, list[str]]:
         """
         関連付けされたデータからプロットを生成してLandLedgerモデルに保存
 
+        測定データのダイジェストが前回描画時と変わっていない帳簿はスキップします。
+        描画はメモリ上のバッファにPNGを書き出すため、一時ファイルは作成しません。
+        プロセスプールによる並列描画は管理コマンドなどのバッチ処理からのみ指定し、
+        Webリクエスト内では逐次描画します。
+
         Args:
             land_ledger_ids: 対象とするLandLedgerのIDリスト。Noneの場合は全ての関連付け済みデータを対象とする。
+            parallel: Trueの場合はプロセスプールで並列描画する
 
         Returns:
             tuple[int, list[str]]: (生成成功数, エラーメッセージリスト)
@@ -72,15 +111,45 @@ class HardnessPlotGenerationService:
         if not land_ledger_ids:
             return 0, []
 
-        generated_count = 0
         errors = []
+        land_ledgers = LandLedger.objects.in_bulk(land_ledger_ids)
+        plot_data_map = SoilHardnessPlotterService.load_plot_data(land_ledger_ids)
 
         for land_ledger_id in land_ledger_ids:
+            if land_ledger_id not in plot_data_map:
+                errors.append(
+                    f"圃場ID {land_ledger_id}の画像生成でエラー: "
+                    f"Soil hardness measurement data not found: land_ledger_id={land_ledger_id}"
+                )
+
+        # 測定データが前回描画時から変わっていない帳簿はスキップ
+        targets = [
+            plot_data
+            for land_ledger_id, plot_data in plot_data_map.items()
+            if not (
+                land_ledgers[land_ledger_id].hardness_image
+                and land_ledgers[land_ledger_id].hardness_image_digest
+                == plot_data.digest
+            )
+        ]
+
+        images, render_errors = HardnessPlotGenerationService._render_all(
+            targets, parallel
+        )
+        errors.extend(render_errors)
+
+        generated_count = 0
+        for image in images:
             try:
-                success = _generate_single_plot(land_ledger_id)
-                if success:
-                    generated_count += 1
+                _save_plot_image(land_ledgers[image.land_ledger_id], image)
+                generated_count += 1
+                logger.info(
+                    f"圃場ID {image.land_ledger_id}の画像生成: "
+                    f"{image.elapsed_seconds:.2f}秒 ({len(image.content)}バイト)"
+                )
             except Exception as e:
-                errors.append(f"圃場ID {land_ledger_id}の画像生成でエラー: {str(e)}")
+                errors.append(
+                    f"圃場ID {image.land_ledger_id}の画像生成でエラー: {str(e)}"
+                )
 
         return generated_count, errors
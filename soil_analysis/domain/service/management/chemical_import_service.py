@@ -1,11 +1,11 @@
 import os
-import re
 
 from openpyxl import load_workbook
 
 from soil_analysis.domain.repository.management.chemical_import_repository import (
     ChemicalImportRepository,
 )
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
 from soil_analysis.domain.valueobject.management.chemical_import_parser import (
     ChemicalImportParser,
 )
@@ -25,30 +25,26 @@ class ChemicalImportService:
             raise FileNotFoundError(f"ファイル '{file_path}' が見つかりません。")
 
         try:
-            workbook = load_workbook(file_path, data_only=True)
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
         except PermissionError:
             raise PermissionError(
                 f"ファイル '{file_path}' へのアクセスが拒否されました。Excelで開いている場合は閉じてください。"
             )
 
-        if len(workbook.sheetnames) != 1:
-            raise ValueError(
-                f"Excelファイルのシート数が1ではありません（{len(workbook.sheetnames)}枚）。シートは1枚にしてください。"
-            )
+        try:
+            if len(workbook.sheetnames) != 1:
+                raise ValueError(
+                    f"Excelファイルのシート数が1ではありません（{len(workbook.sheetnames)}枚）。シートは1枚にしてください。"
+                )
 
-        worksheet = workbook.active
-        parse_result = ChemicalImportParser.parse_kawada_worksheet(worksheet)
+            worksheet = workbook.active
+            parse_result = ChemicalImportParser.parse_kawada_worksheet(worksheet)
+        finally:
+            # read_only モードはファイルを開いたままにするので明示的に閉じる
+            workbook.close()
 
         if parse_result.errors:
-            for error_msg in parse_result.errors:
-                row_number = None
-                match = re.search(r"row=(\d+):", error_msg)
-                if match:
-                    row_number = int(match.group(1))
-
-                ChemicalImportRepository.create_error(
-                    row_number=row_number, land_name=None, message=error_msg
-                )
+            ChemicalImportRepository.create_errors(parse_result.errors)
             raise ValueError("\n".join(parse_result.errors))
 
         # 分析番号の重複チェック
@@ -56,15 +52,7 @@ class ChemicalImportService:
             parse_result.rows
         )
         if analysis_errors:
-            for error_msg in analysis_errors:
-                row_number = None
-                match = re.search(r"row=(\d+):", error_msg)
-                if match:
-                    row_number = int(match.group(1))
-
-                ChemicalImportRepository.create_error(
-                    row_number=row_number, land_name=None, message=error_msg
-                )
+            ChemicalImportRepository.create_errors(analysis_errors)
             raise ValueError("\n".join(analysis_errors))
 
         if not parse_result.rows:
@@ -90,5 +78,6 @@ class ChemicalImportService:
         result = ChemicalImportRepository.save_measurements(
             measurements_data, source_file=os.path.basename(file_path)
         )
+        ReportAssessmentService.invalidate([land_ledger_id])
 
         return result
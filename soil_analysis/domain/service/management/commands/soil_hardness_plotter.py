@@ -1,14 +1,8 @@
 import os
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import numpy as np
-
 from soil_analysis.models import SoilHardnessMeasurement
 from soil_analysis.domain.valueobject.management.commands.soil_hardness_plot import (
-    SoilHardnessPlotName,
+    SoilHardnessPlotData,
 )
 
 
@@ -24,6 +18,64 @@ class SoilHardnessPlotterService:
     def __init__(self, output_dir: str = "."):
         self.output_dir = output_dir
 
+    @staticmethod
+    def load_plot_data(land_ledger_ids: list[int]) -> dict[int, SoilHardnessPlotData]:
+        """複数帳簿分のプロット用データを1クエリで取得
+
+        Args:
+            land_ledger_ids (list[int]): 対象とする圃場帳簿IDのリスト
+
+        Returns:
+            dict[int, SoilHardnessPlotData]: 帳簿IDをキーとするプロット用データ。
+                                             測定データが存在しない帳簿は含まれません。
+        """
+        rows = (
+            SoilHardnessMeasurement.objects.filter(
+                land_ledger_id__in=land_ledger_ids, land_block__isnull=False
+            )
+            .order_by("land_ledger_id", "land_block__name", "depth")
+            .values_list(
+                "land_ledger_id",
+                "land_ledger__land__company_id",
+                "land_ledger__land__name",
+                "land_ledger__sampling_date",
+                "land_block__name",
+                "depth",
+                "pressure",
+            )
+        )
+
+        headers = {}
+        grouped_rows = {}
+        for (
+            land_ledger_id,
+            company_id,
+            land_name,
+            sampling_date,
+            block_name,
+            depth,
+            pressure,
+        ) in rows:
+            headers.setdefault(land_ledger_id, (company_id, land_name, sampling_date))
+            grouped_rows.setdefault(land_ledger_id, []).append(
+                (block_name, depth, pressure)
+            )
+
+        return {
+            land_ledger_id: SoilHardnessPlotData(
+                land_ledger_id=land_ledger_id,
+                company_id=company_id,
+                land_name=land_name,
+                sampling_date=sampling_date,
+                rows=tuple(grouped_rows[land_ledger_id]),
+            )
+            for land_ledger_id, (
+                company_id,
+                land_name,
+                sampling_date,
+            ) in headers.items()
+        }
+
     def plot_3d_surface(self, land_ledger_id: int | None = None) -> str:
         """土壌硬度測定データの3D表面プロットを生成
 
@@ -41,17 +93,16 @@ class SoilHardnessPlotterService:
 
         Raises:
             SoilHardnessMeasurement.DoesNotExist: 対象のデータが存在しない場合
-            ValueError: データの処理中にインデックスエラーが発生した場合（継続処理）
 
         Note:
             - プロットのZ軸（圧力）は0-3000kPaに固定されます
             - 画像は300dpiの高解像度で保存されます
-            - matplotlibのfigureは自動的にcloseされ、メモリリークを防ぎます
+            - 描画そのものは SoilHardnessPlotData.render が担当します
         """
         # データ取得
         queryset = SoilHardnessMeasurement.objects.select_related(
             "land_ledger__land", "land_block"
-        ).order_by("depth")
+        ).filter(land_block__isnull=False)
 
         if land_ledger_id:
             queryset = queryset.filter(land_ledger_id=land_ledger_id)
@@ -69,63 +120,22 @@ class SoilHardnessPlotterService:
                 f"Soil hardness measurement data not found: {target_info}"
             )
 
-        # 基本情報取得
-        company_id = first_data.land_ledger.land.company_id
-        land = first_data.land_ledger.land.name
-        sampling_date = first_data.land_ledger.sampling_date
-
-        # データ整理
-        land_block_names = list(
-            queryset.values_list("land_block__name", flat=True)
-            .distinct()
-            .order_by("land_block__name")
-        )
-        depth_labels = sorted(queryset.values_list("depth", flat=True).distinct())
-
-        pressure_data = np.full((len(land_block_names), len(depth_labels)), np.nan)
-
-        for data in queryset:
-            try:
-                block_idx = land_block_names.index(data.land_block.name)
-                depth_idx = depth_labels.index(data.depth)
-                pressure_data[block_idx, depth_idx] = data.pressure
-            except ValueError:
-                continue
-
-        # プロット作成
-        fig = plt.figure(figsize=(12, 8))
-        ax = fig.add_subplot(111, projection="3d")
-
-        block_indices = np.arange(
-            len(land_block_names)
-        )  # 例: [0, 1, 2, 3] for ['A1', 'A3', 'B2', 'C1']
-        depth_values = np.array(depth_labels)  # 例: [1, 5, 10, ..., 60]
-        # 3Dプロット用のメッシュグリッド（格子）を作成
-        block_grid, depth_grid = np.meshgrid(block_indices, depth_values)
-        pressure_grid = pressure_data.T
-
-        surf = ax.plot_surface(
-            block_grid, depth_grid, pressure_grid, cmap="viridis", alpha=0.8
+        plot_data = SoilHardnessPlotData(
+            land_ledger_id=land_ledger_id,
+            company_id=first_data.land_ledger.land.company_id,
+            land_name=first_data.land_ledger.land.name,
+            sampling_date=first_data.land_ledger.sampling_date,
+            rows=tuple(
+                queryset.order_by("land_block__name", "depth").values_list(
+                    "land_block__name", "depth", "pressure"
+                )
+            ),
         )
-
-        # X軸: ブロック名をスケール化（['A1', 'A3', 'B2'] → [0, 1, 2]）して等間隔表示
-        ax.set_xticks(np.arange(len(land_block_names)))
-        ax.set_xticklabels(land_block_names)
-        ax.set_xlabel("block")  # X軸全体のラベル
-        ax.set_ylabel("depth (cm)")  # Y軸: 深度（実際の深度値をそのまま使用）
-        ax.set_zlabel("pressure (kPa)")  # Z軸: 圧力値（0-3000kPaの範囲で固定表示）
-        ax.set_zlim(0, 3000)  # z軸を0-3000kPaに固定
-        ax.set_title(f"company_{company_id} - {land} soil_hardness ({sampling_date.strftime('%Y%m%d')})")
-
-        # カラーバー追加（圧力値の色対応表を右側に表示）
-        fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label="kPa")
+        image = plot_data.render()
 
         # 保存
-        filename = SoilHardnessPlotName.build_filename(
-            land_ledger_id=land_ledger_id, sampling_date=sampling_date
-        )
-        save_path = os.path.join(self.output_dir, filename)
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
-        plt.close(fig)
+        save_path = os.path.join(self.output_dir, image.filename)
+        with open(save_path, "wb") as f:
+            f.write(image.content)
 
         return save_path
@@ -1,6 +1,9 @@
 from haversine import haversine, Unit
 
 from lib.geo.valueobject.coord import XarvioCoord
+from soil_analysis.domain.valueobject.photo_processing.land_spatial_index import (
+    LandSpatialIndex,
+)
 from soil_analysis.domain.valueobject.photo_processing.photo import AndroidPhoto
 from soil_analysis.domain.valueobject.photo_processing.photo_land_association import (
     PhotoLandAssociation,
@@ -10,6 +13,27 @@ from soil_analysis.models import Land
 
 
 class PhotoProcessingService:
+    # 直近に構築した空間インデックス（圃場の構成・座標が変わると fingerprint で再構築）
+    _land_index: LandSpatialIndex | None = None
+
+    @classmethod
+    def get_land_index(cls, land_list: list[Land]) -> LandSpatialIndex:
+        """圃場リストに対応する空間インデックスを返します。
+
+        圃場ID・中心座標が前回と同じであればキャッシュ済みのインデックスを再利用し、
+        圃場の追加・削除・座標変更があった場合だけ再構築します。
+
+        Args:
+            land_list: 検索対象の圃場リスト
+
+        Returns:
+            LandSpatialIndex: 空間インデックス
+        """
+        fingerprint = LandSpatialIndex.build_fingerprint(land_list)
+        if cls._land_index is None or cls._land_index.fingerprint != fingerprint:
+            cls._land_index = LandSpatialIndex(land_list)
+        return cls._land_index
+
     def process_photos(
         self, photo_path_list: list[str], land_list: list[Land]
     ) -> list[PhotoLandAssociation]:
@@ -22,17 +46,18 @@ class PhotoProcessingService:
         Returns:
             list[PhotoLandAssociation]: 写真と圃場の紐づけ情報のリスト
         """
-        associations = []
-
-        # 複数の写真ファイルを処理
-        for photo_path in photo_path_list:
-            # IMG20230630190442.jpg のようなファイル名になっている
-            android_photo = AndroidPhoto(photo_path)
-            photo_spot = android_photo.location
+        # IMG20230630190442.jpg のようなファイル名になっている
+        photo_spots = [
+            AndroidPhoto(photo_path).location for photo_path in photo_path_list
+        ]
 
-            # 画像（＝撮影位置）から最も近い圃場を特定
-            nearest_land = self.find_nearest_land(photo_spot, land_list)
+        # 画像（＝撮影位置）から最も近い圃場を一括で特定
+        nearest_lands = self.find_nearest_lands(photo_spots, land_list)
 
+        associations = []
+        for photo_path, photo_spot, nearest_land in zip(
+            photo_path_list, photo_spots, nearest_lands
+        ):
             # 距離を計算
             distance = self.calculate_distance(
                 photo_spot.adjusted_position, nearest_land
@@ -63,16 +88,36 @@ class PhotoProcessingService:
         Returns:
             Land: 最も近いと判断された圃場
         """
-        min_distance = float("inf")
-        nearest_land = None
+        return self.find_nearest_lands([photo_spot], land_list)[0]
+
+    def find_nearest_lands(
+        self, photo_spots: list[PhotoSpot], land_list: list[Land]
+    ) -> list[Land]:
+        """複数の撮影位置について、最も近い圃場をまとめて特定します。
+
+        圃場中心の空間インデックス（BallTree）を使うため、写真 n 枚・圃場 m 件に対して
+        O(n log m) で検索できます。
 
-        for land in land_list:
-            distance = self.calculate_distance(photo_spot.adjusted_position, land)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_land = land
+        Args:
+            photo_spots: 撮影位置情報のリスト
+            land_list: 検索対象の圃場リスト
 
-        return nearest_land
+        Returns:
+            list[Land]: photo_spots と同じ順序の最寄り圃場リスト
+        """
+        if not photo_spots:
+            return []
+        if not land_list:
+            return [None] * len(photo_spots)
+
+        land_index = self.get_land_index(land_list)
+        nearest_indices = land_index.query(
+            [
+                photo_spot.adjusted_position.to_google().to_tuple()
+                for photo_spot in photo_spots
+            ]
+        )
+        return [land_list[i] for i in nearest_indices]
 
     @staticmethod
     def calculate_distance(
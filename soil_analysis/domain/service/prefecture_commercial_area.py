@@ -1,6 +1,9 @@
 from collections import Counter, defaultdict
 from dataclasses import replace
 
+from django.core.cache import cache
+from django.db.models import Count, Sum
+
 from soil_analysis.domain.valueobject.prefecture_commercial_area import (
     DispatchCandidateVO,
     PrefectureCommercialAreaDashboardVO,
@@ -10,7 +13,19 @@ from soil_analysis.domain.valueobject.prefecture_commercial_area import (
     SalesOpportunityCandidateVO,
     WeatherStatsVO,
 )
-from soil_analysis.models import JmaPrefecture, JmaWarning, JmaWeather, Land, LandLedger
+from soil_analysis.models import (
+    Company,
+    Crop,
+    JmaArea,
+    JmaCity,
+    JmaPrefecture,
+    JmaRegion,
+    JmaWarning,
+    JmaWeather,
+    JmaWeatherCode,
+    Land,
+    LandLedger,
+)
 
 
 JAPAN_MAP_PREFECTURES = (
@@ -80,8 +95,30 @@ class PrefectureCommercialAreaService:
     DBモデルやマイグレーションは追加せず、既存データを集計して表示する
     PoC用途のServiceです。後続で市場価格、GraphRAG、物流APIなどを接続する
     場合も、画面側は `PrefectureCommercialAreaDashboardVO` を読むだけで済むようにします。
+
+    集計は都道府県単位の `values().annotate()` で行い、モデルインスタンスは生成しません。
+    組み立てたVOはDjangoのキャッシュに保存し、集計元を書き換えた側が
+    `invalidate()` を呼ぶまで再利用します。フォームや管理画面から保存される
+    モデルは `soil_analysis.signals` で、JMA取得バッチのように一括で入れ替える
+    処理は各コマンドから明示的に無効化します。
     """
 
+    CACHE_KEY = "soil_analysis:prefecture_commercial_area_dashboard"
+
+    # 保存・削除シグナルでキャッシュを無効化する集計元モデル
+    # JmaWarning / JmaWeather は取得バッチが一括で入れ替えるため、コマンド側で無効化する
+    SIGNAL_SOURCE_MODELS = (
+        Company,
+        Crop,
+        JmaArea,
+        JmaCity,
+        JmaPrefecture,
+        JmaRegion,
+        JmaWeatherCode,
+        Land,
+        LandLedger,
+    )
+
     @classmethod
     def build(cls) -> PrefectureCommercialAreaDashboardVO:
         """
@@ -92,6 +129,27 @@ class PrefectureCommercialAreaService:
         圃場が未登録の都道府県も `PrefectureCommercialAreaVO` として返すため、
         「未登録」「稼働」「注意」の状態を日本地図上で欠けなく表現できます。
 
+        Returns:
+            PrefectureCommercialAreaDashboardVO: 都道府県別商圏と配車候補を束ねた表示用VO。
+        """
+        dashboard = cache.get(cls.CACHE_KEY)
+        if dashboard is None:
+            dashboard = cls._build_dashboard()
+            cache.set(cls.CACHE_KEY, dashboard, timeout=None)
+        return dashboard
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        キャッシュ済みのダッシュボードVOを破棄します。集計元を書き換えた後に呼び出します。
+        """
+        cache.delete(cls.CACHE_KEY)
+
+    @classmethod
+    def _build_dashboard(cls) -> PrefectureCommercialAreaDashboardVO:
+        """
+        集計クエリを実行してダッシュボードVOを組み立てます。
+
         Returns:
             PrefectureCommercialAreaDashboardVO: 都道府県別商圏と配車候補を束ねた表示用VO。
         """
@@ -154,18 +212,25 @@ class PrefectureCommercialAreaService:
         stats = defaultdict(
             lambda: {"land_count": 0, "company_ids": set(), "total_area": 0.0}
         )
-        lands = Land.objects.select_related(
-            "company", "jma_city__jma_region__jma_prefecture"
+        prefix = "jma_city__jma_region__jma_prefecture"
+        rows = (
+            Land.objects.values(
+                f"{prefix}__id", f"{prefix}__code", f"{prefix}__name", "company_id"
+            )
+            .annotate(land_count=Count("id"), total_area=Sum("area"))
+            .order_by()
         )
-        for land in lands:
-            japan_map_code = PrefectureCommercialAreaService._get_japan_map_code(
-                land.jma_city.jma_region.jma_prefecture
+        for row in rows:
+            japan_map_code = (
+                PrefectureCommercialAreaService._get_japan_map_code_from_row(
+                    row, prefix
+                )
             )
             if japan_map_code is None:
                 continue
-            stats[japan_map_code]["land_count"] += 1
-            stats[japan_map_code]["company_ids"].add(land.company_id)
-            stats[japan_map_code]["total_area"] += land.area or 0.0
+            stats[japan_map_code]["land_count"] += row["land_count"]
+            stats[japan_map_code]["company_ids"].add(row["company_id"])
+            stats[japan_map_code]["total_area"] += row["total_area"] or 0.0
         return stats
 
     @staticmethod
@@ -207,16 +272,23 @@ class PrefectureCommercialAreaService:
             dict[int, Counter]: JMA都道府県IDをキーにした作物名の出現回数。
         """
         stats = defaultdict(Counter)
-        ledgers = LandLedger.objects.select_related(
-            "crop", "land__jma_city__jma_region__jma_prefecture"
+        prefix = "land__jma_city__jma_region__jma_prefecture"
+        rows = (
+            LandLedger.objects.values(
+                f"{prefix}__id", f"{prefix}__code", f"{prefix}__name", "crop__name"
+            )
+            .annotate(ledger_count=Count("id"))
+            .order_by()
         )
-        for ledger in ledgers:
-            japan_map_code = PrefectureCommercialAreaService._get_japan_map_code(
-                ledger.land.jma_city.jma_region.jma_prefecture
+        for row in rows:
+            japan_map_code = (
+                PrefectureCommercialAreaService._get_japan_map_code_from_row(
+                    row, prefix
+                )
             )
             if japan_map_code is None:
                 continue
-            stats[japan_map_code][ledger.crop.name] += 1
+            stats[japan_map_code][row["crop__name"]] += row["ledger_count"]
         return stats
 
     @staticmethod
@@ -232,16 +304,21 @@ class PrefectureCommercialAreaService:
             PrefectureWarningStatsVO: 都道府県コード別の警報・注意報集計。
         """
         warning_stats = PrefectureWarningStatsVO(stats_by_japan_map_code={})
-        warnings = JmaWarning.objects.select_related("jma_region__jma_prefecture")
-        for warning in warnings:
-            japan_map_code = PrefectureCommercialAreaService._get_japan_map_code(
-                warning.jma_region.jma_prefecture
+        prefix = "jma_region__jma_prefecture"
+        rows = JmaWarning.objects.values(
+            f"{prefix}__id", f"{prefix}__code", f"{prefix}__name", "warnings"
+        )
+        for row in rows:
+            japan_map_code = (
+                PrefectureCommercialAreaService._get_japan_map_code_from_row(
+                    row, prefix
+                )
             )
             if japan_map_code is None:
                 continue
             warning_names = [
                 warning_name.strip()
-                for warning_name in warning.warnings.split(",")
+                for warning_name in row["warnings"].split(",")
                 if warning_name.strip()
             ]
             warning_stats = warning_stats.add_warning_names(
@@ -263,12 +340,21 @@ class PrefectureCommercialAreaService:
             PrefectureWeatherStatsVO: 都道府県コード別の代表天気。
         """
         weather_stats = PrefectureWeatherStatsVO(stats_by_japan_map_code={})
-        weathers = JmaWeather.objects.select_related(
-            "jma_region__jma_prefecture", "jma_weather_code"
+        prefix = "jma_region__jma_prefecture"
+        rows = JmaWeather.objects.values(
+            f"{prefix}__id",
+            f"{prefix}__code",
+            f"{prefix}__name",
+            "reporting_date",
+            "jma_weather_code__name",
+            "jma_weather_code__image",
+            "jma_weather_code__code",
         ).order_by("-reporting_date", "-id")
-        for weather in weathers:
-            japan_map_code = PrefectureCommercialAreaService._get_japan_map_code(
-                weather.jma_region.jma_prefecture
+        for row in rows:
+            japan_map_code = (
+                PrefectureCommercialAreaService._get_japan_map_code_from_row(
+                    row, prefix
+                )
             )
             if japan_map_code is None or weather_stats.has_japan_map_code(
                 japan_map_code
@@ -277,10 +363,10 @@ class PrefectureCommercialAreaService:
             weather_stats = weather_stats.add_weather(
                 japan_map_code,
                 WeatherStatsVO(
-                    name=weather.jma_weather_code.name,
-                    icon_image=weather.jma_weather_code.image,
-                    code=weather.jma_weather_code.code,
-                    reporting_date=weather.reporting_date.isoformat(),
+                    name=row["jma_weather_code__name"],
+                    icon_image=row["jma_weather_code__image"],
+                    code=row["jma_weather_code__code"],
+                    reporting_date=row["reporting_date"].isoformat(),
                 ),
             )
         return weather_stats
@@ -370,19 +456,44 @@ class PrefectureCommercialAreaService:
         Raises:
             ValueError: JMAコードから1から47の都道府県コードを取得できない場合。
         """
+        return PrefectureCommercialAreaService._to_japan_map_code(
+            jma_prefecture.id, jma_prefecture.code, jma_prefecture.name
+        )
+
+    @staticmethod
+    def _get_japan_map_code_from_row(row: dict, prefix: str) -> int | None:
+        """
+        `values()` の集計行に含まれるJMA都道府県を japan-map-js のコードへ変換します。
+
+        Args:
+            row: `{prefix}__id`, `{prefix}__code`, `{prefix}__name` を含む集計行。
+            prefix: JMA都道府県までのリレーションパス。
+
+        Returns:
+            int: japan-map-js の都道府県コード。
+
+        Raises:
+            ValueError: JMAコードから1から47の都道府県コードを取得できない場合。
+        """
+        return PrefectureCommercialAreaService._to_japan_map_code(
+            row[f"{prefix}__id"], row[f"{prefix}__code"], row[f"{prefix}__name"]
+        )
+
+    @staticmethod
+    def _to_japan_map_code(prefecture_id: int, code: str, name: str) -> int | None:
         try:
-            japan_map_code = int(jma_prefecture.code[:2])
+            japan_map_code = int(code[:2])
         except (TypeError, ValueError) as error:
             raise ValueError(
                 f"JMA都道府県コードを都道府県コードへ変換できません: "
-                f"id={jma_prefecture.id}, code={jma_prefecture.code}, name={jma_prefecture.name}"
+                f"id={prefecture_id}, code={code}, name={name}"
             ) from error
 
         if 1 <= japan_map_code <= 47:
             return japan_map_code
         raise ValueError(
             f"JMA都道府県コードが1から47の都道府県コードに対応していません: "
-            f"id={jma_prefecture.id}, code={jma_prefecture.code}, name={jma_prefecture.name}"
+            f"id={prefecture_id}, code={code}, name={name}"
         )
 
     @staticmethod
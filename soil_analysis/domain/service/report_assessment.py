@@ -0,0 +1,221 @@
+import hashlib
+import json
+
+from django.utils import timezone
+
+from soil_analysis.domain.repository.chemical_measurement import (
+    SoilChemicalMeasurementRepository,
+)
+from soil_analysis.domain.repository.hardness_measurement import (
+    SoilHardnessMeasurementRepository,
+)
+from soil_analysis.domain.repository.land_ledger_assessment import (
+    LandLedgerAssessmentRepository,
+)
+from soil_analysis.domain.service.hardness_measurement_service import (
+    HardnessMeasurementService,
+)
+from soil_analysis.domain.valueobject.report.chemical_assessment import (
+    ChemicalAssessmentVO,
+)
+from soil_analysis.domain.valueobject.report.hardness_assessment import (
+    HardnessAssessmentVO,
+)
+from soil_analysis.models import LandLedger, LandLedgerAssessment
+
+
+class ReportAssessmentService:
+    """
+    レポート（通知表）の化学・硬度判定を、台帳ごとの集計キャッシュ経由で提供するサービス。
+
+    表示時はキャッシュ行をそのまま信頼し、行が無い台帳だけその場で集計する。
+    測定データの取り込み・紐付けは invalidate() でキャッシュ行を消す。
+    ダイジェストの突き合わせは取りこぼし検出用のバッチ（report_build_assessments）だけが行う。
+    """
+
+    @staticmethod
+    def get_assessments(
+        land_ledger: LandLedger,
+    ) -> tuple[ChemicalAssessmentVO, HardnessAssessmentVO]:
+        """
+        1台帳分の化学判定VOと硬度判定VOを返す。
+
+        キャッシュ行があればダイジェストを確かめずにそのまま使う（1クエリ）。
+
+        Args:
+            land_ledger: 対象の台帳
+
+        Returns:
+            (化学分析判定VO, 硬度判定VO)
+        """
+        cached = LandLedgerAssessmentRepository.get_by_ledger_ids([land_ledger.id])
+        if land_ledger.id in cached:
+            return ReportAssessmentService._to_vos(cached[land_ledger.id])
+        assessments, _ = ReportAssessmentService.sync([land_ledger.id])
+        return assessments[land_ledger.id]
+
+    @staticmethod
+    def refresh_for_company(company_id: int | None = None) -> tuple[int, int]:
+        """
+        会社（省略時は全社）の全台帳について、古くなった集計キャッシュをまとめて作り直す。
+
+        Args:
+            company_id: 会社ID。None なら全台帳が対象
+
+        Returns:
+            (対象台帳数, 作り直した台帳数)
+        """
+        queryset = LandLedger.objects.all()
+        if company_id is not None:
+            queryset = queryset.filter(land__company_id=company_id)
+        ledger_ids = list(queryset.order_by("id").values_list("id", flat=True))
+        _, refreshed_ids = ReportAssessmentService.sync(ledger_ids)
+        return len(ledger_ids), len(refreshed_ids)
+
+    @staticmethod
+    def invalidate(land_ledger_ids) -> None:
+        """
+        測定データの取り込み・紐付けで変わった台帳の集計キャッシュを削除する。
+
+        Args:
+            land_ledger_ids: 台帳IDの集合
+        """
+        land_ledger_ids = [i for i in land_ledger_ids if i]
+        if land_ledger_ids:
+            LandLedgerAssessmentRepository.delete_by_ledger_ids(land_ledger_ids)
+
+    @staticmethod
+    def invalidate_all() -> None:
+        """
+        測定データを全件削除したときに、全台帳の集計キャッシュを削除する。
+        """
+        LandLedgerAssessmentRepository.delete_all()
+
+    @staticmethod
+    def sync(
+        land_ledger_ids: list[int],
+    ) -> tuple[dict[int, tuple[ChemicalAssessmentVO, HardnessAssessmentVO]], list[int]]:
+        """
+        指定台帳の集計キャッシュを測定データと突き合わせ、古いものだけ一括で集計し直す。
+
+        台帳数によらずクエリ数は一定（ダイジェスト用2、キャッシュ1、再集計2、保存2）。
+
+        Args:
+            land_ledger_ids: 台帳IDのリスト
+
+        Returns:
+            (台帳ID → (化学分析判定VO, 硬度判定VO), 作り直した台帳IDのリスト)
+        """
+        land_ledger_ids = list(dict.fromkeys(land_ledger_ids))
+        if not land_ledger_ids:
+            return {}, []
+
+        chemical_by_ledger = SoilChemicalMeasurementRepository.get_by_ledger_ids(
+            land_ledger_ids
+        )
+        signatures = SoilHardnessMeasurementRepository.get_ledger_signatures(
+            land_ledger_ids
+        )
+        digests = {
+            ledger_id: ReportAssessmentService._digest(
+                signatures.get(ledger_id), chemical_by_ledger.get(ledger_id)
+            )
+            for ledger_id in land_ledger_ids
+        }
+
+        cached = LandLedgerAssessmentRepository.get_by_ledger_ids(land_ledger_ids)
+        stale_ids = [
+            ledger_id
+            for ledger_id in land_ledger_ids
+            if ledger_id not in cached
+            or cached[ledger_id].measurement_digest != digests[ledger_id]
+        ]
+        if stale_ids:
+            ReportAssessmentService._rebuild(
+                stale_ids, digests, chemical_by_ledger, cached
+            )
+
+        return {
+            ledger_id: ReportAssessmentService._to_vos(cached[ledger_id])
+            for ledger_id in land_ledger_ids
+        }, stale_ids
+
+    @staticmethod
+    def _rebuild(
+        stale_ids: list[int],
+        digests: dict[int, str],
+        chemical_by_ledger: dict,
+        cached: dict[int, LandLedgerAssessment],
+    ) -> None:
+        """
+        古くなった台帳の集計をまとめてやり直し、cached を更新して保存する。
+        """
+        repository = SoilHardnessMeasurementRepository
+        block_averages = repository.get_block_averages_for_ledgers(stale_ids)
+        depth_averages: dict[int, dict[str, list]] = {}
+        for item in repository.get_depth_averages_for_ledgers(stale_ids):
+            if item["land_block__name"]:
+                depth_averages.setdefault(item["land_ledger_id"], {}).setdefault(
+                    item["land_block__name"], []
+                ).append([item["depth"], item["avg_pressure"]])
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for ledger_id in stale_ids:
+            measurement = chemical_by_ledger.get(ledger_id)
+            values = dict(
+                measurement_digest=digests[ledger_id],
+                chemical_values=(
+                    ChemicalAssessmentVO.from_measurements([measurement]).to_values()
+                    if measurement
+                    else {}
+                ),
+                hardness_block_averages=block_averages.get(ledger_id, {}),
+                hardness_depth_averages=depth_averages.get(ledger_id, {}),
+            )
+            assessment = cached.get(ledger_id)
+            if assessment is None:
+                assessment = LandLedgerAssessment(land_ledger_id=ledger_id, **values)
+                to_create.append(assessment)
+                cached[ledger_id] = assessment
+            else:
+                for field_name, value in values.items():
+                    setattr(assessment, field_name, value)
+                assessment.updated_at = now
+                to_update.append(assessment)
+
+        LandLedgerAssessmentRepository.save_all(to_create, to_update)
+
+    @staticmethod
+    def _to_vos(
+        assessment: LandLedgerAssessment,
+    ) -> tuple[ChemicalAssessmentVO, HardnessAssessmentVO]:
+        depth_stats = [
+            {"land_block__name": block_name, "depth": depth, "avg_pressure": pressure}
+            for block_name, pairs in assessment.hardness_depth_averages.items()
+            for depth, pressure in pairs
+        ]
+        return (
+            ChemicalAssessmentVO.from_values(assessment.chemical_values),
+            HardnessMeasurementService.build_assessment(
+                assessment.hardness_block_averages, depth_stats
+            ),
+        )
+
+    @staticmethod
+    def _digest(hardness_signature: dict | None, chemical_measurement) -> str:
+        """
+        硬度データの要約値と化学分析データの更新日時からダイジェストを作る。
+        """
+        payload = {
+            "hardness": hardness_signature,
+            "chemical": (
+                [chemical_measurement.id, chemical_measurement.updated_at]
+                if chemical_measurement
+                else None
+            ),
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
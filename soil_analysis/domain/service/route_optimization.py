@@ -0,0 +1,186 @@
+import numpy as np
+
+from lib.geo.valueobject.coord import GoogleMapsCoord
+
+EARTH_RADIUS_M = 6371008.8
+
+
+class RouteOptimizationService:
+    """
+    圃場巡回ルートの訪問順序をローカルで最適化するサービス（開いた巡回セールスマン問題）。
+
+    Google Directions API の地点最適化（optimizeWaypoints）は地点数に上限があり、
+    10 地点を超えると課金レートも上がるため、訪問順序はここで計算します。
+    Directions API は決まった順序の経路ジオメトリを描くためだけに使います。
+
+    アルゴリズム:
+        1. haversine 距離行列を作成
+        2. 最近傍法（Nearest Neighbour）で初期解を作成
+        3. 2-opt（区間反転）と Or-opt（1〜3地点の区間移動）で改善が無くなるまで局所探索
+
+    始点は常に先頭の地点に固定します。fix_end=True の場合は終点も末尾の地点に固定します。
+    """
+
+    OR_OPT_MAX_SEGMENT = 3
+    EPSILON = 1e-9
+
+    @staticmethod
+    def distance_matrix(coords: list[GoogleMapsCoord]) -> np.ndarray:
+        """
+        地点間の haversine 距離行列（メートル）を作成します。
+
+        Args:
+            coords: 地点の座標リスト
+
+        Returns:
+            np.ndarray: (n, n) の距離行列
+        """
+        radians = np.radians(np.array([coord.to_tuple() for coord in coords]))
+        latitudes = radians[:, 0][:, None]
+        longitudes = radians[:, 1][:, None]
+
+        d_lat = latitudes.T - latitudes
+        d_lng = longitudes.T - longitudes
+        a = (
+            np.sin(d_lat / 2) ** 2
+            + np.cos(latitudes) * np.cos(latitudes.T) * np.sin(d_lng / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @staticmethod
+    def route_length(route: list[int], distances: np.ndarray) -> float:
+        """
+        訪問順序の総移動距離（メートル）を返します。
+
+        Args:
+            route: 地点インデックスの訪問順序
+            distances: 距離行列
+
+        Returns:
+            float: 総移動距離
+        """
+        return float(sum(distances[a, b] for a, b in zip(route, route[1:])))
+
+    @classmethod
+    def solve(cls, coords: list[GoogleMapsCoord], fix_end: bool = False) -> list[int]:
+        """
+        訪問順序を最適化します。
+
+        Args:
+            coords: 地点の座標リスト（先頭が始点）
+            fix_end: True の場合、末尾の地点を終点に固定する
+
+        Returns:
+            list[int]: coords のインデックスを訪問順に並べたリスト
+        """
+        n = len(coords)
+        if n <= 3:
+            return list(range(n))
+
+        distances = cls.distance_matrix(coords)
+        route = cls._nearest_neighbour(distances, fix_end)
+
+        improved = True
+        while improved:
+            improved = cls._two_opt(route, distances, fix_end)
+            improved = cls._or_opt(route, distances, fix_end) or improved
+
+        return route
+
+    @staticmethod
+    def _nearest_neighbour(distances: np.ndarray, fix_end: bool) -> list[int]:
+        """
+        始点から未訪問の最も近い地点を順にたどって初期解を作成します。
+        """
+        n = len(distances)
+        unvisited = set(range(1, n - 1 if fix_end else n))
+        route = [0]
+        while unvisited:
+            current = route[-1]
+            nearest = min(unvisited, key=lambda i: distances[current, i])
+            route.append(nearest)
+            unvisited.remove(nearest)
+        if fix_end:
+            route.append(n - 1)
+        return route
+
+    @classmethod
+    def _two_opt(cls, route: list[int], distances: np.ndarray, fix_end: bool) -> bool:
+        """
+        2-opt: 区間 route[i..j] を反転して総距離が短くなれば採用します（route を破壊的に更新）。
+
+        Returns:
+            bool: 1回でも改善した場合 True
+        """
+        n = len(route)
+        last_movable = n - 2 if fix_end else n - 1
+        improved_any = False
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, last_movable):
+                a, b = route[i - 1], route[i]
+                for j in range(i + 1, last_movable + 1):
+                    c = route[j]
+                    delta = distances[a, c] - distances[a, b]
+                    if j + 1 < n:
+                        d = route[j + 1]
+                        delta += distances[b, d] - distances[c, d]
+                    if delta < -cls.EPSILON:
+                        route[i : j + 1] = reversed(route[i : j + 1])
+                        improved = improved_any = True
+                        b = route[i]
+        return improved_any
+
+    @classmethod
+    def _or_opt(cls, route: list[int], distances: np.ndarray, fix_end: bool) -> bool:
+        """
+        Or-opt: 1〜3地点の区間を別の位置へ（必要なら反転して）移動し、
+        総距離が短くなれば採用します（route を破壊的に更新）。
+
+        Returns:
+            bool: 1回でも改善した場合 True
+        """
+        improved_any = False
+        improved = True
+        while improved:
+            improved = False
+            n = len(route)
+            last_movable = n - 2 if fix_end else n - 1
+            for length in range(1, cls.OR_OPT_MAX_SEGMENT + 1):
+                for i in range(1, last_movable - length + 2):
+                    segment = route[i : i + length]
+                    prev = route[i - 1]
+                    nxt = route[i + length] if i + length < n else None
+
+                    removal_gain = distances[prev, segment[0]]
+                    if nxt is not None:
+                        removal_gain += (
+                            distances[segment[-1], nxt] - distances[prev, nxt]
+                        )
+
+                    rest = route[:i] + route[i + length :]
+                    lefts = np.array(rest[:-1] if fix_end else rest, dtype=int)
+                    rights = np.array(rest[1:], dtype=int)
+                    best = None
+                    for candidate in (segment, segment[::-1]):
+                        # 挿入位置 k: rest[k-1] と rest[k] の間（fix_end=False なら末尾も可）
+                        costs = distances[lefts, candidate[0]]
+                        costs[: len(rights)] += (
+                            distances[candidate[-1], rights]
+                            - distances[lefts[: len(rights)], rights]
+                        )
+                        k = int(np.argmin(costs))
+                        if costs[k] < removal_gain - cls.EPSILON and (
+                            best is None or costs[k] < best[0]
+                        ):
+                            best = (costs[k], k + 1, candidate)
+
+                    if best is not None:
+                        _, k, candidate = best
+                        route[:] = rest[:k] + list(candidate) + rest[k:]
+                        improved = improved_any = True
+                        break
+                if improved:
+                    break
+        return improved_any
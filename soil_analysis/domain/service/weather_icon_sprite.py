@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.templatetags.static import static
+
+WEATHER_IMAGE_DIR = "soil_analysis/images/weather"
+SPRITE_FILENAME = "sprite.svg"
+INDEX_FILENAME = "sprite.json"
+
+# 1行に並べるアイコン数
+SPRITE_COLUMNS = 10
+
+_SVG_ROOT = re.compile(r"<svg\b([^>]*)>(.*)</svg>\s*$", re.DOTALL)
+_ATTR = re.compile(r'([\w:-]+)="([^"]*)"')
+_ID = re.compile(r'\bid="([^"]+)"')
+_ID_REFERENCE = re.compile(r'(url\(#|href="#)([^)"]+)')
+
+
+def _default_static_dir() -> str:
+    return os.path.join(settings.BASE_DIR, "soil_analysis", "static", WEATHER_IMAGE_DIR)
+
+
+@lru_cache(maxsize=4)
+def _load_index(index_path: str, mtime_ns: int) -> dict:
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class WeatherIconSpriteService:
+    """
+    天気アイコンSVGを1枚のスプライトにまとめ、コード（ファイル名）→位置の索引を提供するサービス。
+
+    スプライトには各アイコンの位置に <view id="icon-100" viewBox="..."/> を置くので、
+    <img src=".../sprite.svg#icon-100"> のようにフラグメントを変えるだけで個別アイコンを表示でき、
+    ブラウザの画像リクエストは1回で済む。索引（sprite.json）は CSS の background-position 等にも使える。
+    """
+
+    @staticmethod
+    def build(svg_dir: str | None = None, output_dir: str | None = None) -> bool:
+        """
+        svg_dir の *.svg からスプライトと索引を作る。
+
+        入力SVGのダイジェストが前回の索引と同じなら書き直さない。
+
+        Args:
+            svg_dir: 個別アイコンSVGのディレクトリ（既定は static の weather/svg）
+            output_dir: スプライトと索引の出力先（既定は static の weather）
+
+        Returns:
+            bool: スプライトを書き直した場合 True
+        """
+        output_dir = output_dir or _default_static_dir()
+        svg_dir = svg_dir or os.path.join(output_dir, "svg")
+        filenames = sorted(f for f in os.listdir(svg_dir) if f.endswith(".svg"))
+
+        sources = {}
+        digest = hashlib.sha256()
+        for filename in filenames:
+            with open(os.path.join(svg_dir, filename), encoding="utf-8") as f:
+                sources[filename] = f.read()
+            digest.update(filename.encode("utf-8"))
+            digest.update(sources[filename].encode("utf-8"))
+        digest = digest.hexdigest()
+
+        index_path = os.path.join(output_dir, INDEX_FILENAME)
+        sprite_path = os.path.join(output_dir, SPRITE_FILENAME)
+        if os.path.exists(index_path) and os.path.exists(sprite_path):
+            with open(index_path, encoding="utf-8") as f:
+                if json.load(f).get("digest") == digest:
+                    return False
+
+        icons = {}
+        for filename, source in sources.items():
+            match = _SVG_ROOT.search(source)
+            if match is None:
+                raise ValueError(f"SVGのルート要素が見つかりません: {filename}")
+            attrs = dict(_ATTR.findall(match.group(1)))
+            icons[filename] = (attrs, match.group(2))
+
+        cell_width = max(float(attrs.get("width", 0)) for attrs, _ in icons.values())
+        cell_height = max(float(attrs.get("height", 0)) for attrs, _ in icons.values())
+
+        index = {}
+        views = []
+        bodies = []
+        for position, (filename, (attrs, body)) in enumerate(icons.items()):
+            name = os.path.splitext(filename)[0]
+            width = float(attrs["width"])
+            height = float(attrs["height"])
+            x = (position % SPRITE_COLUMNS) * cell_width
+            y = (position // SPRITE_COLUMNS) * cell_height
+            view_id = f"icon-{name}"
+            index[filename] = {
+                "view": view_id,
+                "x": x,
+                "y": y,
+                "width": width,
+                "height": height,
+            }
+            views.append(
+                f'<view id="{view_id}" viewBox="{x:g} {y:g} {width:g} {height:g}"/>'
+            )
+            bodies.append(
+                f'<svg x="{x:g}" y="{y:g}" width="{width:g}" height="{height:g}"'
+                f' viewBox="{attrs.get("viewBox", f"0 0 {width:g} {height:g}")}">'
+                f"{WeatherIconSpriteService._prefix_ids(body, f'{name}-')}</svg>"
+            )
+
+        rows = (len(icons) + SPRITE_COLUMNS - 1) // SPRITE_COLUMNS
+        sprite_width = min(len(icons), SPRITE_COLUMNS) * cell_width
+        sprite_height = rows * cell_height
+        sprite = (
+            f'<svg xmlns="http://www.w3.org/2000/svg"'
+            f' xmlns:xlink="http://www.w3.org/1999/xlink"'
+            f' width="{sprite_width:g}" height="{sprite_height:g}"'
+            f' viewBox="0 0 {sprite_width:g} {sprite_height:g}">\n'
+            + "\n".join(views)
+            + "\n"
+            + "\n".join(bodies)
+            + "\n</svg>\n"
+        )
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(sprite_path, "w", encoding="utf-8") as f:
+            f.write(sprite)
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"digest": digest, "sprite": SPRITE_FILENAME, "icons": index},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        return True
+
+    @staticmethod
+    def get_index(output_dir: str | None = None) -> dict:
+        """
+        索引の icons（ファイル名 → view, x, y, width, height）を返す。
+        索引が無ければ空の辞書を返す。ファイルの更新日時が変わるまでは読み直さない。
+        """
+        index_path = os.path.join(output_dir or _default_static_dir(), INDEX_FILENAME)
+        try:
+            mtime_ns = os.stat(index_path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        return _load_index(index_path, mtime_ns).get("icons", {})
+
+    @staticmethod
+    def icon_url(image: str) -> str:
+        """
+        アイコンファイル名（例: 100.svg）から表示用URLを返す。
+        スプライトに含まれていればフラグメント付きのスプライトURL、無ければ個別ファイルのURL。
+        """
+        entry = WeatherIconSpriteService.get_index().get(image)
+        if entry is None:
+            return static(f"{WEATHER_IMAGE_DIR}/svg/{image}")
+        return f"{static(f'{WEATHER_IMAGE_DIR}/{SPRITE_FILENAME}')}#{entry['view']}"
+
+    @staticmethod
+    def _prefix_ids(body: str, prefix: str) -> str:
+        """
+        アイコン内の id と参照（url(#a), href="#a"）に接頭辞を付け、スプライト内での衝突を防ぐ。
+        """
+        ids = set(_ID.findall(body))
+        body = _ID.sub(lambda m: f'id="{prefix}{m.group(1)}"', body)
+        return _ID_REFERENCE.sub(
+            lambda m: (
+                f"{m.group(1)}{prefix}{m.group(2)}"
+                if m.group(2) in ids
+                else m.group(0)
+            ),
+            body,
+        )
@@ -0,0 +1,125 @@
+import io
+import tempfile
+import zipfile
+from collections.abc import Iterable, Iterator
+
+from openpyxl import Workbook
+
+from soil_analysis.domain.valueobject.report.fields import REPORT_FIELDS
+from soil_analysis.models import SoilChemicalMeasurement
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """
+    ZipFile の書き込み先。書かれたバイト列を溜めておき、pop() で取り出す。
+    tell/seek を持たないので ZipFile はデータディスクリプタ付きの非シーク形式で書く。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class WorkbookExportService:
+    """
+    Excel／ZIP のダウンロードを StreamingHttpResponse 向けのチャンク列として生成する
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def iter_workbook(workbook: Workbook) -> Iterator[bytes]:
+        """
+        ワークブックを一時ファイルへ保存し、CHUNK_SIZE ずつ読み出す。
+
+        write_only のワークブックは行を追加した時点で一時ファイルへ書き出されるため、
+        保存時もメモリに全セルを保持しない。
+
+        Args:
+            workbook: 保存するワークブック（write_only=True を想定）
+
+        Yields:
+            bytes: xlsx ファイルの断片
+        """
+        with tempfile.TemporaryFile() as output:
+            workbook.save(output)
+            output.seek(0)
+            while chunk := output.read(WorkbookExportService.CHUNK_SIZE):
+                yield chunk
+
+    @staticmethod
+    def iter_zip(members: Iterable[tuple[str, Iterable[bytes]]]) -> Iterator[bytes]:
+        """
+        (ファイル名, チャンク列) の並びを ZIP に詰めながら逐次返す。
+
+        1ファイル分を書き終えるのを待たず、圧縮済みのバイト列が出来た順に返すので
+        ダウンロードはすぐに始まり、ZIP 全体をメモリに持つこともない。
+
+        Args:
+            members: ZIP に格納するファイル名とその内容（チャンク列）
+
+        Yields:
+            bytes: ZIP ファイルの断片
+        """
+        sink = _ZipStreamSink()
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for filename, chunks in members:
+                with zip_file.open(filename, "w") as entry:
+                    for chunk in chunks:
+                        entry.write(chunk)
+                        if data := sink.pop():
+                            yield data
+                if data := sink.pop():
+                    yield data
+        if data := sink.pop():
+            yield data
+
+    @staticmethod
+    def iter_standard_report(
+        measurements: Iterable[SoilChemicalMeasurement],
+    ) -> Iterator[bytes]:
+        """
+        化学分析レポート（通知表）の項目を1台帳1行で並べた xlsx を生成する。
+
+        ジェネレータなので、クエリの実行と行の書き込みはレスポンスの送出が
+        始まってから行われる。
+
+        Args:
+            measurements: 台帳・圃場・時期を select_related 済みの化学分析データ
+
+        Yields:
+            bytes: xlsx ファイルの断片
+        """
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("通知表")
+        worksheet.append(
+            ["圃場名", "時期", "採土日", "分析番号"]
+            + [
+                f"{field.label} ({field.unit})" if field.unit else field.label
+                for field in REPORT_FIELDS
+            ]
+        )
+        for measurement in measurements:
+            land_ledger = measurement.land_ledger
+            worksheet.append(
+                [
+                    land_ledger.land.name,
+                    f"{land_ledger.land_period.year} {land_ledger.land_period.name}",
+                    land_ledger.sampling_date,
+                    measurement.analysis_number,
+                ]
+                + [getattr(measurement, field.key) for field in REPORT_FIELDS]
+            )
+        yield from WorkbookExportService.iter_workbook(workbook)
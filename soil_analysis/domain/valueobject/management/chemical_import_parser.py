@@ -1,9 +1,36 @@
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 
+import numpy as np
+import pandas as pd
 import unicodedata
 from openpyxl.worksheet.worksheet import Worksheet
 
+# 川田フォーマットの数値列 (列番号, フィールド名, 表示名)
+KAWADA_NUMERIC_COLUMNS = (
+    (4, "ec", "EC"),
+    (5, "ph", "pH"),
+    (6, "cec", "CEC"),
+    (7, "cao", "交換性石灰"),
+    (8, "mgo", "交換性苦土"),
+    (9, "k2o", "交換性加里"),
+    (10, "lime_saturation", "石灰飽和度"),
+    (11, "magnesia_saturation", "苦土飽和度"),
+    (12, "potash_saturation", "加里飽和度"),
+    (13, "base_saturation", "塩基飽和度"),
+    (14, "p2o5", "可給態リン酸"),
+    (15, "phosphorus_absorption", "リン酸吸収係数"),
+    (16, "nh4n", "アンモニア態窒素"),
+    (17, "no3n", "硝酸態窒素"),
+    (18, "humus", "腐植"),
+    (19, "bulk_density", "仮比重"),
+)
+
+
+def _cell_text(row: tuple, col_idx: int) -> str:
+    """セルの値を前後の空白を除いた文字列にする（列が無ければ空文字）"""
+    return str(row[col_idx] if col_idx < len(row) else "").strip()
+
 
 @dataclass(frozen=True)
 class ChemicalKawadaRow:
@@ -89,6 +116,25 @@ class ChemicalKawadaRow:
                 f"数値変換失敗 row={row_number}, column={column_name}, value={raw_value}"
             ) from exc
 
+    @staticmethod
+    def parse_analysis_number(row: tuple, row_number: int) -> int | None:
+        """
+        行の先頭セルを分析番号（整数）に変換する。
+
+        Raises:
+            ValueError: 数値でない、または整数でない場合
+        """
+        raw_analysis_number = ChemicalKawadaRow.parse_numeric_value(
+            row[0], row_number, "分析番号"
+        )
+        if raw_analysis_number is None:
+            return None
+        if not float(raw_analysis_number).is_integer():
+            raise ValueError(
+                f"分析番号は整数で指定してください row={row_number}, column=分析番号, value={row[0]}"
+            )
+        return int(raw_analysis_number)
+
     @classmethod
     def from_excel_row(cls, row: tuple, row_number: int) -> "ChemicalKawadaRow":
         """
@@ -101,45 +147,21 @@ class ChemicalKawadaRow:
         Returns:
             パースされた ChemicalKawadaRow
         """
-
-        def to_str(col_idx: int) -> str:
-            return str(row[col_idx] if col_idx < len(row) else "").strip()
-
-        def to_numeric(col_idx: int, display_name: str) -> float | None:
-            raw_value = row[col_idx] if col_idx < len(row) else None
-            return cls.parse_numeric_value(raw_value, row_number, display_name)
-
-        raw_analysis_number = cls.parse_numeric_value(row[0], row_number, "分析番号")
-        analysis_number = None
-        if raw_analysis_number is not None:
-            if not float(raw_analysis_number).is_integer():
-                raise ValueError(
-                    f"分析番号は整数で指定してください row={row_number}, column=分析番号, value={row[0]}"
-                )
-            analysis_number = int(raw_analysis_number)
+        analysis_number = cls.parse_analysis_number(row, row_number)
+        numeric_values = {
+            field_name: cls.parse_numeric_value(
+                row[col_idx] if col_idx < len(row) else None, row_number, display_name
+            )
+            for col_idx, field_name, display_name in KAWADA_NUMERIC_COLUMNS
+        }
 
         return cls(
             row_number=row_number,
             analysis_number=analysis_number,
-            person_name=to_str(1) or None,
-            land_name=to_str(2),
-            crop=to_str(3) or None,
-            ec=to_numeric(4, "EC"),
-            ph=to_numeric(5, "pH"),
-            cec=to_numeric(6, "CEC"),
-            cao=to_numeric(7, "交換性石灰"),
-            mgo=to_numeric(8, "交換性苦土"),
-            k2o=to_numeric(9, "交換性加里"),
-            lime_saturation=to_numeric(10, "石灰飽和度"),
-            magnesia_saturation=to_numeric(11, "苦土飽和度"),
-            potash_saturation=to_numeric(12, "加里飽和度"),
-            base_saturation=to_numeric(13, "塩基飽和度"),
-            p2o5=to_numeric(14, "可給態リン酸"),
-            phosphorus_absorption=to_numeric(15, "リン酸吸収係数"),
-            nh4n=to_numeric(16, "アンモニア態窒素"),
-            no3n=to_numeric(17, "硝酸態窒素"),
-            humus=to_numeric(18, "腐植"),
-            bulk_density=to_numeric(19, "仮比重"),
+            person_name=_cell_text(row, 1) or None,
+            land_name=_cell_text(row, 2),
+            crop=_cell_text(row, 3) or None,
+            **numeric_values,
         )
 
     def to_dict(self) -> dict[str, float | None]:
@@ -187,10 +209,21 @@ class ChemicalParseResult:
 class ChemicalImportParser:
     """
     川田研究所フォーマットのExcelシートを解析するパーサ
+
+    行を読み進めながら列ごとの配列に詰め替え、数値変換は列単位で pandas.to_numeric に任せる。
+    全角数字や "50%" のように数値として読めなかったセルだけを1件ずつ正規化して変換する。
+    値域チェックも列単位でまとめて行う。
+    read_only で開いたワークシートも受け付ける。
     """
 
     KAWADA_FORMAT_DATA_START_ROW_INDEX = 3
 
+    # 値域（下限, 上限）。指定のない項目は 0 以上であればよい
+    VALUE_RANGES = {
+        "ph": (0.0, 14.0),
+    }
+    DEFAULT_VALUE_RANGE = (0.0, np.inf)
+
     @classmethod
     def parse_kawada_worksheet(cls, worksheet: Worksheet) -> ChemicalParseResult:
         """
@@ -202,30 +235,123 @@ class ChemicalImportParser:
         Returns:
             パース結果（行データとエラーリスト）
         """
-        rows = list(worksheet.iter_rows(values_only=True))
-        if not rows:
+        row_count = 0
+        data_rows: list[tuple[int, tuple]] = []
+        for i, row in enumerate(worksheet.iter_rows(values_only=True)):
+            row_count += 1
+            if i < cls.KAWADA_FORMAT_DATA_START_ROW_INDEX:
+                continue
+            analysis_number_raw = row[0] if len(row) > 0 else ""
+            if not str(analysis_number_raw or "").strip():
+                continue
+            data_rows.append((i + 1, row))
+
+        if row_count == 0:
             return ChemicalParseResult(rows=[], errors=["シートにデータがありません。"])
 
-        if len(rows) <= 2:  # Header is at index 2
+        if row_count <= 2:  # Header is at index 2
             return ChemicalParseResult(
                 rows=[], errors=["ヘッダー行に満たない行数でした。"]
             )
 
-        parsed_rows = []
-        parse_errors = []
+        # row_number -> 最初に見つかったエラー（1行につき1件）
+        row_errors: dict[int, str] = {}
+        row_numbers = [row_number for row_number, _ in data_rows]
 
-        for i in range(cls.KAWADA_FORMAT_DATA_START_ROW_INDEX, len(rows)):
-            row = rows[i]
-            row_number = i + 1
+        analysis_numbers = []
+        for row_number, row in data_rows:
+            try:
+                analysis_numbers.append(
+                    ChemicalKawadaRow.parse_analysis_number(row, row_number)
+                )
+            except ValueError as exc:
+                row_errors.setdefault(row_number, f"row={row_number}: {exc}")
+                analysis_numbers.append(None)
+
+        columns = {}
+        for col_idx, field_name, display_name in KAWADA_NUMERIC_COLUMNS:
+            raw_values = [
+                row[col_idx] if col_idx < len(row) else None for _, row in data_rows
+            ]
+            values = cls._to_float_column(
+                raw_values, row_numbers, display_name, row_errors
+            )
+            cls._validate_range(
+                values, raw_values, row_numbers, field_name, display_name, row_errors
+            )
+            # 行の組み立てでは numpy スカラーを経由しないよう、列ごとに Python の値へ戻す
+            columns[field_name] = [
+                None if value != value else value for value in values.tolist()
+            ]
 
-            analysis_number_raw = row[0] if len(row) > 0 else ""
-            analysis_number = str(analysis_number_raw or "").strip()
-            if not analysis_number:
+        parsed_rows = []
+        for i, (row_number, row) in enumerate(data_rows):
+            if row_number in row_errors:
                 continue
+            parsed_rows.append(
+                ChemicalKawadaRow(
+                    row_number=row_number,
+                    analysis_number=analysis_numbers[i],
+                    person_name=_cell_text(row, 1) or None,
+                    land_name=_cell_text(row, 2),
+                    crop=_cell_text(row, 3) or None,
+                    **{field_name: values[i] for field_name, values in columns.items()},
+                )
+            )
 
+        parse_errors = [row_errors[row_number] for row_number in sorted(row_errors)]
+        return ChemicalParseResult(rows=parsed_rows, errors=parse_errors)
+
+    @staticmethod
+    def _to_float_column(
+        raw_values: list,
+        row_numbers: list[int],
+        display_name: str,
+        row_errors: dict[int, str],
+    ) -> np.ndarray:
+        """
+        1列分の生の値を float 配列にする。欠損・変換失敗は NaN。
+
+        数値セルと素直な数値文字列は pandas.to_numeric で列ごとに変換し、
+        読めなかった非空セルだけを parse_numeric_value で正規化して変換する。
+        """
+        series = pd.Series(raw_values, dtype=object)
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, copy=True)
+        for i in np.flatnonzero(np.isnan(values) & series.notna().to_numpy()):
             try:
-                parsed_rows.append(ChemicalKawadaRow.from_excel_row(row, row_number))
+                parsed = ChemicalKawadaRow.parse_numeric_value(
+                    raw_values[i], row_numbers[i], display_name
+                )
             except ValueError as exc:
-                parse_errors.append(f"row={row_number}: {exc}")
+                row_errors.setdefault(row_numbers[i], f"row={row_numbers[i]}: {exc}")
+                continue
+            if parsed is not None:
+                values[i] = parsed
+        return values
 
-        return ChemicalParseResult(rows=parsed_rows, errors=parse_errors)
+    @classmethod
+    def _validate_range(
+        cls,
+        values: np.ndarray,
+        raw_values: list,
+        row_numbers: list[int],
+        field_name: str,
+        display_name: str,
+        row_errors: dict[int, str],
+    ) -> None:
+        """
+        列全体の値域をまとめてチェックし、範囲外の行にエラーを記録する。
+        """
+        lower, upper = cls.VALUE_RANGES.get(field_name, cls.DEFAULT_VALUE_RANGE)
+        with np.errstate(invalid="ignore"):
+            out_of_range = (values < lower) | (values > upper)
+        for i in np.flatnonzero(out_of_range):
+            row_number = row_numbers[i]
+            range_text = (
+                f"{lower:g}以上" if np.isinf(upper) else f"{lower:g}〜{upper:g}"
+            )
+            row_errors.setdefault(
+                row_number,
+                f"row={row_number}: 値が範囲外です row={row_number}, "
+                f"column={display_name}, value={raw_values[i]}（{range_text}）",
+            )
@@ -1,5 +1,15 @@
+import hashlib
+import io
+import time
+from dataclasses import dataclass
 from datetime import date
 
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
 FILENAME_PATTERN = "soil_hardness_land_ledger_id_{land_ledger_id}_{date}_3d_surface.png"
 
 
@@ -26,3 +36,126 @@ class SoilHardnessPlotName:
         """
         ymd = sampling_date.strftime("%Y%m%d")
         return FILENAME_PATTERN.format(land_ledger_id=land_ledger_id, date=ymd)
+
+
+@dataclass(frozen=True)
+class SoilHardnessPlotImage:
+    """描画済みの土壌硬度3Dプロット
+
+    Attributes:
+        land_ledger_id: 圃場帳簿ID
+        filename: 保存用ファイル名
+        content: PNG画像のバイト列
+        digest: 描画に使用した測定データのダイジェスト
+        elapsed_seconds: 描画に要した秒数
+    """
+
+    land_ledger_id: int | None
+    filename: str
+    content: bytes
+    digest: str
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class SoilHardnessPlotData:
+    """土壌硬度3Dプロットの描画に必要なデータ一式
+
+    DBアクセスを伴わない純粋なデータのみを保持するため、pickle してプロセスプールの
+    ワーカーへそのまま渡すことができます（ワーカー側で Django の初期化は不要）。
+
+    Attributes:
+        land_ledger_id: 圃場帳簿ID（全関連付け済みデータを対象とする場合はNone）
+        company_id: 会社ID
+        land_name: 圃場名
+        sampling_date: 採土日
+        rows: (ブロック名, 深度, 圧力) のタプル列。ブロック名・深度の昇順
+    """
+
+    DPI = 300
+    Z_MAX_PRESSURE = 3000
+
+    land_ledger_id: int | None
+    company_id: int
+    land_name: str
+    sampling_date: date
+    rows: tuple[tuple[str, int, int], ...]
+
+    @property
+    def filename(self) -> str:
+        return SoilHardnessPlotName.build_filename(
+            land_ledger_id=self.land_ledger_id, sampling_date=self.sampling_date
+        )
+
+    @property
+    def digest(self) -> str:
+        """
+        測定データのダイジェスト（SHA-256）を返します。
+
+        ダイジェストが前回描画時と同じであれば、画像を再生成する必要はありません。
+        """
+        payload = "\n".join(
+            f"{block_name}:{depth}:{pressure}"
+            for block_name, depth, pressure in self.rows
+        )
+        header = f"{self.company_id}|{self.land_name}|{self.sampling_date}\n"
+        return hashlib.sha256((header + payload).encode("utf-8")).hexdigest()
+
+    def render(self) -> SoilHardnessPlotImage:
+        """
+        3D表面プロットをメモリ上のバッファへ描画します。
+
+        プロットは圃場内位置（X軸）、深度（Y軸）、圧力（Z軸）の3次元です。
+        一時ファイルを経由せず、PNGのバイト列をそのまま返します。
+
+        Returns:
+            SoilHardnessPlotImage: 描画結果
+        """
+        started = time.perf_counter()
+
+        land_block_names = sorted({block_name for block_name, _, _ in self.rows})
+        depth_labels = sorted({depth for _, depth, _ in self.rows})
+        block_index = {name: i for i, name in enumerate(land_block_names)}
+        depth_index = {depth: i for i, depth in enumerate(depth_labels)}
+
+        pressure_data = np.full((len(land_block_names), len(depth_labels)), np.nan)
+        for block_name, depth, pressure in self.rows:
+            pressure_data[block_index[block_name], depth_index[depth]] = pressure
+
+        fig = plt.figure(figsize=(12, 8))
+        ax = fig.add_subplot(111, projection="3d")
+
+        # 3Dプロット用のメッシュグリッド（格子）を作成
+        block_grid, depth_grid = np.meshgrid(
+            np.arange(len(land_block_names)), np.array(depth_labels)
+        )
+        surf = ax.plot_surface(
+            block_grid, depth_grid, pressure_data.T, cmap="viridis", alpha=0.8
+        )
+
+        # X軸: ブロック名をスケール化（['A1', 'A3', 'B2'] → [0, 1, 2]）して等間隔表示
+        ax.set_xticks(np.arange(len(land_block_names)))
+        ax.set_xticklabels(land_block_names)
+        ax.set_xlabel("block")
+        ax.set_ylabel("depth (cm)")
+        ax.set_zlabel("pressure (kPa)")
+        ax.set_zlim(0, self.Z_MAX_PRESSURE)
+        ax.set_title(
+            f"company_{self.company_id} - {self.land_name} soil_hardness "
+            f"({self.sampling_date.strftime('%Y%m%d')})"
+        )
+
+        # カラーバー追加（圧力値の色対応表を右側に表示）
+        fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label="kPa")
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=self.DPI, bbox_inches="tight")
+        plt.close(fig)
+
+        return SoilHardnessPlotImage(
+            land_ledger_id=self.land_ledger_id,
+            filename=self.filename,
+            content=buffer.getvalue(),
+            digest=self.digest,
+            elapsed_seconds=time.perf_counter() - started,
+        )
@@ -0,0 +1,67 @@
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from soil_analysis.models import Land
+
+
+class LandSpatialIndex:
+    """圃場の中心座標に対する最近傍検索用の空間インデックス。
+
+    scikit-learn の BallTree（haversine 距離）を圃場中心の緯度経度（ラジアン）で構築し、
+    撮影位置から最も近い圃場を O(log m) で検索します。
+
+    fingerprint は圃場IDと中心座標の組から作られるため、圃場の追加・削除や
+    中心座標の変更があると値が変わり、キャッシュ済みのインデックスは再構築されます。
+    インデックスは座標のみを保持し、検索結果は構築時の圃場リストの添字で返します。
+    """
+
+    def __init__(self, land_list: list[Land]):
+        """
+        Args:
+            land_list: インデックス対象の圃場リスト（空でないこと）
+        """
+        if not land_list:
+            raise ValueError("land_list must not be empty")
+
+        coords = [land.to_google().to_tuple() for land in land_list]
+        self._fingerprint = self.build_fingerprint(land_list, coords)
+        self._tree = BallTree(np.radians(np.array(coords)), metric="haversine")
+
+    @staticmethod
+    def build_fingerprint(
+        land_list: list[Land], coords: list[tuple[float, float]] | None = None
+    ) -> tuple:
+        """インデックスの同一性判定に使うキーを作ります。
+
+        Args:
+            land_list: 圃場リスト
+            coords: 計算済みの (緯度, 経度) リスト。省略時は land_list から計算
+
+        Returns:
+            tuple: (圃場ID, 緯度, 経度) のタプル
+        """
+        if coords is None:
+            coords = [land.to_google().to_tuple() for land in land_list]
+        return tuple(
+            (land.id, latitude, longitude)
+            for land, (latitude, longitude) in zip(land_list, coords)
+        )
+
+    @property
+    def fingerprint(self) -> tuple:
+        return self._fingerprint
+
+    def query(self, positions: list[tuple[float, float]]) -> list[int]:
+        """複数の位置に対して最も近い圃場をまとめて検索します。
+
+        Args:
+            positions: (緯度, 経度) のリスト
+
+        Returns:
+            list[int]: positions と同じ順序の、最寄り圃場の添字（圃場リスト上の位置）
+        """
+        if not positions:
+            return []
+
+        _, indices = self._tree.query(np.radians(np.array(positions)), k=1)
+        return [int(i) for i in indices[:, 0]]
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Any
 
 from .chemical_indicator import (
@@ -71,6 +71,31 @@ class ChemicalAssessmentVO:
     mgo: MgoVO = MgoVO(None)
     k2o: K2oVO = K2oVO(None)
 
+    @classmethod
+    def from_values(cls, values: dict[str, float | None]) -> "ChemicalAssessmentVO":
+        """
+        集計済みの値（項目キー → 値）からVOを生成する。
+        キャッシュ（LandLedgerAssessment.chemical_values）からの復元に使う。
+
+        Args:
+            values: 項目キーと値の辞書。空なら全項目欠損として扱う
+
+        Returns:
+            化学分析判定VO
+        """
+        return cls(
+            **{field.name: field.type(values.get(field.name)) for field in fields(cls)}
+        )
+
+    def to_values(self) -> dict[str, float | None]:
+        """
+        キャッシュ保存用に、項目キー → 値 の辞書へ変換する。
+
+        Returns:
+            項目キーと値の辞書
+        """
+        return {field.name: getattr(self, field.name).value for field in fields(self)}
+
     @classmethod
     def from_measurements(cls, measurements: list[Any]) -> "ChemicalAssessmentVO":
         """
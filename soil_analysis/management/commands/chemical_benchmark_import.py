@@ -0,0 +1,152 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from openpyxl import Workbook, load_workbook
+
+from soil_analysis.domain.repository.management.chemical_import_repository import (
+    ChemicalImportRepository,
+)
+from soil_analysis.domain.valueobject.management.chemical_import_parser import (
+    ChemicalImportParser,
+    ChemicalKawadaRow,
+)
+from soil_analysis.models import LandLedger
+
+
+class Command(BaseCommand):
+    """
+    化学分析Excel取り込みのベンチマーク
+
+    合成した川田研究所フォーマットのExcel（既定は50圃場）を使い、
+    - 従来方式: 通常モードで全セルを読み込み、1行ずつ from_excel_row で変換
+    - 現行方式: read_only で流し読みし、列単位で数値変換・値域チェック
+    のパース時間を比較する。
+    未使用の帳簿がDBにあれば、bulk_create による保存時間とクエリ数も計測する
+    （保存はロールバックするのでデータは残らない）。
+
+    使用方法:
+        python manage.py chemical_benchmark_import --lands 50 --repeat 5
+    """
+
+    help = "Benchmark chemical Excel import on a synthetic Kawada-format workbook"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lands", type=int, default=50, help="圃場数（行数）")
+        parser.add_argument("--repeat", type=int, default=5, help="計測回数")
+
+    def handle(self, *args, **options):
+        lands = options["lands"]
+        repeat = options["repeat"]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "chemical_benchmark.xlsx")
+            self._create_workbook(lands).save(file_path)
+
+            legacy = min(
+                self._time(self._parse_legacy, file_path) for _ in range(repeat)
+            )
+            streaming = min(
+                self._time(self._parse_streaming, file_path) for _ in range(repeat)
+            )
+
+            self.stdout.write(f"rows={lands}, repeat={repeat} (best of)")
+            self.stdout.write(f"  parse legacy    : {legacy * 1000:.1f} ms")
+            self.stdout.write(f"  parse streaming : {streaming * 1000:.1f} ms")
+            if streaming > 0:
+                self.stdout.write(f"  speedup         : {legacy / streaming:.1f}x")
+
+            self._benchmark_save(self._parse_streaming(file_path), file_path)
+
+    @staticmethod
+    def _time(func, *args) -> float:
+        started = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def _parse_legacy(file_path: str) -> list[ChemicalKawadaRow]:
+        workbook = load_workbook(file_path, data_only=True)
+        rows = list(workbook.active.iter_rows(values_only=True))
+        return [
+            ChemicalKawadaRow.from_excel_row(row, i + 1)
+            for i, row in enumerate(rows)
+            if i >= ChemicalImportParser.KAWADA_FORMAT_DATA_START_ROW_INDEX and row[0]
+        ]
+
+    @staticmethod
+    def _parse_streaming(file_path: str) -> list[ChemicalKawadaRow]:
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            result = ChemicalImportParser.parse_kawada_worksheet(workbook.active)
+        finally:
+            workbook.close()
+        if result.errors:
+            raise ValueError("\n".join(result.errors))
+        return result.rows
+
+    def _benchmark_save(self, rows: list[ChemicalKawadaRow], file_path: str):
+        ledger_ids = list(
+            LandLedger.objects.filter(soil_chemical_measurement__isnull=True)
+            .order_by("id")
+            .values_list("id", flat=True)[: len(rows)]
+        )
+        if not ledger_ids:
+            self.stdout.write("  save            : skipped (未使用の帳簿がありません)")
+            return
+
+        measurements_data = [
+            {"land_ledger_id": ledger_id, "record_values": row.to_dict()}
+            for ledger_id, row in zip(ledger_ids, rows)
+        ]
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                elapsed = self._time(
+                    ChemicalImportRepository.save_measurements,
+                    measurements_data,
+                    os.path.basename(file_path),
+                )
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"  save            : {elapsed * 1000:.1f} ms "
+            f"({len(measurements_data)} rows, {len(queries)} queries, rolled back)"
+        )
+
+    @staticmethod
+    def _create_workbook(lands: int) -> Workbook:
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("川田研究所レポート")
+        worksheet.append(["Agsoil株式会社", None, "御中"])
+        worksheet.append([])
+        worksheet.append(["分析番号", "氏名", "圃場名", "栽培作物"])
+        for i in range(1, lands + 1):
+            offset = i % 17
+            worksheet.append(
+                [
+                    9900000 + i,
+                    "ベンチマーク",
+                    f"BENCH{i:04d}",
+                    "キャベツ",
+                    round(0.2 + offset * 0.01, 3),
+                    round(6.0 + offset * 0.05, 2),
+                    round(11.0 + offset * 0.3, 1),
+                    round(300.0 + offset * 3.0, 1),
+                    round(45.0 + offset * 1.2, 1),
+                    round(22.0 + offset * 0.8, 1),
+                    round(85.0 + offset * 0.7, 1),
+                    round(18.0 + offset * 0.4, 1),
+                    round(4.0 + offset * 0.2, 1),
+                    f"{105.0 + offset * 0.9:.1f}%",
+                    round(600.0 + offset * 4.0, 1),
+                    round(520.0 + offset * 5.0, 1),
+                    round(0.5 + offset * 0.03, 2),
+                    round(1.0 + offset * 0.08, 2),
+                    f"{2.0 + offset * 0.06:.2f}%",
+                    round(1.0 + offset * 0.01, 2),
+                ]
+            )
+        return workbook
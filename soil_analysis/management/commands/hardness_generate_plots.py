@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from soil_analysis.domain.service.hardness_plot_generation import (
+    HardnessPlotGenerationService,
+)
+
+
+class Command(BaseCommand):
+    help = "Generate soil hardness 3D plots for associated land ledgers in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--land-ledger-ids",
+            type=int,
+            nargs="+",
+            help="Target land ledger IDs (default: all associated ledgers)",
+        )
+
+    def handle(self, *args, **options):
+        success_count, errors = HardnessPlotGenerationService.generate_and_save_plots(
+            options["land_ledger_ids"], parallel=True
+        )
+
+        for error in errors:
+            self.stderr.write(self.style.ERROR(error))
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated {success_count} hardness plot(s).")
+        )
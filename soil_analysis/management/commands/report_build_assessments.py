@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
+
+
+class Command(BaseCommand):
+    """
+    レポート（通知表）の化学・硬度判定の集計キャッシュを作り直す
+
+    測定データのダイジェストが変わった台帳（またはキャッシュが無い台帳）だけを
+    まとめて集計し直す。取り込み後のバッチで実行すれば、レポート表示時の集計が不要になる。
+
+    使用方法:
+        python manage.py report_build_assessments
+        python manage.py report_build_assessments --company-id 1
+    """
+
+    help = "Rebuild stale per-ledger report assessment caches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company-id",
+            type=int,
+            default=None,
+            help="対象の会社ID（省略時は全社）",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total, refreshed = ReportAssessmentService.refresh_for_company(
+            options["company_id"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"ledgers={total}, refreshed={refreshed} ({elapsed:.2f}s)"
+            )
+        )
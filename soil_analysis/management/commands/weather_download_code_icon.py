@@ -1,13 +1,49 @@
+import json
 import os
 import shutil
 
 import requests
 from django.core.management.base import BaseCommand
 
+from soil_analysis.domain.service.weather_icon_sprite import WeatherIconSpriteService
+
+MANIFEST_FILENAME = "manifest.json"
+
 
 class Command(BaseCommand):
+    """
+    気象庁の天気アイコンSVGをダウンロードし、必要ならスプライトにまとめる
+
+    使用方法:
+        python manage.py weather_download_code_icon
+        python manage.py weather_download_code_icon --build-sprite
+        python manage.py weather_download_code_icon --sprite-only
+    """
+
     help = "気象庁の天気アイコンSVGをダウンロードします"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--download-dir",
+            default="~/Downloads/images/",
+            help="ダウンロード先ディレクトリ",
+        )
+        parser.add_argument(
+            "--build-sprite",
+            action="store_true",
+            help="ダウンロード後に、ダウンロードしたアイコンからスプライトを作成する",
+        )
+        parser.add_argument(
+            "--sprite-only",
+            action="store_true",
+            help="ダウンロードせず、スプライトの作成だけを行う（オフライン）",
+        )
+        parser.add_argument(
+            "--svg-dir",
+            default=None,
+            help="スプライトの元にするSVGディレクトリ（既定はダウンロード先。--sprite-only では static の weather/svg）",
+        )
+
     def handle(self, *args, **options):
         # 天気コードのデータ辞書
         # 形式: code: [day_icon, night_icon, telop_code, name, name_en]
@@ -762,21 +798,63 @@ class Command(BaseCommand):
             ],
         }
 
-        # Download svg
+        svg_dir = options["svg_dir"]
+        if not options["sprite_only"]:
+            download_dir = os.path.expanduser(options["download_dir"])
+            self._download(weather_code_data.keys(), download_dir)
+            # ダウンロードした直後のアイコンからスプライトを作る
+            svg_dir = svg_dir or download_dir
+
+        if options["sprite_only"] or options["build_sprite"]:
+            if WeatherIconSpriteService.build(svg_dir=svg_dir):
+                self.stdout.write(self.style.SUCCESS("スプライトを作成しました"))
+            else:
+                self.stdout.write("スプライトは最新です")
+
+    def _download(self, codes, download_dir: str):
+        """
+        アイコンをダウンロードする。前回の ETag / Last-Modified を manifest.json に残しておき、
+        条件付きリクエストで 304 が返ったアイコン（変更なし）は書き直さない。
+        """
         url_base = "https://www.jma.go.jp/bosai/forecast/img/"
-        download_dir = os.path.expanduser("~/Downloads/images/")
+        download_dir = os.path.expanduser(download_dir)
         os.makedirs(download_dir, exist_ok=True)
 
-        for code in weather_code_data.keys():
-            svg_name = f"{code}.svg"
-            url = f"{url_base}{svg_name}"
+        manifest_path = os.path.join(download_dir, MANIFEST_FILENAME)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
 
-            response = requests.get(url, stream=True)
+        with requests.Session() as session:
+            for code in codes:
+                svg_name = f"{code}.svg"
+                url = f"{url_base}{svg_name}"
+                file_path = os.path.join(download_dir, svg_name)
 
-            if response.status_code == 200:
-                with open(os.path.join(download_dir, svg_name), "wb") as f:
-                    response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-                self.stdout.write(self.style.SUCCESS(f"ダウンロード完了: {url}"))
-            else:
-                self.stdout.write(self.style.ERROR(f"ダウンロードエラー: {url}"))
+                headers = {}
+                cached = manifest.get(svg_name, {})
+                if os.path.exists(file_path):
+                    if cached.get("etag"):
+                        headers["If-None-Match"] = cached["etag"]
+                    if cached.get("last_modified"):
+                        headers["If-Modified-Since"] = cached["last_modified"]
+
+                response = session.get(url, headers=headers, stream=True)
+
+                if response.status_code == 304:
+                    self.stdout.write(f"変更なし: {url}")
+                elif response.status_code == 200:
+                    with open(file_path, "wb") as f:
+                        response.raw.decode_content = True
+                        shutil.copyfileobj(response.raw, f)
+                    manifest[svg_name] = {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+                    self.stdout.write(self.style.SUCCESS(f"ダウンロード完了: {url}"))
+                else:
+                    self.stdout.write(self.style.ERROR(f"ダウンロードエラー: {url}"))
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
@@ -1,9 +1,15 @@
+import os
 from datetime import datetime, date
 
 import requests
+from django.conf import settings
 from django.core.management import BaseCommand
 
+from soil_analysis.domain.dataprovider.jma import JmaApiClient
 from soil_analysis.domain.repository.jma import JmaRepository
+from soil_analysis.domain.service.prefecture_commercial_area import (
+    PrefectureCommercialAreaService,
+)
 from soil_analysis.domain.valueobject.weather.jma import (
     WindData,
     MeanCalculable,
@@ -63,10 +69,31 @@ def update_prefecture_ids(prefecture_ids: list[str]) -> tuple[list[str], dict]:
 def get_data(url: str):
     response = requests.get(url)
     response.raise_for_status()
-    data = response.json()
+    return extract_time_series(response.json())
+
+
+def extract_time_series(data: list) -> list:
+    """
+    予報 JSON（forecast / probability）から3日間予報の timeSeries を取り出す
+
+    Args:
+        data: 気象庁 API のレスポンス JSON
+
+    Returns: timeSeries のリスト
+    """
     return data[THREE_DAYS]["timeSeries"]
 
 
+def forecast_url(prefecture_id: str) -> str:
+    return f"https://www.jma.go.jp/bosai/forecast/data/forecast/{prefecture_id}.json"
+
+
+def probability_url(prefecture_id: str) -> str:
+    return (
+        f"https://www.jma.go.jp/bosai/probability/data/probability/{prefecture_id}.json"
+    )
+
+
 def get_indexes(data_time_defines, desired_date: date) -> list[int]:
     """
     get_indexes する箇所が複数あるので独立さした
@@ -108,9 +135,11 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         jma_weather_list: list[JmaWeather] = []
 
-        jma_prefecture_ids = Land.objects.values_list(
-            "jma_city__jma_region__jma_prefecture__code", flat=True
-        ).distinct()
+        jma_prefecture_ids = list(
+            Land.objects.values_list(
+                "jma_city__jma_region__jma_prefecture__code", flat=True
+            ).distinct()
+        )
         jma_prefecture_ids, special_add_region_ids = update_prefecture_ids(
             jma_prefecture_ids
         )
@@ -121,23 +150,45 @@ class Command(BaseCommand):
         region_master = {x.code: x for x in JmaRegion.objects.all()}
         weather_code_master = {x.code: x for x in JmaWeatherCode.objects.all()}
 
+        # 都道府県ごとの予報・確率 JSON は日付によらず同じなので、URL ごとに1回だけ並列取得する
+        client = JmaApiClient(cache_dir=os.path.join(settings.MEDIA_ROOT, "jma_cache"))
+        urls = [forecast_url(x) for x in jma_prefecture_ids] + [
+            probability_url(x) for x in jma_prefecture_ids
+        ]
+        documents = client.fetch_many(urls)
+        if client.is_all_not_modified(urls) and JmaWeather.objects.exists():
+            self.stdout.write(
+                self.style.SUCCESS("weather forecast is not modified. skipped.")
+            )
+            return
+
+        forecast_series = {
+            x: extract_time_series(documents[forecast_url(x)])
+            for x in jma_prefecture_ids
+        }
+        probability_series = {
+            x: extract_time_series(documents[probability_url(x)])
+            for x in jma_prefecture_ids
+        }
+        amedas_code_in_regions = {
+            x: JmaRepository.get_amedas_code_list(x, special_add_region_ids)
+            for x in jma_prefecture_ids
+        }
+
         # 日付のリストだけ取得
-        url = f"https://www.jma.go.jp/bosai/forecast/data/forecast/{jma_prefecture_ids[0]}.json"
-        time_series_data = get_data(url)
+        time_series_data = forecast_series[jma_prefecture_ids[0]]
         target_date_list = [
             datetime.fromisoformat(date_str).date()
             for date_str in time_series_data[TYPE_OVERVIEW]["timeDefines"]
         ]
 
-        JmaWeather.objects.all().delete()
         for target_date in target_date_list:
             for prefecture_id in jma_prefecture_ids:
                 print(f"{target_date} の {prefecture_id=}")
                 forecasts_by_region = {}
 
                 print("  風速:")
-                url = f"https://www.jma.go.jp/bosai/probability/data/probability/{prefecture_id}.json"
-                time_series_data = get_data(url)
+                time_series_data = probability_series[prefecture_id]
 
                 indexes = get_indexes(
                     data_time_defines=time_series_data[TYPE_WIND]["timeDefines"],
@@ -162,8 +213,7 @@ class Command(BaseCommand):
                     print(f"    {region_code} の {wind_data}")
 
                 print("  天気サマリ:")
-                url = f"https://www.jma.go.jp/bosai/forecast/data/forecast/{prefecture_id}.json"
-                time_series_data = get_data(url)
+                time_series_data = forecast_series[prefecture_id]
 
                 indexes = get_indexes(
                     data_time_defines=time_series_data[TYPE_OVERVIEW]["timeDefines"],
@@ -238,9 +288,7 @@ class Command(BaseCommand):
                     )
 
                 print("  気温:")
-                amedas_code_in_region = JmaRepository.get_amedas_code_list(
-                    prefecture_id, special_add_region_ids
-                )
+                amedas_code_in_region = amedas_code_in_regions[prefecture_id]
                 indexes = get_indexes(
                     data_time_defines=time_series_data[TYPE_TEMPERATURE]["timeDefines"],
                     desired_date=target_date,
@@ -324,7 +372,11 @@ class Command(BaseCommand):
                             ),
                         )
                     )
-        JmaWeather.objects.bulk_create(jma_weather_list)
+        # 組み立てが全て終わってから短いトランザクションで入れ替える
+        JmaRepository.replace_weathers(jma_weather_list)
+        # 入れ替えのコミット後に検証子を保存する（失敗時は次回も全件取得し直す）
+        client.commit_cache()
+        PrefectureCommercialAreaService.invalidate()
 
         self.stdout.write(
             self.style.SUCCESS("weather forecast data retrieve has been completed.")
@@ -1,6 +1,13 @@
-import requests
+import os
+
+from django.conf import settings
 from django.core.management import BaseCommand
 
+from soil_analysis.domain.dataprovider.jma import JmaApiClient
+from soil_analysis.domain.repository.jma import JmaRepository
+from soil_analysis.domain.service.prefecture_commercial_area import (
+    PrefectureCommercialAreaService,
+)
 from soil_analysis.domain.valueobject.weather.jma import WarningData
 from soil_analysis.models import JmaWarning, JmaRegion, Land
 
@@ -39,10 +46,8 @@ M_TARGET_WARNINGS = {
 }
 
 
-def get_data(url: str):
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+def warning_url(prefecture_id: str) -> str:
+    return f"https://www.jma.go.jp/bosai/warning/data/warning/{prefecture_id}.json"
 
 
 class Command(BaseCommand):
@@ -58,13 +63,21 @@ class Command(BaseCommand):
 
         region_master = {x.code: x for x in JmaRegion.objects.all()}
 
-        JmaWarning.objects.all().delete()
+        # 都道府県ごとの警報 JSON を並列取得（前回から変化がなければ 304 で保存済みを再利用）
+        client = JmaApiClient(cache_dir=os.path.join(settings.MEDIA_ROOT, "jma_cache"))
+        urls = [warning_url(x) for x in jma_prefecture_ids]
+        documents = client.fetch_many(urls)
+        if client.is_all_not_modified(urls) and JmaWarning.objects.exists():
+            self.stdout.write(
+                self.style.SUCCESS("weather warning is not modified. skipped.")
+            )
+            return
+
         jma_warning_list: list[JmaWarning] = []
         for prefecture_id in jma_prefecture_ids:
-            url = (
-                f"https://www.jma.go.jp/bosai/warning/data/warning/{prefecture_id}.json"
-            )
-            latest_warning_data = get_data(url)["areaTypes"][LATEST_WARNING]
+            latest_warning_data = documents[warning_url(prefecture_id)]["areaTypes"][
+                LATEST_WARNING
+            ]
 
             for region_data in latest_warning_data["areas"]:
                 region_code = region_data["code"]
@@ -92,7 +105,11 @@ class Command(BaseCommand):
                         warnings=",".join(warnings),
                     )
                 )
-        JmaWarning.objects.bulk_create(jma_warning_list)
+        # 組み立てが全て終わってから短いトランザクションで入れ替える
+        JmaRepository.replace_warnings(jma_warning_list)
+        # 入れ替えのコミット後に検証子を保存する（失敗時は次回も全件取得し直す）
+        client.commit_cache()
+        PrefectureCommercialAreaService.invalidate()
 
         self.stdout.write(
             self.style.SUCCESS("weather warning data retrieve has been completed.")
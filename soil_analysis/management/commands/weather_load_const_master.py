@@ -3,6 +3,9 @@ import sys
 import requests
 from django.core.management.base import BaseCommand
 
+from soil_analysis.domain.service.prefecture_commercial_area import (
+    PrefectureCommercialAreaService,
+)
 from soil_analysis.domain.valueobject.weather.jma import JmaConstGeographicArea
 from soil_analysis.models import (
     JmaArea,
@@ -157,6 +160,7 @@ class Command(BaseCommand):
                         )
                     )
         JmaAmedas.objects.bulk_create(jma_amedas_list)
+        PrefectureCommercialAreaService.invalidate()
 
         self.stdout.write(
             self.style.SUCCESS("jma const master data import has been completed.")
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("soil_analysis", "0023_supplementalriskindicator"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="landledger",
+            name="hardness_image_digest",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=64,
+                verbose_name="硬度分布図ダイジェスト",
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("soil_analysis", "0024_landledger_hardness_image_digest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LandLedgerAssessment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "measurement_digest",
+                    models.CharField(
+                        max_length=64, verbose_name="測定データダイジェスト"
+                    ),
+                ),
+                (
+                    "chemical_values",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="化学分析値"
+                    ),
+                ),
+                (
+                    "hardness_block_averages",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="ブロック別平均圧力"
+                    ),
+                ),
+                (
+                    "hardness_depth_averages",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        verbose_name="ブロック・深度別平均圧力",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="作成日時"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新日時"),
+                ),
+                (
+                    "land_ledger",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assessment",
+                        to="soil_analysis.landledger",
+                        verbose_name="台帳",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -445,6 +445,7 @@ class LandLedger(models.Model):
         sampling_method (SamplingMethod): 採土法
         sampling_staff (User): 採土スタッフ
         hardness_image (ImageField): 硬度分布図
+        hardness_image_digest (str): 硬度分布図の描画に使用した測定データのダイジェスト
     """
 
     sampling_date = models.DateField("採土日")
@@ -469,6 +470,9 @@ class LandLedger(models.Model):
     hardness_image = models.ImageField(
         "硬度分布図", upload_to="hardness_images", null=True, blank=True
     )
+    hardness_image_digest = models.CharField(
+        "硬度分布図ダイジェスト", max_length=64, blank=True, default=""
+    )
 
     @property
     def analysis_number(self) -> int | None:
@@ -638,6 +642,41 @@ class LandReview(models.Model):
         ]
 
 
+class LandLedgerAssessment(models.Model):
+    """
+    台帳ごとのレポート判定（化学・硬度）の集計結果キャッシュ。
+
+    `measurement_digest` は集計に使った測定データ（件数・更新日時・圧力合計など）から
+    作るダイジェストで、現在の測定データと一致しない場合は作り直します。
+
+    Attributes:
+        land_ledger (LandLedger): 台帳
+        measurement_digest (str): 測定データのダイジェスト
+        chemical_values (dict): 化学分析値（項目キー → 値）。化学分析がなければ空
+        hardness_block_averages (dict): ブロック名 → 平均圧力
+        hardness_depth_averages (dict): ブロック名 → [[深度, 平均圧力], ...]
+        created_at (datetime): 作成日時
+        updated_at (datetime): 更新日時
+    """
+
+    land_ledger = models.OneToOneField(
+        LandLedger,
+        on_delete=models.CASCADE,
+        verbose_name="台帳",
+        related_name="assessment",
+    )
+    measurement_digest = models.CharField("測定データダイジェスト", max_length=64)
+    chemical_values = models.JSONField("化学分析値", default=dict, blank=True)
+    hardness_block_averages = models.JSONField(
+        "ブロック別平均圧力", default=dict, blank=True
+    )
+    hardness_depth_averages = models.JSONField(
+        "ブロック・深度別平均圧力", default=dict, blank=True
+    )
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    updated_at = models.DateTimeField("更新日時", auto_now=True)
+
+
 class Device(models.Model):
     """
     土壌硬度計マスタ。
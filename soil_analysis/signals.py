@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+
+from soil_analysis.domain.service.prefecture_commercial_area import (
+    PrefectureCommercialAreaService,
+)
+
+
+def invalidate_prefecture_commercial_area_dashboard(sender, **kwargs) -> None:
+    """
+    商圏ダッシュボードの集計元が保存・削除されたらキャッシュを破棄します。
+    """
+    PrefectureCommercialAreaService.invalidate()
+
+
+def connect_signals() -> None:
+    """
+    フォームや管理画面・loaddata から保存される集計元モデルにレシーバを登録します。
+    """
+    for model in PrefectureCommercialAreaService.SIGNAL_SOURCE_MODELS:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_prefecture_commercial_area_dashboard, sender=model
+            )
@@ -1,6 +1,8 @@
+// Directions API の 1 リクエストあたりの地点数（10 地点を超えると課金レートが上がる）
+const MAX_POINTS_PER_REQUEST = 10;
+
 function initMap() {
     const directionsService = new google.maps.DirectionsService();
-    const directionsRenderer = new google.maps.DirectionsRenderer();
 
     const [latitudeMean, longitudeMean] = calculateCoordListMean(coordList);
     const map = new google.maps.Map(document.getElementById("map"), {
@@ -8,13 +10,26 @@ function initMap() {
         center: {lat: latitudeMean, lng: longitudeMean},
     });
 
-    directionsRenderer.setMap(map);
+    // 訪問順序はサーバー側で最適化済みなので、順序どおりに区間ごとの経路だけを描画する
+    for (const chunk of chunkCoordList(coordList, MAX_POINTS_PER_REQUEST)) {
+        const directionsRenderer = new google.maps.DirectionsRenderer({preserveViewport: true});
+        directionsRenderer.setMap(map);
+        displayRoute(chunk, directionsService, directionsRenderer);
+    }
+}
 
-    displayRoute(
-        coordList,
-        directionsService,
-        directionsRenderer,
-    );
+/**
+ * 地点リストを、隣り合う区間の端点を共有する maxPoints 地点以下の区間に分割する
+ * @param coord_list
+ * @param maxPoints
+ * @returns {string[][]}
+ */
+function chunkCoordList(coord_list, maxPoints) {
+    const chunks = [];
+    for (let start = 0; start < coord_list.length - 1; start += maxPoints - 1) {
+        chunks.push(coord_list.slice(start, start + maxPoints));
+    }
+    return chunks;
 }
 
 function calculateCoordListMean(coordList) {
@@ -50,7 +65,7 @@ function displayRoute(coord_list, directionsService, directionsRenderer) {
             waypoints: coord_list.map(location => ({location})),
             travelMode: google.maps.TravelMode.DRIVING,
             avoidTolls: true,  // 有料道路を除外
-            optimizeWaypoints: true  // 地点最適化
+            optimizeWaypoints: false  // 訪問順序はサーバー側で最適化済み
         })
         .then((result) => {
             directionsRenderer.setDirections(result);
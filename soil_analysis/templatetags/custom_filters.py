@@ -1,5 +1,7 @@
 from django import template
 
+from soil_analysis.domain.service.weather_icon_sprite import WeatherIconSpriteService
+
 register = template.Library()
 
 
@@ -19,3 +21,9 @@ def get_value(value, key):
 @register.filter
 def get_attr(obj, attr_name):
     return getattr(obj, attr_name, None)
+
+
+@register.filter
+def weather_icon_url(image):
+    """天気アイコンのファイル名を、スプライト内の表示位置を指すURLに変換する"""
+    return WeatherIconSpriteService.icon_url(image)
@@ -1,8 +1,9 @@
+import io
 from datetime import date
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 
 from soil_analysis.domain.service.chemical_import_service import (
     ChemicalImportService,
@@ -136,3 +137,72 @@ class ChemicalImportServiceTests(TestCase):
         result = ChemicalImportService.parse_kawada_worksheet(ws)
         self.assertEqual(result.rows, [])
         self.assertTrue(len(result.errors) > 0)
+
+    @staticmethod
+    def _kawada_worksheet(data_rows: list[list]):
+        wb = Workbook()
+        ws = wb.active
+        ws.append([])  # 1行目: 空
+        ws.append([])  # 2行目: 空
+        ws.append(["分析番号", "氏名", "圃場名", "作物"])  # 3行目: ヘッダー
+        for row in data_rows:
+            ws.append(row)
+        return wb, ws
+
+    def test_parse_kawada_worksheet_rejects_out_of_range_values(self):
+        """
+        シナリオ:
+        - 入力: pH が 14 を超える行、EC が負の行、正常な行を含むシート。
+        - 処理: parse_kawada_worksheet でパースする。
+        - 期待値: 範囲外の行だけが行番号付きのエラーになり、正常な行はパースされること。
+        """
+        # Given
+        _, ws = self._kawada_worksheet(
+            [
+                [1, "田中", "圃場A", "キャベツ", 1.2, 15],
+                [2, "田中", "圃場B", "キャベツ", -0.1, 6.5],
+                [3, "田中", "圃場C", "キャベツ", 1.2, 6.5],
+            ]
+        )
+
+        # When
+        result = ChemicalImportService.parse_kawada_worksheet(ws)
+
+        # Then
+        self.assertEqual(len(result.errors), 2)
+        self.assertTrue(result.errors[0].startswith("row=4:"))
+        self.assertIn("column=pH", result.errors[0])
+        self.assertTrue(result.errors[1].startswith("row=5:"))
+        self.assertIn("column=EC", result.errors[1])
+        self.assertEqual([row.land_name for row in result.rows], ["圃場C"])
+
+    def test_parse_kawada_worksheet_from_read_only_workbook(self):
+        """
+        シナリオ:
+        - 入力: 数値セルと "50%" のような文字列セルが混在するシートを read_only で開く。
+        - 期待値: 通常モードと同じ値に変換され、空欄は None になること。
+        """
+        wb, _ = self._kawada_worksheet(
+            [
+                [2607001, "田中", "圃場A", "キャベツ", 1.2, 6.5, 15, None]
+                + [None] * 5
+                + ["50%"]
+                + [None] * 4
+                + ["2.5%", 0.8],
+            ]
+        )
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        read_only_wb = load_workbook(buffer, read_only=True, data_only=True)
+        try:
+            result = ChemicalImportService.parse_kawada_worksheet(read_only_wb.active)
+        finally:
+            read_only_wb.close()
+
+        self.assertEqual(result.errors, [])
+        row = result.rows[0]
+        self.assertEqual(row.analysis_number, 2607001)
+        self.assertEqual((row.ec, row.ph, row.cec), (1.2, 6.5, 15.0))
+        self.assertIsNone(row.cao)
+        self.assertEqual(row.base_saturation, 50.0)
+        self.assertEqual((row.humus, row.bulk_density), (2.5, 0.8))
@@ -130,6 +130,36 @@ class TestPhotoProcessingService(TestCase):
         nearest_land = service.find_nearest_land(photo_spot, self.land_list)
         self.assertEqual(self.land4, nearest_land)
 
+    def test_find_nearest_lands_batch(self):
+        """複数の撮影位置をまとめて検索し、入力順に最寄り圃場が返ることをテストします。"""
+        photo_spots = [
+            PhotoSpot(XarvioCoord(longitude=137.6496, latitude=34.7434)),  # A4
+            PhotoSpot(XarvioCoord(longitude=137.64905, latitude=34.74424)),  # A1
+            PhotoSpot(XarvioCoord(longitude=137.64938, latitude=34.74374)),  # A3
+        ]
+        service = PhotoProcessingService()
+        nearest_lands = service.find_nearest_lands(photo_spots, self.land_list)
+        self.assertEqual([self.land4, self.land1, self.land3], nearest_lands)
+
+    def test_land_index_is_rebuilt_when_lands_change(self):
+        """圃場が変わらなければインデックスを再利用し、変われば再構築することをテストします。"""
+        index = PhotoProcessingService.get_land_index(self.land_list)
+        self.assertIs(index, PhotoProcessingService.get_land_index(self.land_list))
+
+        # 圃場A1の中心座標をA4の近くへ移動
+        self.land1.to_google.return_value.to_tuple.return_value = (
+            34.7432,
+            137.6497,
+        )
+        rebuilt = PhotoProcessingService.get_land_index(self.land_list)
+        self.assertIsNot(index, rebuilt)
+
+        photo_spot = PhotoSpot(XarvioCoord(longitude=137.6497, latitude=34.7432))
+        nearest_land = PhotoProcessingService().find_nearest_land(
+            photo_spot, self.land_list
+        )
+        self.assertEqual(self.land1, nearest_land)
+
     def test_process_photos(self):
         """
         写真処理サービスのprocess_photos機能を検証するテストです。
@@ -0,0 +1,67 @@
+import itertools
+import random
+from unittest import TestCase
+
+from lib.geo.valueobject.coord import GoogleMapsCoord
+from soil_analysis.domain.service.route_optimization import RouteOptimizationService
+
+
+class TestRouteOptimizationService(TestCase):
+    @staticmethod
+    def _random_coords(n: int, seed: int) -> list[GoogleMapsCoord]:
+        rng = random.Random(seed)
+        return [
+            GoogleMapsCoord(
+                latitude=40.6 + rng.random() * 0.1, longitude=141.3 + rng.random() * 0.1
+            )
+            for _ in range(n)
+        ]
+
+    def test_distance_matrix(self):
+        """静岡ススムA1とA3の中心間距離が数十メートル単位で計算されることを確認"""
+        coords = [
+            GoogleMapsCoord(latitude=34.7441225, longitude=137.6487867),
+            GoogleMapsCoord(latitude=34.7436191, longitude=137.6491226),
+        ]
+        distances = RouteOptimizationService.distance_matrix(coords)
+        self.assertEqual(0.0, distances[0, 0])
+        self.assertAlmostEqual(distances[0, 1], distances[1, 0])
+        self.assertAlmostEqual(64.0, distances[0, 1], delta=2.0)
+
+    def test_solve_keeps_start_and_visits_all_points(self):
+        """11地点以上でも全地点を1回ずつ訪問し、始点は先頭のまま"""
+        coords = self._random_coords(30, seed=1)
+        route = RouteOptimizationService.solve(coords)
+        self.assertEqual(0, route[0])
+        self.assertEqual(list(range(30)), sorted(route))
+
+    def test_solve_fix_end(self):
+        """fix_end=True の場合、終点は末尾の地点に固定される"""
+        coords = self._random_coords(15, seed=2)
+        route = RouteOptimizationService.solve(coords, fix_end=True)
+        self.assertEqual(0, route[0])
+        self.assertEqual(14, route[-1])
+        self.assertEqual(list(range(15)), sorted(route))
+
+    def test_solve_is_near_optimal(self):
+        """小規模問題では総当たりの最適解とほぼ同じ距離になる"""
+        coords = self._random_coords(8, seed=3)
+        distances = RouteOptimizationService.distance_matrix(coords)
+        best = min(
+            RouteOptimizationService.route_length([0, *p], distances)
+            for p in itertools.permutations(range(1, 8))
+        )
+        route = RouteOptimizationService.solve(coords)
+        self.assertLessEqual(
+            RouteOptimizationService.route_length(route, distances), best * 1.05
+        )
+
+    def test_solve_beats_input_order(self):
+        """最適化後の総距離は入力順の総距離以下になる"""
+        coords = self._random_coords(50, seed=4)
+        distances = RouteOptimizationService.distance_matrix(coords)
+        route = RouteOptimizationService.solve(coords)
+        self.assertLessEqual(
+            RouteOptimizationService.route_length(route, distances),
+            RouteOptimizationService.route_length(list(range(50)), distances),
+        )
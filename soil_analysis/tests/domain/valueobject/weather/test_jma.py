@@ -1,14 +1,19 @@
+import shutil
+import tempfile
 from datetime import datetime
 from unittest import mock
 
 from django.test import TestCase
 
+from soil_analysis.domain.dataprovider.jma import JmaApiClient
+from soil_analysis.domain.repository.jma import JmaRepository
 from soil_analysis.management.commands import weather_fetch_forecast
 from soil_analysis.management.commands.weather_fetch_forecast import (
     get_amedas_codes_for_region,
     get_data,
     get_indexes,
 )
+from soil_analysis.models import JmaArea, JmaPrefecture, JmaRegion, JmaWarning
 
 
 class TestFetchWeatherForecast(TestCase):
@@ -126,3 +131,133 @@ class TestGetDataAndIndexes(TestCase):
         )
 
         self.assertEqual(indexes, [1])
+
+
+class TestJmaApiClient(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    @staticmethod
+    def _response(status_code: int, body=None, headers=None):
+        response = mock.MagicMock()
+        response.status_code = status_code
+        response.json.return_value = body
+        response.headers = headers or {}
+        return response
+
+    @mock.patch("soil_analysis.domain.dataprovider.jma.requests.get")
+    def test_fetch_many_requests_each_url_once(self, mock_requests_get):
+        """
+        シナリオ:
+        - 入力: 重複を含む URL リスト。
+        - 処理: fetch_many で並列取得する。
+        - 期待値: 同じ URL は1回だけリクエストされ、全 URL の JSON が返ること。
+        """
+        mock_requests_get.side_effect = lambda url, **kwargs: self._response(
+            200, {"url": url}
+        )
+
+        client = JmaApiClient()
+        documents = client.fetch_many(["http://a", "http://b", "http://a"])
+
+        self.assertEqual(mock_requests_get.call_count, 2)
+        self.assertEqual(
+            documents,
+            {"http://a": {"url": "http://a"}, "http://b": {"url": "http://b"}},
+        )
+
+    @mock.patch("soil_analysis.domain.dataprovider.jma.requests.get")
+    def test_fetch_reuses_cached_body_on_not_modified(self, mock_requests_get):
+        """
+        シナリオ:
+        - 入力: 1回目は ETag 付きの 200、2回目は 304 を返すサーバー。
+        - 処理: 同じ URL を取得して commit_cache で保存し、もう一度取得する。
+        - 期待値: 2回目は If-None-Match を送り、保存済みの JSON が返ること。
+        """
+        mock_requests_get.side_effect = [
+            self._response(200, {"v": 1}, {"ETag": '"abc"'}),
+            self._response(304),
+        ]
+
+        first = JmaApiClient(cache_dir=self.cache_dir)
+        self.assertEqual(first.fetch("http://a"), {"v": 1})
+        self.assertFalse(first.is_all_not_modified(["http://a"]))
+        first.commit_cache()
+
+        second = JmaApiClient(cache_dir=self.cache_dir)
+        self.assertEqual(second.fetch("http://a"), {"v": 1})
+        self.assertEqual(
+            mock_requests_get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'}
+        )
+        self.assertTrue(second.is_all_not_modified(["http://a"]))
+
+    @mock.patch("soil_analysis.domain.dataprovider.jma.requests.get")
+    def test_fetch_does_not_save_validators_until_commit(self, mock_requests_get):
+        """
+        シナリオ:
+        - 入力: ETag 付きの 200 を返すサーバー。
+        - 処理: 取得後に commit_cache を呼ばず（DB 反映に失敗した想定）、再度取得する。
+        - 期待値: 2回目は条件付きリクエストにならず、全件取得し直すこと。
+        """
+        mock_requests_get.side_effect = [
+            self._response(200, {"v": 1}, {"ETag": '"abc"'}),
+            self._response(200, {"v": 1}, {"ETag": '"abc"'}),
+        ]
+
+        JmaApiClient(cache_dir=self.cache_dir).fetch("http://a")
+
+        second = JmaApiClient(cache_dir=self.cache_dir)
+        second.fetch("http://a")
+
+        self.assertEqual(mock_requests_get.call_args.kwargs["headers"], {})
+        self.assertFalse(second.is_all_not_modified(["http://a"]))
+
+
+class TestJmaRepositoryReplace(TestCase):
+    def setUp(self):
+        area = JmaArea.objects.create(code="01", name="Test Area")
+        prefecture = JmaPrefecture.objects.create(
+            code="0101", name="Test Pref", jma_area=area
+        )
+        self.region = JmaRegion.objects.create(
+            code="010101", name="Test Region", jma_prefecture=prefecture
+        )
+        JmaWarning.objects.create(jma_region=self.region, warnings="大雨注意報")
+
+    def test_replace_warnings(self):
+        """
+        シナリオ:
+        - 入力: 既存の警報1件と、新しい警報1件。
+        - 処理: replace_warnings で入れ替える。
+        - 期待値: 新しい警報だけが残ること。
+        """
+        JmaRepository.replace_warnings(
+            [JmaWarning(jma_region=self.region, warnings="洪水警報")]
+        )
+
+        self.assertEqual(
+            list(JmaWarning.objects.values_list("warnings", flat=True)), ["洪水警報"]
+        )
+
+    def test_replace_warnings_keeps_old_rows_on_failure(self):
+        """
+        シナリオ:
+        - 入力: 一括登録が失敗する状況。
+        - 処理: replace_warnings で入れ替える。
+        - 期待値: ロールバックされ、旧データが残ること（テーブルが空にならない）。
+        """
+        with mock.patch.object(
+            JmaWarning.objects, "bulk_create", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                JmaRepository.replace_warnings(
+                    [JmaWarning(jma_region=self.region, warnings="洪水警報")]
+                )
+
+        self.assertEqual(
+            list(JmaWarning.objects.values_list("warnings", flat=True)),
+            ["大雨注意報"],
+        )
@@ -177,3 +177,50 @@ class HardnessPlotAutoGenerationTest(TestCase):
         self.ledger.refresh_from_db()
         self.assertTrue(bool(self.ledger.hardness_image))
         self.assertTrue(self.ledger.hardness_image.name.startswith("hardness_images/"))
+
+    def test_generate_and_save_plots_skips_unchanged_measurements(self):
+        """測定データが変わっていない帳簿は再描画されないことを確認"""
+        from soil_analysis.domain.service.hardness_plot_generation import (
+            HardnessPlotGenerationService,
+        )
+
+        block_a2 = LandBlock.objects.create(name="A2")
+        memory = 1
+        for block in [self.land_block, block_a2]:
+            for depth in [1, 5]:
+                SoilHardnessMeasurement.objects.create(
+                    set_device=self.device,
+                    set_memory=memory,
+                    set_datetime=datetime(2023, 7, 1, 10, 0, 0),
+                    set_depth=50,
+                    set_spring=1,
+                    set_cone=1,
+                    depth=depth,
+                    pressure=100 + depth,
+                    folder="Folder1",
+                    land_ledger=self.ledger,
+                    land_block=block,
+                )
+                memory += 1
+
+        success_count, errors = HardnessPlotGenerationService.generate_and_save_plots(
+            [self.ledger.id]
+        )
+        self.assertEqual((success_count, errors), (1, []))
+        self.ledger.refresh_from_db()
+        self.assertEqual(len(self.ledger.hardness_image_digest), 64)
+
+        # 変更なし: スキップされる
+        success_count, errors = HardnessPlotGenerationService.generate_and_save_plots(
+            [self.ledger.id]
+        )
+        self.assertEqual((success_count, errors), (0, []))
+
+        # 測定値が変わると再描画される
+        SoilHardnessMeasurement.objects.filter(land_ledger=self.ledger).update(
+            pressure=500
+        )
+        success_count, errors = HardnessPlotGenerationService.generate_and_save_plots(
+            [self.ledger.id]
+        )
+        self.assertEqual((success_count, errors), (1, []))
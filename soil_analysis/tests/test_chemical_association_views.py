@@ -574,7 +574,9 @@ class ChemicalAssociationViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "application/zip")
 
-        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        with zipfile.ZipFile(
+            io.BytesIO(b"".join(response.streaming_content))
+        ) as archive:
             names = set(archive.namelist())
             self.assertIn("chemical_stage01.xlsx", names)
             self.assertIn("chemical_stage02.xlsx", names)
@@ -592,3 +594,32 @@ class ChemicalAssociationViewsTest(TestCase):
                 )
                 self.assertEqual(parse_result.errors, [])
                 self.assertEqual(len(parse_result.rows), 3)
+
+    def test_standard_report_export_streams_company_workbook(self):
+        """
+        シナリオ:
+        - 入力: 化学分析データを持つ台帳がある会社の通知表ExcelダウンロードURLへGETする。
+        - 処理: ストリーミングで返された xlsx を読み込む。
+        - 期待値: 見出し行と、台帳1件分の行（圃場名・時期・分析値）が含まれること。
+        """
+        # Given
+        SoilChemicalMeasurement.objects.create(
+            land_ledger=self.ledger, analysis_number=2607001, ec=0.1, ph=6.5
+        )
+
+        # When
+        response = self.client.get(
+            reverse("soil:standard_report_export", args=[self.company.id])
+        )
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(
+            rows[0][:5], ("圃場名", "時期", "採土日", "分析番号", "EC (mS/cm)")
+        )
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][:2], ("圃場A", "2024 2024年春"))
+        self.assertEqual(rows[1][3:5], (2607001, 0.1))
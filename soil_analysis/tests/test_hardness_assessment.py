@@ -4,11 +4,16 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.utils import timezone
 
+from soil_analysis.domain.repository.land_ledger_assessment import (
+    LandLedgerAssessmentRepository,
+)
 from soil_analysis.domain.service.hardness_measurement_service import (
     HardnessMeasurementService,
 )
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
 from soil_analysis.models import (
     LandLedger,
+    LandLedgerAssessment,
     LandBlock,
     SoilHardnessMeasurement,
     Land,
@@ -140,3 +145,124 @@ class HardnessAssessmentTest(TestCase):
         self.assertEqual(c1_assessment.display_value, "-")
         self.assertEqual(len(c1_assessment.depth_pressures), 0)
         self.assertEqual(c1_assessment.sparkline_points, "")
+
+    def _create_measurement(self, block, depth, pressure, memory=1):
+        return SoilHardnessMeasurement.objects.create(
+            land_ledger=self.ledger,
+            land_block=block,
+            set_device=self.device,
+            set_memory=memory,
+            set_datetime=timezone.now(),
+            set_depth=60,
+            set_spring=1,
+            set_cone=1,
+            depth=depth,
+            pressure=pressure,
+            folder="test",
+        )
+
+    def test_cached_assessment_matches_and_is_reused(self):
+        """
+        シナリオ:
+        - 入力: 2ブロック分の硬度測定データを持つ台帳。
+        - 処理: レポート用の判定を2回取得し、バッチ用の sync も実行する。
+        - 期待値: 初回は集計してキャッシュ行を保存し、直接集計した判定と一致すること。
+          2回目はキャッシュ行を読む1クエリだけで返し、sync も作り直さないこと。
+        """
+        # Given
+        self._create_measurement(self.block_a1, 10, 800)
+        self._create_measurement(self.block_a1, 20, 1200)
+        self._create_measurement(self.block_b1, 10, 3000, memory=2)
+
+        # When
+        _, hardness = ReportAssessmentService.get_assessments(self.ledger)
+        with self.assertNumQueries(1):
+            _, cached_hardness = ReportAssessmentService.get_assessments(self.ledger)
+        _, refreshed = ReportAssessmentService.sync([self.ledger.id])
+
+        # Then
+        expected = HardnessMeasurementService.get_hardness_assessment(self.ledger)
+        self.assertEqual(expected, hardness)
+        self.assertEqual(expected, cached_hardness)
+        self.assertTrue(
+            LandLedgerAssessment.objects.filter(land_ledger=self.ledger).exists()
+        )
+        self.assertEqual([], refreshed)
+
+    def test_cached_assessment_is_rebuilt_after_change(self):
+        """
+        シナリオ:
+        - 入力: キャッシュ済みの台帳と、取り込みを経ずに書き換えた測定値。
+        - 処理: バッチ用の sync で突き合わせた後、invalidate してから全社分を作り直す。
+        - 期待値: ダイジェストの変化でその台帳だけ作り直され、invalidate 後はキャッシュ行が
+          消えて refresh_for_company で再作成されること。
+        """
+        # Given
+        measurement = self._create_measurement(self.block_a1, 10, 800)
+        ReportAssessmentService.get_assessments(self.ledger)
+        measurement.pressure = 2600
+        measurement.save()
+
+        # When
+        assessments, refreshed = ReportAssessmentService.sync([self.ledger.id])
+        ReportAssessmentService.invalidate([self.ledger.id])
+        exists_after_invalidate = LandLedgerAssessment.objects.filter(
+            land_ledger=self.ledger
+        ).exists()
+        total, refreshed_count = ReportAssessmentService.refresh_for_company(
+            self.company.id
+        )
+
+        # Then
+        self.assertEqual([self.ledger.id], refreshed)
+        _, hardness = assessments[self.ledger.id]
+        self.assertEqual(2600, hardness.get_block("A1").avg_pressure)
+        self.assertFalse(exists_after_invalidate)
+        self.assertEqual((1, 1), (total, refreshed_count))
+
+    def test_invalidate_all_after_deleting_measurements(self):
+        """
+        シナリオ:
+        - 入力: キャッシュ済みの台帳。
+        - 処理: 測定データを全件削除し、invalidate_all で集計キャッシュを消してから判定を取得する。
+        - 期待値: 削除前のキャッシュ行は返らず、測定データが無い状態で集計し直されること。
+        """
+        # Given
+        self._create_measurement(self.block_a1, 10, 800)
+        ReportAssessmentService.get_assessments(self.ledger)
+
+        # When
+        SoilHardnessMeasurement.objects.all().delete()
+        ReportAssessmentService.invalidate_all()
+        _, hardness = ReportAssessmentService.get_assessments(self.ledger)
+
+        # Then
+        expected = HardnessMeasurementService.get_hardness_assessment(self.ledger)
+        self.assertEqual(expected, hardness)
+        self.assertIsNone(hardness.get_block("A1").avg_pressure)
+
+    def test_concurrent_create_overwrites_existing_assessment(self):
+        """
+        シナリオ:
+        - 入力: 別リクエストが先にキャッシュ行を作成済みの台帳。
+        - 処理: 同じ台帳のキャッシュ行を新規作成として保存する。
+        - 期待値: 一意制約違反にならず、既存行が新しい集計値で上書きされること。
+        """
+        # Given
+        self._create_measurement(self.block_a1, 10, 800)
+        ReportAssessmentService.get_assessments(self.ledger)
+        duplicate = LandLedgerAssessment(
+            land_ledger_id=self.ledger.id,
+            measurement_digest="0" * 64,
+            chemical_values={},
+            hardness_block_averages={},
+            hardness_depth_averages={},
+        )
+
+        # When
+        LandLedgerAssessmentRepository.save_all([duplicate], [])
+
+        # Then
+        assessments = LandLedgerAssessment.objects.filter(land_ledger=self.ledger)
+        self.assertEqual(1, assessments.count())
+        self.assertEqual("0" * 64, assessments.get().measurement_digest)
@@ -126,3 +126,23 @@ class HardnessAssociationLogicTest(TestCase):
         processed = HardnessImportService.get_processed_groups_count()
         self.assertEqual(total, 2)
         self.assertEqual(processed, 1)
+
+    def test_folder_groups_query_count_is_constant(self):
+        # フォルダ数が増えてもクエリ数は一定（集計1本 + 代表データ1本）
+        for i in range(1, 6):
+            self.create_csv(f"Folder{i}", i * 10, f" 23.07.0{i} 10:00:00")
+            self.create_csv(f"Folder{i}", i * 10 + 1, f" 23.07.0{i} 11:00:00")
+        call_command("load_data_hardness", self.temp_dir)
+
+        with self.assertNumQueries(2):
+            groups = HardnessImportService.get_folder_groups_for_association()
+
+        self.assertEqual(len(groups), 5)
+        first = groups[0]
+        self.assertEqual(first["folder_name"], "Folder1")
+        self.assertEqual(first["count"], 4)
+        self.assertEqual(first["min_memory"], 10)
+        self.assertEqual(first["max_memory"], 11)
+        self.assertEqual(first["memory_anchor"], 10)
+        self.assertEqual(first["measurements"][0].id, first["sample_id"])
+        self.assertLess(first["min_datetime"], first["max_datetime"])
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from soil_analysis.domain.repository.jma import JmaRepository
 from soil_analysis.domain.service.prefecture_commercial_area import (
     JAPAN_MAP_PREFECTURES,
     PrefectureCommercialAreaService,
@@ -29,6 +30,8 @@ from soil_analysis.models import (
 
 class PrefectureCommercialAreaDashboardTest(TestCase):
     def setUp(self):
+        # キャッシュはテストのロールバック対象外なので、前のテストの結果を持ち越さない
+        PrefectureCommercialAreaService.invalidate()
         self.user = get_user_model().objects.create_user(username="market-user")
         self.category = CompanyCategory.objects.create(name="農業法人")
         self.company = Company.objects.create(
@@ -894,6 +897,62 @@ class PrefectureCommercialAreaDashboardTest(TestCase):
         self.assertContains(response, "沖縄県 に関係する売り込み候補はありません。")
         self.assertContains(response, "沖縄県 に登録済みの圃場はありません。")
 
+    def test_build_reuses_cached_dashboard_until_source_tables_change(self):
+        """
+        シナリオ:
+        - 入力: 集計元テーブルが変わらないDB状態と、圃場を1件追加したDB状態。
+        - 処理: 都道府県別商圏Serviceを繰り返し実行する。
+        - 期待値: 変化がなければクエリを発行せずキャッシュ済みのVOを返し、
+          圃場が追加されると保存シグナルで無効化されて再集計されること。
+        """
+        # Given
+        first_dashboard = PrefectureCommercialAreaService.build()
+
+        # When
+        with self.assertNumQueries(0):
+            second_dashboard = PrefectureCommercialAreaService.build()
+        Land.objects.create(
+            name="静岡テスト圃場",
+            company=self.company,
+            jma_city=self._get_city("静岡県"),
+            cultivation_type=self.cultivation_type,
+            owner=self.user,
+            center="34.74424,137.64905",
+        )
+        third_dashboard = PrefectureCommercialAreaService.build()
+
+        # Then
+        self.assertEqual(first_dashboard, second_dashboard)
+        self.assertEqual(self._find_area(first_dashboard.areas, "静岡県").land_count, 0)
+        self.assertEqual(self._find_area(third_dashboard.areas, "静岡県").land_count, 1)
+
+    def test_build_refreshes_after_explicit_invalidate(self):
+        """
+        シナリオ:
+        - 入力: キャッシュ済みのダッシュボードと、シグナルを伴わない一括入れ替えで追加した警報。
+        - 処理: 取得バッチと同じく入れ替え後に invalidate を呼び、再度組み立てる。
+        - 期待値: 入れ替え前は古いVOのまま、invalidate 後は新しい警報が反映されること。
+        """
+        # Given
+        PrefectureCommercialAreaService.build()
+        region = self._get_city("静岡県").jma_region
+        JmaRepository.replace_warnings(
+            [JmaWarning(jma_region=region, warnings="大雨警報")]
+        )
+
+        # When
+        stale_dashboard = PrefectureCommercialAreaService.build()
+        PrefectureCommercialAreaService.invalidate()
+        fresh_dashboard = PrefectureCommercialAreaService.build()
+
+        # Then
+        self.assertEqual(
+            self._find_area(stale_dashboard.areas, "静岡県").warning_city_count, 0
+        )
+        self.assertEqual(
+            self._find_area(fresh_dashboard.areas, "静岡県").warning_city_count, 1
+        )
+
     @staticmethod
     def _find_area(areas, prefecture_name):
         return next(area for area in areas if area.prefecture_name == prefecture_name)
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from soil_analysis.domain.service.weather_icon_sprite import (
+    INDEX_FILENAME,
+    SPRITE_FILENAME,
+    WeatherIconSpriteService,
+)
+
+ICON_SVG = (
+    '<svg width="{width}" height="60" viewBox="0 0 {width} 60"'
+    ' xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+    '<defs><linearGradient id="a"/></defs>'
+    '<path fill="url(#a)" d="M0 0h10v10z"/><use xlink:href="#a"/></svg>'
+)
+
+
+class WeatherIconSpriteServiceTest(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.svg_dir = os.path.join(self.tmpdir.name, "svg")
+        os.makedirs(self.svg_dir)
+        for name, width in [("100.svg", 90), ("101.svg", 80)]:
+            with open(os.path.join(self.svg_dir, name), "w", encoding="utf-8") as f:
+                f.write(ICON_SVG.format(width=width))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _build(self) -> bool:
+        return WeatherIconSpriteService.build(
+            svg_dir=self.svg_dir, output_dir=self.tmpdir.name
+        )
+
+    def test_build_writes_sprite_and_index(self):
+        self.assertTrue(self._build())
+
+        icons = WeatherIconSpriteService.get_index(self.tmpdir.name)
+        self.assertEqual(
+            {"view": "icon-101", "x": 90.0, "y": 0.0, "width": 80.0, "height": 60.0},
+            icons["101.svg"],
+        )
+
+        with open(os.path.join(self.tmpdir.name, SPRITE_FILENAME)) as f:
+            sprite = f.read()
+        self.assertIn('<view id="icon-100" viewBox="0 0 90 60"/>', sprite)
+        # アイコンごとに id と参照へ接頭辞が付き、衝突しない
+        self.assertIn('id="100-a"', sprite)
+        self.assertIn('fill="url(#101-a)"', sprite)
+        self.assertIn('xlink:href="#101-a"', sprite)
+        self.assertNotIn('id="a"', sprite)
+
+    def test_build_skips_when_icons_unchanged(self):
+        self.assertTrue(self._build())
+        self.assertFalse(self._build())
+
+        with open(os.path.join(self.svg_dir, "101.svg"), "w", encoding="utf-8") as f:
+            f.write(ICON_SVG.format(width=70))
+        self.assertTrue(self._build())
+        with open(os.path.join(self.tmpdir.name, INDEX_FILENAME)) as f:
+            self.assertEqual(70.0, json.load(f)["icons"]["101.svg"]["width"])
@@ -39,6 +39,11 @@ urlpatterns = [
         views.StandardReportView.as_view(),
         name="standard_report",
     ),
+    path(
+        "company/<int:company_id>/standard_report/export",
+        views.StandardReportExportView.as_view(),
+        name="standard_report_export",
+    ),
     path(
         "hardness/upload",
         views.HardnessUploadView.as_view(),
@@ -1,10 +1,8 @@
 import dataclasses
 import glob
-import io
 import os
 import re
 import shutil
-import zipfile
 from pathlib import Path
 
 from django.contrib import messages
@@ -17,6 +15,7 @@ from django.http import (
     HttpResponseRedirect,
     JsonResponse,
     Http404,
+    StreamingHttpResponse,
 )
 from django.shortcuts import redirect
 from django.urls import reverse, reverse_lazy
@@ -31,7 +30,7 @@ from django.views.generic import (
 )
 from openpyxl import Workbook, load_workbook
 
-from lib.geo.valueobject.coord import XarvioCoord
+from lib.geo.valueobject.coord import GoogleMapsCoord, XarvioCoord
 from lib.zipfileservice import ZipFileService
 from soil_analysis.domain.repository.chemical_import_error import (
     ChemicalImportErrorRepository,
@@ -56,9 +55,6 @@ from soil_analysis.domain.service.chemical_import_service import (
 from soil_analysis.domain.service.hardness_import_service import (
     HardnessImportService,
 )
-from soil_analysis.domain.service.hardness_measurement_service import (
-    HardnessMeasurementService,
-)
 from soil_analysis.domain.service.hardness_plot_generation import (
     HardnessPlotGenerationService,
 )
@@ -70,10 +66,10 @@ from soil_analysis.domain.service.prefecture_commercial_area import (
     PrefectureCommercialAreaService,
 )
 from soil_analysis.domain.service.photo_processing import PhotoProcessingService
+from soil_analysis.domain.service.report_assessment import ReportAssessmentService
+from soil_analysis.domain.service.route_optimization import RouteOptimizationService
+from soil_analysis.domain.service.workbook_export import WorkbookExportService
 from soil_analysis.domain.valueobject.photo_processing.photo_spot import PhotoSpot
-from soil_analysis.domain.valueobject.report.chemical_assessment import (
-    ChemicalAssessmentVO,
-)
 from soil_analysis.domain.valueobject.report.fields import REPORT_FIELDS
 from soil_analysis.domain.valueobject.report.hardness_assessment import (
     HardnessBlockAssessment,
@@ -354,15 +350,12 @@ class StandardReportView(ListView):
         context["land_blocks"] = LandBlockRepository.get_all()
         context["report_fields"] = REPORT_FIELDS
 
-        # 化学判定VOの生成
-        context["chemical_assessment"] = ChemicalAssessmentVO.from_measurements(
-            [context["soil_analysis"]] if context["soil_analysis"] else []
-        )
-
-        # 硬度判定VOの生成
-        context["hardness_assessment"] = (
-            HardnessMeasurementService.get_hardness_assessment(land_ledger)
+        # 化学判定VO・硬度判定VO（台帳ごとの集計キャッシュから取得）
+        chemical_assessment, hardness_assessment = (
+            ReportAssessmentService.get_assessments(land_ledger)
         )
+        context["chemical_assessment"] = chemical_assessment
+        context["hardness_assessment"] = hardness_assessment
 
         context["hardness_thresholds"] = {
             "low": HardnessBlockAssessment.THRESHOLD_LOW,
@@ -394,6 +387,35 @@ class StandardReportView(ListView):
         return context
 
 
+class StandardReportExportView(View):
+    """
+    会社に属する全台帳の化学分析レポート（通知表）項目を xlsx でダウンロード提供
+
+    圃場数が多くても、行は DB から少しずつ取り出して write_only のシートへ書き、
+    出来上がったファイルはチャンクに分けてストリーミングで返す。
+    """
+
+    @staticmethod
+    def get(request, company_id):
+        try:
+            CompanyRepository.get_company_by_id(company_id)
+        except Company.DoesNotExist:
+            raise Http404("Company does not exist.")
+
+        response = StreamingHttpResponse(
+            WorkbookExportService.iter_standard_report(
+                SoilChemicalMeasurementRepository.iter_by_company(company_id)
+            ),
+            content_type=(
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            ),
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="standard_report_{company_id}.xlsx"'
+        )
+        return response
+
+
 class LandLedgerCreateAjaxView(View):
     """
     帳簿（LandLedger）の新規作成Ajax処理
@@ -543,15 +565,18 @@ class ChemicalUploadView(FormView):
             return self.form_invalid(form)
 
         try:
-            workbook = load_workbook(upload_file, data_only=True)
-            if len(workbook.sheetnames) != 1:
-                messages.error(
-                    self.request, "Excelファイルのシート数は1枚にしてください。"
-                )
-                return self.form_invalid(form)
+            workbook = load_workbook(upload_file, read_only=True, data_only=True)
+            try:
+                if len(workbook.sheetnames) != 1:
+                    messages.error(
+                        self.request, "Excelファイルのシート数は1枚にしてください。"
+                    )
+                    return self.form_invalid(form)
 
-            worksheet = workbook.active
-            parse_result = ChemicalImportService.parse_kawada_worksheet(worksheet)
+                worksheet = workbook.active
+                parse_result = ChemicalImportService.parse_kawada_worksheet(worksheet)
+            finally:
+                workbook.close()
 
             if parse_result.errors:
                 error_data = []
@@ -882,8 +907,10 @@ class HardnessDeleteAllView(View):
             # 削除前のレコード数を取得
             count = SoilHardnessMeasurement.objects.count()
 
-            # 全データ削除
-            SoilHardnessMeasurement.objects.all().delete()
+            # 全データ削除（判定の集計キャッシュも同じトランザクションで消す）
+            with transaction.atomic():
+                SoilHardnessMeasurement.objects.all().delete()
+                ReportAssessmentService.invalidate_all()
 
             messages.success(
                 request,
@@ -902,33 +929,42 @@ class ChemicalDownloadSampleView(View):
 
     @staticmethod
     def get(request, *args, **kwargs):
-        zip_buffer = io.BytesIO()
-        sample_files = {
-            "chemical_stage01.xlsx": ChemicalDownloadSampleView._create_workbook_bytes(
-                stage=1
+        sample_files = [
+            (
+                "chemical_stage01.xlsx",
+                WorkbookExportService.iter_workbook(
+                    ChemicalDownloadSampleView._create_workbook(stage=1)
+                ),
+            ),
+            (
+                "chemical_stage02.xlsx",
+                WorkbookExportService.iter_workbook(
+                    ChemicalDownloadSampleView._create_workbook(stage=2)
+                ),
             ),
-            "chemical_stage02.xlsx": ChemicalDownloadSampleView._create_workbook_bytes(
-                stage=2
+            (
+                "chemical_duplicate.xlsx",
+                WorkbookExportService.iter_workbook(
+                    ChemicalDownloadSampleView._create_workbook(stage=1)
+                ),
             ),
-            "chemical_duplicate.xlsx": ChemicalDownloadSampleView._create_workbook_bytes(
-                stage=1
+            (
+                "README.txt",
+                [ChemicalDownloadSampleView._create_readme().encode("utf-8")],
             ),
-            "README.txt": ChemicalDownloadSampleView._create_readme().encode("utf-8"),
-        }
-
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for filename, content in sample_files.items():
-                zip_file.writestr(filename, content)
+        ]
 
-        response = HttpResponse(zip_buffer.getvalue(), content_type="application/zip")
+        response = StreamingHttpResponse(
+            WorkbookExportService.iter_zip(sample_files),
+            content_type="application/zip",
+        )
         response["Content-Disposition"] = 'attachment; filename="chemical_samples.zip"'
         return response
 
     @staticmethod
-    def _create_workbook_bytes(stage: int) -> bytes:
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "川田研究所レポート"
+    def _create_workbook(stage: int) -> Workbook:
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("川田研究所レポート")
 
         worksheet.append(
             [
@@ -983,9 +1019,7 @@ class ChemicalDownloadSampleView(View):
                 )
             )
 
-        output = io.BytesIO()
-        workbook.save(output)
-        return output.getvalue()
+        return workbook
 
     @staticmethod
     def _create_chemical_row(
@@ -1041,8 +1075,10 @@ class ChemicalDeleteAllView(View):
             # 削除前のレコード数を取得
             count = SoilChemicalMeasurement.objects.count()
 
-            # 全データ削除
-            SoilChemicalMeasurement.objects.all().delete()
+            # 全データ削除（判定の集計キャッシュも同じトランザクションで消す）
+            with transaction.atomic():
+                SoilChemicalMeasurement.objects.all().delete()
+                ReportAssessmentService.invalidate_all()
 
             messages.success(
                 request,
@@ -1341,6 +1377,8 @@ class RouteSuggestUploadView(FormView):
         Notes: Directions API の地点を制限する
          可能であれば、クエリでのユーザー入力を最大 10 地点に制限します。10 を超える地点を含むリクエストは、課金レートが高くなります。
          https://developers.google.com/maps/optimization-guide?hl=ja#routes
+         訪問順序は RouteOptimizationService でローカルに計算するため地点数の上限はなく、
+         Directions API は順序確定後の経路描画にだけ使います。
         """
         upload_file: UploadedFile = self.request.FILES["file"]
         kml_raw = upload_file.read().decode("utf-8")
@@ -1351,20 +1389,19 @@ class RouteSuggestUploadView(FormView):
             messages.error(self.request, "少なくとも 2 つの場所を指定してください")
             return redirect(self.request.META.get("HTTP_REFERER"))
 
-        if len(land_location_list) > 10:
-            messages.error(
-                self.request,
-                "GoogleMapsAPIのレート上昇制約により 10 地点までしか計算できません",
-            )
-            return redirect(self.request.META.get("HTTP_REFERER"))
+        # KMLの先頭地点を始点として訪問順序を最適化
+        route = RouteOptimizationService.solve(
+            [land_location.center.to_google() for land_location in land_location_list]
+        )
 
-        entities = []
-        for land_location in land_location_list:
-            coordinates_str = land_location.center.to_google().to_str()
-            entity = RouteSuggestImport.objects.create(
-                name=land_location.name, coord=coordinates_str
+        entities = [
+            RouteSuggestImport(
+                name=land_location_list[index].name,
+                coord=land_location_list[index].center.to_google().to_str(),
+                ordering=order,
             )
-            entities.append(entity)
+            for order, index in enumerate(route, start=1)
+        ]
         RouteSuggestImport.objects.all().delete()
         RouteSuggestImport.objects.bulk_create(entities)
 
@@ -1375,21 +1412,42 @@ class RouteSuggestOrderingView(ListView):
     model = RouteSuggestImport
     template_name = "soil_analysis/route_suggest/ordering.html"
 
+    def get_queryset(self):
+        return RouteSuggestImport.objects.all().order_by("ordering", "pk")
+
     def post(self, request, *args, **kwargs):
+        """
+        並べ替え結果の始点・終点を固定し、中間地点の訪問順序をローカルで最適化して
+        1回の bulk_update で保存します。
+        """
         order_data = self.request.POST.get("order_data")
 
         try:
             if order_data:
-                order_ids = order_data.split(",")
-                for order, order_id in enumerate(order_ids, start=1):
-                    route_suggest = RouteSuggestImport.objects.get(pk=order_id)
-                    route_suggest.ordering = order
-                    route_suggest.save()
+                order_ids = [int(order_id) for order_id in order_data.split(",")]
+                route_suggest_map = RouteSuggestImport.objects.in_bulk(order_ids)
+                if len(route_suggest_map) != len(set(order_ids)):
+                    raise RouteSuggestImport.DoesNotExist
+
+                route_suggests = [route_suggest_map[pk] for pk in order_ids]
+                route = RouteOptimizationService.solve(
+                    [
+                        # coord は "緯度,経度"（GoogleMapsCoord.to_str の形式）
+                        GoogleMapsCoord(*map(float, route_suggest.coord.split(",")))
+                        for route_suggest in route_suggests
+                    ],
+                    fix_end=True,
+                )
+                for order, index in enumerate(route, start=1):
+                    route_suggests[index].ordering = order
+                RouteSuggestImport.objects.bulk_update(
+                    route_suggests, fields=["ordering"]
+                )
 
             messages.success(request, "Data updated successfully")
             return redirect(reverse("soil:route_suggest_success"))
 
-        except RouteSuggestImport.DoesNotExist:
+        except (RouteSuggestImport.DoesNotExist, ValueError):
             messages.error(request, "Invalid order data provided.")
             return redirect(request.META.get("HTTP_REFERER"))
 
@@ -0,0 +1,65 @@
+from datetime import date
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from usa_research.models import AssetMonthEndPrice, AssetPrice
+
+BULK_BATCH_SIZE = 1000
+
+
+class AssetPriceRepository:
+    """
+    資産クラスの価格（AssetPrice）と、その月末価格（AssetMonthEndPrice）のDB操作を担当します。
+    """
+
+    @staticmethod
+    def month_end_prices() -> QuerySet:
+        """
+        長期推移グラフ用の月末価格を、月・シンボルの順で取得します。
+
+        Returns:
+            QuerySet: AssetMonthEndPrice（month, symbol, date, price）
+        """
+        return AssetMonthEndPrice.objects.order_by("month", "symbol")
+
+    @staticmethod
+    def refresh_month_end(since: date | None = None) -> int:
+        """
+        AssetPrice から月末価格を作り直します。
+
+        since を含む月以降だけを作り直し、それより前の月（確定済み）には触れません。
+        since が None のときは全期間を作り直します（既存の月末価格はいったん削除）。
+
+        Args:
+            since: この日を含む月以降を作り直す
+
+        Returns:
+            int: 保存した月末価格の件数
+        """
+        prices = AssetPrice.objects.order_by("date")
+        month_ends = AssetMonthEndPrice.objects.all()
+        if since is not None:
+            since = since.replace(day=1)
+            prices = prices.filter(date__gte=since)
+            month_ends = month_ends.filter(month__gte=since)
+
+        # 日付の昇順に読むので、(月, シンボル) ごとに最後に見た行がその月の最終取引日になる
+        latest = {}
+        for price_date, symbol, price in prices.values_list(
+            "date", "symbol", "price"
+        ).iterator(chunk_size=BULK_BATCH_SIZE):
+            latest[(price_date.replace(day=1), symbol)] = (price_date, price)
+
+        with transaction.atomic():
+            month_ends.delete()
+            AssetMonthEndPrice.objects.bulk_create(
+                [
+                    AssetMonthEndPrice(
+                        month=month, symbol=symbol, date=price_date, price=price
+                    )
+                    for (month, symbol), (price_date, price) in latest.items()
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+        return len(latest)
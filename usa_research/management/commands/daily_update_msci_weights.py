@@ -32,7 +32,7 @@ class Command(BaseCommand):
         1. 解析: 指定されたURLからHTTP HEADリクエストを送り、Last-Modifiedヘッダで鮮度を確認。更新があればPDFをダウンロードし、テキストを抽出。LLMで要約を生成する。
         2. 観察: DBから既存の最新レコードを取得する。
         3. 判断: HTTPヘッダの日付が既存レコードの日付より新しければ本処理へ。同じか古ければ終了。
-        4. 本処理: 新規レコードをDBに保存する。
+        4. 本処理: 新規レコードをDBに保存する（要約のHTMLもここで描画して保存する）。
         """
         url = options["url"]
         self.stdout.write(f"Processing MSCI report from: {url}")
@@ -140,7 +140,7 @@ class Command(BaseCommand):
         except Exception as e:
             return MsciUpdateResult(False, f"LLM要約失敗: {str(e)}")
 
-        # 5. 保存（冪等性は上流の判定で担保）
+        # 5. 保存（冪等性は上流の判定で担保）。要約のHTMLは保存時に1回だけ描画される
         MsciCountryWeightReport.objects.create(
             report_date=report_date, summary_md=summary_md, pdf_url=pdf_url
         )
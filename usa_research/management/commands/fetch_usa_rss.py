@@ -1,8 +1,9 @@
-import feedparser
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import datetime
 from time import mktime
+
+from lib.rss.feed_store import RssFeedStore
 from usa_research.models import RssSource, RssFeed
 
 
@@ -17,6 +18,10 @@ class Command(BaseCommand):
        短時間の頻繁なアクセスによるアクセス制限（BAN）を回避します。
     3. 既存アプリとの統一性:
        プロジェクトの他の機能（ベトナム株データ等）と同様、日次バッチ（cron等）での運用を前提としています。
+    4. 取得の共通化:
+       取得は RssFeedStore（ベトナムのダッシュボードと共通）経由の条件付きGETで行います。
+       取り込みは取得の成否（304や通信エラーを含む）にかかわらず保存済みのコピーから行い、
+       linkで重複を除くので、前回取り込みに失敗した記事も次の実行で拾えます。
     """
 
     help = "Fetch RSS feeds from sources"
@@ -25,13 +30,34 @@ class Command(BaseCommand):
         # 初回実行時などのためにソースを登録（必要に応じて）
         self.init_sources()
 
+        store = RssFeedStore.default()
         sources = RssSource.objects.filter(is_active=True)
         for source in sources:
             self.stdout.write(f"Fetching {source.name}...")
-            feed = feedparser.parse(source.url)
+            try:
+                store.refresh(source.url)
+            except Exception as e:
+                # 失敗しても前回のコピーは残るので、そのコピーから取り込みを続ける
+                self.stdout.write(
+                    self.style.ERROR(f"Failed to fetch {source.name}: {e}")
+                )
+
+            feed = store.parsed(source.url)
+            if feed is None:
+                continue
+            entries = [entry for entry in feed.entries if entry.get("link")]
+
+            # 重複チェック（linkをユニークキーとする）。既存のlinkは1クエリでまとめて引く
+            existing_links = set(
+                RssFeed.objects.filter(
+                    link__in=[entry.link for entry in entries]
+                ).values_list("link", flat=True)
+            )
+            new_feeds = {}
+            for entry in entries:
+                if entry.link in existing_links or entry.link in new_feeds:
+                    continue
 
-            count = 0
-            for entry in feed.entries:
                 # 日付の取得
                 published_at = timezone.now()
                 if hasattr(entry, "published_parsed") and entry.published_parsed:
@@ -43,20 +69,17 @@ class Command(BaseCommand):
                     published_at = datetime.fromtimestamp(mktime(entry.updated_parsed))
                     published_at = timezone.make_aware(published_at)
 
-                # 重複チェック（linkをユニークキーとする）
-                if not RssFeed.objects.filter(link=entry.link).exists():
-                    RssFeed.objects.create(
-                        source=source,
-                        title=entry.get("title", "No Title")[:500],
-                        summary=(
-                            entry.get("summary", "")
-                            if hasattr(entry, "summary")
-                            else ""
-                        ),
-                        link=entry.link,
-                        published_at=published_at,
-                    )
-                    count += 1
+                new_feeds[entry.link] = RssFeed(
+                    source=source,
+                    title=entry.get("title", "No Title")[:500],
+                    summary=(
+                        entry.get("summary", "") if hasattr(entry, "summary") else ""
+                    ),
+                    link=entry.link,
+                    published_at=published_at,
+                )
+            RssFeed.objects.bulk_create(new_feeds.values(), ignore_conflicts=True)
+            count = len(new_feeds)
 
             source.last_fetched_at = timezone.now()
             source.save()
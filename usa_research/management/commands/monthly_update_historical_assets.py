@@ -1,11 +1,14 @@
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 import pandas as pd
 import yfinance as yf
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
 
+from usa_research.domain.repository.asset_price import AssetPriceRepository
 from usa_research.models import AssetPrice
 
 # 対象資産の定義
@@ -21,6 +24,34 @@ TICKERS = {
     "Gold": "GC=F",
     "Dollar": "DX-Y.NYB",
 }
+BULK_BATCH_SIZE = 1000
+
+
+def extract_prices(data: pd.DataFrame, tickers: list[str]) -> pd.DataFrame:
+    """
+    yf.download(group_by="ticker") の結果から、(date, symbol, price) の縦持ちを作る。
+    Adj Close が無いティッカーは Close を使い、欠損値の行は含めない。
+    """
+    frames = []
+    for ticker in tickers:
+        if ticker not in data.columns.get_level_values(0):
+            continue
+        ticker_data = data[ticker]
+        col_name = "Adj Close" if "Adj Close" in ticker_data.columns else "Close"
+        if col_name not in ticker_data.columns:
+            continue
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": pd.to_datetime(ticker_data.index).date,
+                    "symbol": ticker,
+                    "price": ticker_data[col_name].astype(float).to_numpy(),
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=["date", "symbol", "price"])
+    return pd.concat(frames, ignore_index=True).dropna(subset=["price"])
 
 
 class Command(BaseCommand):
@@ -39,18 +70,26 @@ class Command(BaseCommand):
         parser.add_argument(
             "--full",
             action="store_true",
-            help="Fetch full historical data (max period). If not specified, fetches last 30 days.",
+            help="Rebuild from full historical data (max period), overwriting stored "
+            "prices. If not specified, only appends rows after the latest stored date "
+            "per asset.",
         )
         parser.add_argument(
             "--start",
             type=str,
-            help="Start date (YYYY-MM-DD). If specified, overrides --full and default 30 days.",
+            help="Start date (YYYY-MM-DD). If specified, overrides --full and the "
+            "incremental mode.",
         )
         parser.add_argument(
             "--end",
             type=str,
             help="End date (YYYY-MM-DD). Defaults to today.",
         )
+        parser.add_argument(
+            "--month-end-only",
+            action="store_true",
+            help="Skip downloading and rebuild month-end prices from stored data.",
+        )
 
     def handle(self, *args, **options):
         """
@@ -65,30 +104,45 @@ class Command(BaseCommand):
 
         処理のフロー:
         1. 引数の解析:
-           - `--full`: 全期間 (max) のデータを取得。
-           - `--start YYYY-MM-DD`: 指定された開始日からのデータを取得。
-           - 指定がない場合: 直近30日間のデータをデフォルトで取得。
+           - `--full`: 全期間 (max) のデータを取得し、保存済みの価格も上書き（訂正の取り込み用）。
+           - `--start YYYY-MM-DD`: 指定された開始日からのデータを取得し、期間内を上書き。
+           - 指定がない場合（差分モード）: 資産ごとの保存済み最終日より後の行だけを追加。
+             取得は最も古い最終日の翌日から行い、まだ1件も無い資産があれば全期間を取得する。
         2. yfinance (yf.download) を使用して、定義されたティッカーのデータを一括取得。
            - `Adj Close` (調整後終値) を優先的に使用し、存在しない場合は `Close` を使用。
            - 1日単位 (`interval="1d"`) のデータを取得。
         3. 取得データの正規化:
            - 単一ティッカー取得時と複数ティッカー取得時で pandas.DataFrame の構造が異なるため、
              一貫してマルチインデックス形式で扱えるよう補正。
+           - 価格を (date, symbol, price) の縦持ちにまとめる（extract_prices）。
         4. データベースへの保存:
-           - 取得した各日付・各資産の価格をループ処理。
-           - `AssetPrice.objects.update_or_create` を使用し、既存データがあれば更新、なければ新規作成。
-           - 重複を避けつつ、最新の価格データに同期。
+           - `bulk_create(update_conflicts=True)` で BULK_BATCH_SIZE 件ずつ書き込む。
+             (date, symbol) が既存なら価格を更新、なければ新規作成。
+        5. 月末価格（AssetMonthEndPrice）の更新:
+           - 書き込んだ最古の日を含む月以降を作り直す（`--full` なら全期間）。
+           - トップページの長期推移グラフはこのテーブルだけを読む。
+           - `--month-end-only` なら取得せず、保存済みの AssetPrice から全期間を作り直す。
 
         利用シーン:
         - 初回構築時: `--full` または `--start 2000-01-01` 等を指定して過去データを一括投入。
-        - 定期更新: 引数なしで実行し、直近30日分のデータを取得して最新状態を維持（月次バッチ想定）。
+        - 定期更新: 引数なしで実行し、前回以降（おおむね直近1ヶ月）の行だけを追加（月次バッチ想定）。
+        - 過去データの訂正: `--full` で全期間を書き直す。
         """
+        if options.get("month_end_only"):
+            count = AssetPriceRepository.refresh_month_end()
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {count} month-end asset price records.")
+            )
+            return
+
         self.stdout.write("Fetching historical asset prices...")
 
         is_full = options.get("full")
         start_date_arg = options.get("start")
         end_date_arg = options.get("end")
 
+        # 差分モードで使う、資産ごとの保存済み最終日
+        latest_dates = {}
         if start_date_arg:
             self.stdout.write(f"Mode: Custom range (Start: {start_date_arg})")
             start_date = start_date_arg
@@ -98,9 +152,25 @@ class Command(BaseCommand):
             period = "max"
             start_date = None
         else:
-            self.stdout.write("Mode: Last 30 days")
-            period = None
-            start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+            latest_dates = dict(
+                AssetPrice.objects.filter(symbol__in=TICKERS.values())
+                .values("symbol")
+                .annotate(latest=Max("date"))
+                .values_list("symbol", "latest")
+            )
+            if len(latest_dates) < len(TICKERS):
+                self.stdout.write("Mode: Incremental (full history for new assets)")
+                period = "max"
+                start_date = None
+            else:
+                period = None
+                start_date = (min(latest_dates.values()) + timedelta(days=1)).strftime(
+                    "%Y-%m-%d"
+                )
+                self.stdout.write(f"Mode: Incremental (Start: {start_date})")
+                if start_date > datetime.now().strftime("%Y-%m-%d"):
+                    self.stdout.write(self.style.SUCCESS("Already up to date."))
+                    return
 
         tickers_list = list(TICKERS.values())
 
@@ -131,37 +201,34 @@ class Command(BaseCommand):
             # マルチインデックスにする
             data.columns = pd.MultiIndex.from_product([[ticker], data.columns])
 
-        all_dates = data.index
-        count = 0
-
-        for date_ts in all_dates:
-            date_only = date_ts.date()
-
-            for asset_name, ticker in TICKERS.items():
-                try:
-                    # ティッカーが存在し、かつ None でないことを確認
-                    if ticker not in data or data[ticker] is None:
-                        continue
-
-                    # 調整後終値を取得
-                    # Yahoo Financeのデータ構造を確認
-                    # Adj Close が無い場合は Close を使用
-                    col_name = (
-                        "Adj Close" if "Adj Close" in data[ticker].columns else "Close"
-                    )
-                    val = data[ticker][col_name].loc[date_ts]
-                    if pd.notna(val):
-                        price = float(val)
-
-                        # 保存処理 (update_or_create)
-                        obj, created = AssetPrice.objects.update_or_create(
-                            date=date_only, symbol=ticker, defaults={"price": price}
-                        )
-                        if created:
-                            count += 1
-                except (KeyError, IndexError, TypeError):
-                    continue
+        prices = extract_prices(data, tickers_list)
+
+        # 差分モードでは、資産ごとに保存済み最終日より後の行だけを残す
+        if latest_dates:
+            stored_until = prices["symbol"].map(latest_dates).fillna(date.min)
+            prices = prices[prices["date"] > stored_until]
+
+        AssetPrice.objects.bulk_create(
+            [
+                AssetPrice(date=row.date, symbol=row.symbol, price=row.price)
+                for row in prices.itertuples(index=False)
+            ],
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            # MySQL の ON DUPLICATE KEY UPDATE は一意キーを指定できない
+            unique_fields=(
+                ["date", "symbol"]
+                if connection.features.supports_update_conflicts_with_target
+                else None
+            ),
+            update_fields=["price"],
+        )
 
         self.stdout.write(
-            self.style.SUCCESS(f"Successfully updated {count} new asset price records.")
+            self.style.SUCCESS(f"Successfully saved {len(prices)} asset price records.")
         )
+
+        if is_full and not start_date_arg:
+            AssetPriceRepository.refresh_month_end()
+        elif not prices.empty:
+            AssetPriceRepository.refresh_month_end(since=prices["date"].min())
@@ -1,10 +1,13 @@
 import os
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
 
 from usa_research.models import Sector, SectorDailySnapshot
 
@@ -22,6 +25,88 @@ SECTORS = {
     "Communication Services": "XLC",
 }
 BENCHMARK = "SPY"
+BULK_BATCH_SIZE = 500
+
+# 十分なデータがある（20日リターンと5日差分が揃う）のは先頭から何行目以降か
+WARMUP_ROWS = 25
+
+
+def build_snapshot_rows(adj_close_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    終値（列: シンボル、行: 日付）から、日付×セクターの指標を縦持ちで返す。
+
+    Returns:
+        pd.DataFrame: date, symbol, rs_20d, rs_slope_5d, rank, rank_delta_5d, signal の列。
+            指標のどれかが欠損している行は含まない
+    """
+    # 欠損値補完
+    adj_close_data = adj_close_data.ffill()
+
+    # 3. リターンの計算 (20日リターン)
+    returns_20d = adj_close_data.pct_change(20, fill_method=None)
+
+    # 4. RS (Relative Strength) の計算
+    # RS_20d = (セクターETFの20日リターン − SPYの20日リターン) * 100 (%)
+    sector_symbols = [s for s in SECTORS.values() if s in returns_20d.columns]
+    rs_20d = returns_20d[sector_symbols].sub(returns_20d[BENCHMARK], axis=0) * 100
+
+    # 5. Rank の計算 (RS_20d を全11セクターで降順ソート)
+    rank_df = rs_20d.rank(axis=1, ascending=False)
+
+    # 6. ΔRS (5日) と ΔRank (5日) の計算
+    # ΔRS_5d = RS_20d(today) − RS_20d(5営業日前)
+    # ΔRank_5d = Rank(today) − Rank(5営業日前)
+    rs_slope_5d = rs_20d.diff(5)
+    rank_delta_5d = rank_df.diff(5)
+
+    rows = pd.concat(
+        {
+            "rs_20d": rs_20d,
+            "rs_slope_5d": rs_slope_5d,
+            "rank": rank_df,
+            "rank_delta_5d": rank_delta_5d,
+        },
+        axis=1,
+    ).iloc[WARMUP_ROWS:]
+    rows.columns.names = ["field", "symbol"]
+    rows.index.name = "date"
+    rows = rows.stack("symbol", future_stack=True).dropna().reset_index()
+
+    rows["date"] = pd.to_datetime(rows["date"]).dt.date
+    rows["rank"] = rows["rank"].astype(int)
+    rows["rank_delta_5d"] = rows["rank_delta_5d"].astype(int)
+    rows["signal"] = calculate_signals(
+        rows["rs_20d"], rows["rs_slope_5d"], rows["rank_delta_5d"]
+    )
+    return rows[
+        ["date", "symbol", "rs_20d", "rs_slope_5d", "rank", "rank_delta_5d", "signal"]
+    ]
+
+
+def calculate_signals(
+    rs_20d: pd.Series, rs_slope_5d: pd.Series, rank_delta_5d: pd.Series
+) -> np.ndarray:
+    """
+    計算された指標に基づき、信号機（Signal）の色を列単位で判定します（上の条件ほど優先）。
+
+    判定基準:
+    - Green (出遅れからの反発):
+        市場平均より弱く（RS < 0）、勢いが改善（ΔRS > 0）しており、かつ順位が2位以上上昇（ΔRank <= -2）している場合。
+    - Yellow (勢い改善中):
+        5営業日前よりもRSが改善（ΔRS > 0）している場合。
+    - Red (過熱からの失速):
+        市場平均より強く（RS > 0）、勢いが衰え（ΔRS < 0）ており、かつ順位が2位以上下落（ΔRank >= 2）している場合。
+    - None: 上記以外。
+    """
+    return np.select(
+        [
+            (rs_20d < 0) & (rs_slope_5d > 0) & (rank_delta_5d <= -2),
+            rs_slope_5d > 0,
+            (rs_20d > 0) & (rs_slope_5d < 0) & (rank_delta_5d >= 2),
+        ],
+        ["Green", "Yellow", "Red"],
+        default="None",
+    )
 
 
 class Command(BaseCommand):
@@ -36,6 +121,13 @@ class Command(BaseCommand):
         os.makedirs(cache_dir, exist_ok=True)
         yf.set_tz_cache_location(cache_dir)
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="保存済みの日付も含め、取得した期間をすべて書き直す",
+        )
+
     def handle(self, *args, **options):
         """
         米国株セクターETFのデータを取得し、セクターローテーション計数表を更新します。
@@ -48,12 +140,20 @@ class Command(BaseCommand):
         5. RSに基づくセクター内ランクを計算
         6. 5営業日前との比較（ΔRS, ΔRank）を計算
         7. 計算結果をSectorDailySnapshotモデルに保存（信号機ルールの適用を含む）
+
+        Notes: 計算は DataFrame 上でまとめて行い、保存済みの最終日以降の行だけを
+            bulk_create(update_conflicts=True) で書き込む（日付×セクターごとのクエリは発行しない）
         """
         self.stdout.write("Updating sector rotation data...")
 
-        # 1. セクター情報の初期化
+        # 1. セクター情報の初期化（シンボル → Sector の辞書を1回で作る）
+        sectors = {
+            sector.symbol: sector
+            for sector in Sector.objects.filter(symbol__in=SECTORS.values())
+        }
         for name, symbol in SECTORS.items():
-            Sector.objects.get_or_create(name=name, symbol=symbol)
+            if symbol not in sectors:
+                sectors[symbol] = Sector.objects.create(name=name, symbol=symbol)
 
         # 2. データの取得 (直近60営業日以上が必要なので、余裕を持って90日分取得)
         symbols = list(SECTORS.values()) + [BENCHMARK]
@@ -92,98 +192,43 @@ class Command(BaseCommand):
             self.stderr.write("No Adj Close data available.")
             return
 
-        # 欠損値補完
-        adj_close_data = adj_close_data.ffill()
-
-        # 3. リターンの計算 (20日リターン)
-        returns_20d = adj_close_data.pct_change(20, fill_method=None)
-
-        # 4. RS (Relative Strength) の計算
-        # RS_20d = (セクターETFの20日リターン − SPYの20日リターン) * 100 (%)
-        rs_20d = returns_20d.copy()
-        for symbol in SECTORS.values():
-            rs_20d[symbol] = (returns_20d[symbol] - returns_20d[BENCHMARK]) * 100
-
-        # SPYの列は不要なので削除
-        rs_20d = rs_20d.drop(columns=[BENCHMARK])
-
-        # 5. Rank の計算 (RS_20d を全11セクターで降順ソート)
-        rank_df = rs_20d.rank(axis=1, ascending=False)
-
-        # 6. ΔRS (5日) と ΔRank (5日) の計算
-        # ΔRS_5d = RS_20d(today) − RS_20d(5営業日前)
-        # ΔRank_5d = Rank(today) − Rank(5営業日前)
-        rs_slope_5d = rs_20d.diff(5)
-        rank_delta_5d = rank_df.diff(5)
+        # 3〜6. 指標の計算（1行 = 日付×セクター）
+        rows = build_snapshot_rows(adj_close_data)
 
         # 7. データの保存
-        # 直近の営業日から順に保存 (データがある分だけ)
-        dates = rs_20d.index[25:]  # 十分なデータがあるところから開始
-
-        for date in dates:
-            date_only = date.date()
-
-            # 各セクターのデータを保存
-            for name, symbol in SECTORS.items():
-                sector = Sector.objects.get(symbol=symbol)
-
-                try:
-                    rs_val = rs_20d.loc[date, symbol]
-                    rs_slope = rs_slope_5d.loc[date, symbol]
-                    rank_val = int(rank_df.loc[date, symbol])
-                    rank_delta = int(rank_delta_5d.loc[date, symbol])
-
-                    if (
-                        pd.isna(rs_val)
-                        or pd.isna(rs_slope)
-                        or pd.isna(rank_val)
-                        or pd.isna(rank_delta)
-                    ):
-                        continue
-
-                    # 信号機ルールの適用
-                    signal = self._calculate_signal(rs_val, rs_slope, rank_delta)
-
-                    SectorDailySnapshot.objects.update_or_create(
-                        date=date_only,
-                        sector=sector,
-                        defaults={
-                            "rs_20d": rs_val,
-                            "rs_slope_5d": rs_slope,
-                            "rank": rank_val,
-                            "rank_delta_5d": rank_delta,
-                            "signal": signal,
-                        },
-                    )
-                except KeyError:
-                    continue
+        # 保存済みの最終日より前は確定済みなので書かない。最終日は取得時点が場中だった
+        # 可能性があるので書き直す（--full なら取得範囲をすべて書き直す）
+        latest_date = SectorDailySnapshot.objects.aggregate(Max("date"))["date__max"]
+        if latest_date and not options["full"]:
+            rows = rows[rows["date"] >= latest_date]
+
+        snapshots = [
+            SectorDailySnapshot(
+                date=row.date,
+                sector=sectors[row.symbol],
+                rs_20d=row.rs_20d,
+                rs_slope_5d=row.rs_slope_5d,
+                rank=row.rank,
+                rank_delta_5d=row.rank_delta_5d,
+                signal=row.signal,
+            )
+            for row in rows.itertuples(index=False)
+        ]
+        SectorDailySnapshot.objects.bulk_create(
+            snapshots,
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            # MySQL の ON DUPLICATE KEY UPDATE は一意キーを指定できない
+            unique_fields=(
+                ["date", "sector"]
+                if connection.features.supports_update_conflicts_with_target
+                else None
+            ),
+            update_fields=["rs_20d", "rs_slope_5d", "rank", "rank_delta_5d", "signal"],
+        )
 
         self.stdout.write(
-            self.style.SUCCESS("Successfully updated sector rotation data")
+            self.style.SUCCESS(
+                f"Successfully updated sector rotation data ({len(snapshots)} rows)"
+            )
         )
-
-    @staticmethod
-    def _calculate_signal(rs_20d, rs_slope_5d, rank_delta_5d):
-        """
-        計算された指標に基づき、信号機（Signal）の色を判定します。
-
-        判定基準:
-        - Green (出遅れからの反発):
-            市場平均より弱く（RS < 0）、勢いが改善（ΔRS > 0）しており、かつ順位が2位以上上昇（ΔRank <= -2）している場合。
-        - Yellow (勢い改善中):
-            5営業日前よりもRSが改善（ΔRS > 0）している場合。
-        - Red (過熱からの失速):
-            市場平均より強く（RS > 0）、勢いが衰え（ΔRS < 0）ており、かつ順位が2位以上下落（ΔRank >= 2）している場合。
-        - None: 上記以外。
-        """
-        # Green: RS_20d < 0 かつ ΔRS_5d > 0 かつ ΔRank_5d ≤ -2
-        if rs_20d < 0 < rs_slope_5d and rank_delta_5d <= -2:
-            return "Green"
-        # Yellow: ΔRS_5d > 0
-        elif rs_slope_5d > 0:
-            return "Yellow"
-        # Red: RS_20d > 0 かつ ΔRS_5d < 0 かつ ΔRank_5d ≥ 2
-        elif rs_slope_5d < 0 < rs_20d and rank_delta_5d >= 2:
-            return "Red"
-        else:
-            return "None"
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usa_research", "0014_alter_rssfeed_link"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssetMonthEndPrice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("symbol", models.CharField(max_length=10)),
+                ("date", models.DateField()),
+                ("price", models.FloatField()),
+            ],
+            options={
+                "ordering": ["month", "symbol"],
+                "unique_together": {("month", "symbol")},
+            },
+        ),
+    ]
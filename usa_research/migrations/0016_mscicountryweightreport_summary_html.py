@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usa_research", "0015_assetmonthendprice"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mscicountryweightreport",
+            name="summary_html",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="mscicountryweightreport",
+            name="summary_digest",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
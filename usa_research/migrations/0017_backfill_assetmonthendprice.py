@@ -0,0 +1,41 @@
+from django.db import migrations
+
+BULK_BATCH_SIZE = 1000
+
+
+def backfill_month_end_prices(apps, schema_editor):
+    """
+    既存の AssetPrice から月末価格を作る（AssetPriceRepository.refresh_month_end と同じ判定）。
+    次の月次バッチを待たずに長期推移グラフが表示できるようにする。
+    """
+    AssetPrice = apps.get_model("usa_research", "AssetPrice")
+    AssetMonthEndPrice = apps.get_model("usa_research", "AssetMonthEndPrice")
+
+    # 日付の昇順に読むので、(月, シンボル) ごとに最後に見た行がその月の最終取引日になる
+    latest = {}
+    for price_date, symbol, price in (
+        AssetPrice.objects.order_by("date")
+        .values_list("date", "symbol", "price")
+        .iterator(chunk_size=BULK_BATCH_SIZE)
+    ):
+        latest[(price_date.replace(day=1), symbol)] = (price_date, price)
+
+    AssetMonthEndPrice.objects.all().delete()
+    AssetMonthEndPrice.objects.bulk_create(
+        [
+            AssetMonthEndPrice(month=month, symbol=symbol, date=price_date, price=price)
+            for (month, symbol), (price_date, price) in latest.items()
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usa_research", "0016_mscicountryweightreport_summary_html"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_month_end_prices, migrations.RunPython.noop),
+    ]
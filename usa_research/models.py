@@ -1,3 +1,6 @@
+import hashlib
+
+import markdown
 from django.db import models
 
 
@@ -74,9 +77,18 @@ class MacroIndicator(models.Model):
 
 
 class MsciCountryWeightReport(models.Model):
+    """
+    MSCIレポート（Country Weight）の要約
+
+    summary_html: summary_md を描画したHTML。保存時に作るので、表示時に markdown は解析しない\n
+    summary_digest: summary_html を作ったときの summary_md の SHA-256
+    """
+
     source = models.CharField(max_length=100, default="MSCI")
     report_date = models.DateField(unique=True)
     summary_md = models.TextField()
+    summary_html = models.TextField(blank=True, default="")
+    summary_digest = models.CharField(max_length=64, blank=True, default="")
     pdf_url = models.URLField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -87,6 +99,28 @@ class MsciCountryWeightReport(models.Model):
     def __str__(self):
         return f"{self.report_date} - {self.source}"
 
+    def render_summary(self) -> bool:
+        """
+        summary_md のダイジェストが summary_digest と異なるときだけ summary_html を作り直す
+
+        Returns:
+            bool: 作り直した場合 True
+        """
+        digest = hashlib.sha256(self.summary_md.encode("utf-8")).hexdigest()
+        if digest == self.summary_digest:
+            return False
+        self.summary_html = markdown.markdown(
+            self.summary_md, extensions=["extra", "tables"]
+        )
+        self.summary_digest = digest
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if self.render_summary() and update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "summary_html", "summary_digest"}
+        super().save(*args, **kwargs)
+
 
 class AssetPrice(models.Model):
     date = models.DateField()
@@ -101,6 +135,28 @@ class AssetPrice(models.Model):
         return f"{self.date} - {self.symbol}: {self.price}"
 
 
+class AssetMonthEndPrice(models.Model):
+    """
+    AssetPrice の月末（その月の最終取引日）の価格。長期推移グラフ用に
+    monthly_update_historical_assets が AssetPrice と合わせて更新する。
+
+    month: 対象月の1日\n
+    date: その資産の、対象月の最終取引日
+    """
+
+    month = models.DateField()
+    symbol = models.CharField(max_length=10)
+    date = models.DateField()
+    price = models.FloatField()
+
+    class Meta:
+        unique_together = ("month", "symbol")
+        ordering = ["month", "symbol"]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} - {self.symbol}: {self.price}"
+
+
 class Nasdaq100Company(models.Model):
     ticker = models.CharField(max_length=10, unique=True)
     name = models.CharField(max_length=200)
@@ -0,0 +1,128 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase
+
+from usa_research.management.commands.monthly_update_historical_assets import (
+    TICKERS,
+    extract_prices,
+)
+from usa_research.domain.repository.asset_price import AssetPriceRepository
+from usa_research.models import AssetMonthEndPrice, AssetPrice
+
+
+def _download_frame(start: str, days: int) -> pd.DataFrame:
+    """yf.download(group_by="ticker") と同じ形（列: (ティッカー, 項目)）の合成データ"""
+    index = pd.bdate_range(start, periods=days)
+    columns = {}
+    for i, ticker in enumerate(TICKERS.values()):
+        prices = 100.0 + i + np.arange(days)
+        columns[(ticker, "Close")] = prices
+        # Bills（BIL）だけ Adj Close を持たない想定
+        if ticker != "BIL":
+            columns[(ticker, "Adj Close")] = prices - 0.5
+    return pd.DataFrame(columns, index=index)
+
+
+class MonthlyUpdateHistoricalAssetsTest(TestCase):
+    """
+    歴史的価格の更新コマンドのテスト。
+    yf.download は合成データに差し替える。
+    """
+
+    def _call(self, data: pd.DataFrame, *args):
+        with patch(
+            "usa_research.management.commands.monthly_update_historical_assets.yf.download",
+            return_value=data,
+        ) as download:
+            call_command("monthly_update_historical_assets", *args, stdout=StringIO())
+        return download
+
+    def test_extract_prices(self):
+        """Adj Close を優先し、無ければ Close を使い、欠損値の行は含めない。"""
+        data = _download_frame("2024-01-01", 3)
+        data.loc[data.index[0], ("^GSPC", "Adj Close")] = np.nan
+        prices = extract_prices(data, list(TICKERS.values()))
+
+        self.assertEqual(3 * len(TICKERS) - 1, len(prices))
+        gspc = prices[prices["symbol"] == "^GSPC"]
+        self.assertEqual([date(2024, 1, 2), date(2024, 1, 3)], list(gspc["date"]))
+        self.assertEqual([100.5, 101.5], list(gspc["price"]))
+        self.assertEqual(102.0, prices[prices["symbol"] == "BIL"]["price"].iloc[0])
+
+    def test_incremental_appends_only_after_latest_stored_date(self):
+        """
+        初回（保存済みなし）は全期間を取得し、2回目以降は最も古い最終日の翌日から取得して
+        資産ごとに最終日より後の行だけを追加する。
+        """
+        download = self._call(_download_frame("2024-01-01", 10))
+        self.assertEqual("max", download.call_args.kwargs["period"])
+        self.assertEqual(10 * len(TICKERS), AssetPrice.objects.count())
+
+        # ^GSPC だけ最終日が1日古い。保存済みの価格は書き換えない
+        AssetPrice.objects.filter(symbol="^GSPC", date=date(2024, 1, 12)).delete()
+        AssetPrice.objects.filter(date=date(2024, 1, 1)).update(price=1.0)
+
+        # 最終日の取得と一括書き込み、月末価格の作り直し（SAVEPOINT を含む）
+        with self.assertNumQueries(7):
+            download = self._call(_download_frame("2024-01-11", 5))
+        self.assertEqual("2024-01-12", download.call_args.kwargs["start"])
+        # 1/12（^GSPC のみ）と 1/15〜1/17 が追加される
+        self.assertEqual(13 * len(TICKERS), AssetPrice.objects.count())
+        self.assertTrue(
+            AssetPrice.objects.filter(symbol="^GSPC", date=date(2024, 1, 12)).exists()
+        )
+        self.assertEqual(
+            len(TICKERS),
+            AssetPrice.objects.filter(date=date(2024, 1, 1), price=1.0).count(),
+        )
+
+    def test_full_rebuild_overwrites_stored_prices(self):
+        """--full は全期間を取得し、保存済みの価格も上書きする（訂正の取り込み用）。"""
+        self._call(_download_frame("2024-01-01", 10))
+        AssetPrice.objects.update(price=1.0)
+
+        download = self._call(_download_frame("2024-01-01", 10), "--full")
+
+        self.assertEqual("max", download.call_args.kwargs["period"])
+        self.assertEqual(10 * len(TICKERS), AssetPrice.objects.count())
+        self.assertFalse(AssetPrice.objects.filter(price=1.0).exists())
+
+    def test_month_end_prices_follow_updates(self):
+        """
+        月末価格は資産ごとの月内最終取引日の価格で、差分更新では追加した月以降だけを作り直す。
+        """
+        self._call(_download_frame("2024-01-29", 5))
+        self.assertEqual(
+            [
+                (date(2024, 1, 1), date(2024, 1, 31)),
+                (date(2024, 2, 1), date(2024, 2, 2)),
+            ],
+            list(
+                AssetMonthEndPrice.objects.filter(symbol="^GSPC").values_list(
+                    "month", "date"
+                )
+            ),
+        )
+        AssetMonthEndPrice.objects.filter(month=date(2024, 1, 1)).update(price=1.0)
+
+        self._call(_download_frame("2024-02-05", 3))
+
+        february = AssetMonthEndPrice.objects.get(
+            symbol="^GSPC", month=date(2024, 2, 1)
+        )
+        self.assertEqual(date(2024, 2, 7), february.date)
+        self.assertEqual(
+            len(TICKERS), AssetMonthEndPrice.objects.filter(price=1.0).count()
+        )
+
+        # 保存済みの AssetPrice から全期間を作り直す
+        self._call(_download_frame("2024-02-05", 3), "--month-end-only")
+        self.assertFalse(AssetMonthEndPrice.objects.filter(price=1.0).exists())
+        self.assertEqual(
+            2 * len(TICKERS), AssetPriceRepository.month_end_prices().count()
+        )
@@ -1,4 +1,5 @@
 import datetime
+from unittest.mock import patch
 
 from django.test import TestCase, Client
 from django.urls import reverse
@@ -63,3 +64,44 @@ class MsciReportViewTest(TestCase):
         self.assertContains(response, '<select id="report-date-select"')
         self.assertContains(response, "2024/05/01")
         self.assertContains(response, "2024/04/01")
+
+
+class MsciReportSummaryHtmlTest(TestCase):
+    """要約のHTMLは保存時に描画し、summary_md が変わったときだけ描画し直す"""
+
+    def setUp(self):
+        self.report = MsciCountryWeightReport.objects.create(
+            report_date=datetime.date(2024, 5, 1),
+            summary_md="##### 概況\n\n| 国 | 比率 |\n|---|---|\n| US | 70% |",
+            pdf_url="http://example.com/20240501.pdf",
+        )
+
+    def test_html_is_rendered_on_save(self):
+        self.report.refresh_from_db()
+        self.assertIn("<h5>概況</h5>", self.report.summary_html)
+        self.assertIn("<table>", self.report.summary_html)
+        self.assertEqual(64, len(self.report.summary_digest))
+
+    def test_rerender_only_when_markdown_changes(self):
+        with patch(
+            "usa_research.models.markdown.markdown", return_value="<h5>変化</h5>"
+        ) as render:
+            self.report.save()
+            render.assert_not_called()
+
+            self.report.summary_md = "##### 変化"
+            self.report.save(update_fields=["summary_md"])
+            render.assert_called_once()
+
+    def test_view_renders_legacy_report_once(self):
+        """HTMLが無い既存レコードは初回表示時に描画して保存し、以降は描画しない"""
+        MsciCountryWeightReport.objects.update(summary_html="", summary_digest="")
+
+        response = self.client.get(reverse("usa:index"))
+        self.assertContains(response, "<h5>概況</h5>")
+        self.report.refresh_from_db()
+        self.assertIn("<h5>概況</h5>", self.report.summary_html)
+
+        with patch("usa_research.models.markdown.markdown") as render:
+            self.client.get(reverse("usa:index"))
+            render.assert_not_called()
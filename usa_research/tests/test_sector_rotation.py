@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase
+
+from usa_research.management.commands.update_sector_rotation import (
+    BENCHMARK,
+    SECTORS,
+    build_snapshot_rows,
+    calculate_signals,
+)
+from usa_research.models import Sector, SectorDailySnapshot
+
+
+def _download_frame(days: int = 40) -> pd.DataFrame:
+    """yf.download(group_by="ticker") と同じ形（列: (シンボル, 項目)）の合成データ"""
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2024-01-01", periods=days)
+    columns = {}
+    for symbol in list(SECTORS.values()) + [BENCHMARK]:
+        prices = 100 * np.cumprod(1 + rng.uniform(-0.02, 0.02, days))
+        columns[(symbol, "Close")] = prices
+        columns[(symbol, "Adj Close")] = prices
+    return pd.DataFrame(columns, index=index)
+
+
+class UpdateSectorRotationTest(TestCase):
+    """
+    セクターローテーション更新コマンドのテスト。
+    yf.download は合成データに差し替える。
+    """
+
+    def _call(self, data: pd.DataFrame, *args):
+        with patch(
+            "usa_research.management.commands.update_sector_rotation.yf.download",
+            return_value=data,
+        ):
+            call_command("update_sector_rotation", *args, stdout=StringIO())
+
+    def test_calculate_signals(self):
+        """
+        シナリオ:
+        - 入力: 各信号の条件に当てはまる指標と、境界で外れる指標
+        - 処理: calculate_signals で列単位に判定する
+        - 期待値: 上の条件ほど優先され、条件を満たさない行は "None" になる
+        """
+        # Given
+        rs = pd.Series([-1.0, -1.0, 1.0, 1.0, 0.0, -1.0])
+        slope = pd.Series([0.5, 0.5, -0.5, -0.5, 0.0, -0.5])
+        rank_delta = pd.Series([-2, -1, 2, 1, 0, 3])
+
+        # When
+        signals = calculate_signals(rs, slope, rank_delta)
+
+        # Then
+        self.assertEqual(
+            ["Green", "Yellow", "Red", "None", "None", "None"], list(signals)
+        )
+
+    def test_build_snapshot_rows(self):
+        """日付×セクターの縦持ちで、順位は日付ごとに1〜11になる。"""
+        data = _download_frame()
+        adj_close = pd.DataFrame(
+            {symbol: data[(symbol, "Adj Close")] for symbol in data.columns.levels[0]}
+        )
+        rows = build_snapshot_rows(adj_close)
+
+        self.assertEqual(15 * len(SECTORS), len(rows))
+        self.assertEqual(
+            list(range(1, len(SECTORS) + 1)),
+            sorted(rows[rows["date"] == rows["date"].max()]["rank"]),
+        )
+
+    def test_bulk_upsert_only_from_latest_stored_date(self):
+        """2回目以降は保存済みの最終日以降だけを、少ないクエリで書き直す。"""
+        data = _download_frame()
+        self._call(data)
+        self.assertEqual(len(SECTORS), Sector.objects.count())
+        self.assertEqual(15 * len(SECTORS), SectorDailySnapshot.objects.count())
+
+        latest = SectorDailySnapshot.objects.order_by("-date").first()
+        SectorDailySnapshot.objects.filter(pk=latest.pk).update(signal="stale")
+        oldest = SectorDailySnapshot.objects.order_by("date").first()
+        SectorDailySnapshot.objects.filter(pk=oldest.pk).update(signal="stale")
+
+        with self.assertNumQueries(3):
+            self._call(data)
+
+        self.assertEqual(15 * len(SECTORS), SectorDailySnapshot.objects.count())
+        latest.refresh_from_db()
+        oldest.refresh_from_db()
+        self.assertNotEqual("stale", latest.signal)
+        self.assertEqual("stale", oldest.signal)
+
+        # --full なら取得範囲をすべて書き直す
+        self._call(data, "--full")
+        oldest.refresh_from_db()
+        self.assertNotEqual("stale", oldest.signal)
@@ -1,20 +1,18 @@
 import random
 from datetime import datetime
 
-import markdown
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Sum, Max
-from django.db.models.functions import TruncMonth
+from django.db.models import Count, Sum
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView, ListView, CreateView
 
 from usa_research.domain.constants.almanac import MONTHLY_ANOMALIES, THEME_ANOMALIES
+from usa_research.domain.repository.asset_price import AssetPriceRepository
 from usa_research.models import (
     MacroIndicator,
     RssFeed,
     SectorDailySnapshot,
     MsciCountryWeightReport,
-    AssetPrice,
     Nasdaq100Company,
     FinancialResultWatch,
 )
@@ -68,9 +66,9 @@ class IndexView(TemplateView):
             msci_report = MsciCountryWeightReport.objects.first()
 
         if msci_report:
-            msci_report.summary_html = markdown.markdown(
-                msci_report.summary_md, extensions=["extra", "tables"]
-            )
+            # HTMLは保存時に描画済み。描画前のレコード（旧データ）だけここで1回描画して保存する
+            if msci_report.render_summary():
+                msci_report.save(update_fields=["summary_html", "summary_digest"])
             context["msci_report"] = msci_report
 
         # 過去のレポート日付リストを取得 (ドロップダウン用)
@@ -84,21 +82,8 @@ class IndexView(TemplateView):
         )
 
         # 資産クラスの長期推移
-        # グラフ表示用にデータを取得。
-        # 1950年からの日次データは膨大になるため、各月の月末データのみをサンプリングして取得する。
-
-        # 各月ごとの最大日付（月末営業日）を取得
-        monthly_last_dates = (
-            AssetPrice.objects.annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(last_date=Max("date"))
-            .values_list("last_date", flat=True)
-        )
-
-        # 月末データに絞って取得
-        context["asset_prices"] = AssetPrice.objects.filter(
-            date__in=monthly_last_dates
-        ).order_by("date", "symbol")
+        # 1927年からの日次データは膨大になるため、更新バッチで作り直している月末価格だけを読む
+        context["asset_prices"] = AssetPriceRepository.month_end_prices()
 
         # NASDAQ100 銘柄リスト
         context["nasdaq100_companies"] = Nasdaq100Company.objects.all().order_by(
@@ -3,9 +3,7 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import F, FloatField
 from django.db.models import QuerySet
-from django.db.models.functions import Round
 
 from vietnam_research.domain.repository.market import MarketRepository
 from vietnam_research.domain.valueobject.line_chart import LineChartLayer
@@ -201,55 +199,54 @@ class VietnamMarketDataProvider(MarketAbstract):
         layers: list[RadarChartLayer] = []
         for m in months_dating_back:
             try:
-                industry_field_sum = self.repository.sum_of_industry_field_for(
-                    m, denominator_field
-                )
-                industry_records = self.repository.industry_records_for(
-                    m, aggregate_field, aggregate_alias
-                )
-                industry_records = industry_records.annotate(
-                    percent=Round(
-                        F(aggregate_alias) / industry_field_sum * 100,
-                        precision=2,
-                        output_field=FloatField(),
-                    )
-                )
-
-                layers.append(
-                    RadarChartLayer(
-                        name=f"{rec_type} {m}ヶ月前",
-                        axes=[
-                            Axis(
-                                axis=industry_record["ind_name"],
-                                value=industry_record["percent"],
-                            )
-                            for industry_record in industry_records
-                        ],
+                industry_records, industry_field_sum = (
+                    self.repository.industry_summary_for(
+                        m, aggregate_field, aggregate_alias, denominator_field
                     )
                 )
-
             except (Industry.DoesNotExist, ObjectDoesNotExist):
                 logging.warning(
                     f"market_vietnam.py radar_chart() の{m}ヶ月は存在しないため、無視されました"
                 )
                 continue
-            except ZeroDivisionError:
+
+            if not industry_field_sum:
                 logging.warning(
                     f"market_vietnam.py radar_chart() の{m}ヶ月は分母が0のため、無視されました"
                 )
                 continue
 
+            layers.append(
+                RadarChartLayer(
+                    name=f"{rec_type} {m}ヶ月前",
+                    axes=[
+                        Axis(
+                            axis=industry_record["ind_name"],
+                            value=(
+                                None
+                                if industry_record[aggregate_alias] is None
+                                else round(
+                                    industry_record[aggregate_alias]
+                                    / industry_field_sum
+                                    * 100,
+                                    2,
+                                )
+                            ),
+                        )
+                        for industry_record in industry_records
+                    ],
+                )
+            )
+
         return layers
 
     def uptrend(self) -> dict:
         """
         上昇トレンド銘柄を業種ごとにグルーピングしたデータを生成します。
         """
-        uptrend = self.repository.annotated_uptrend()
-
         result = {}
-        ind_names = self.repository.industry_names()
-        for ind_name in ind_names:
-            result[ind_name] = [x for x in uptrend if x["ind_name"] == ind_name]
+        for record in self.repository.cached_uptrend():
+            result.setdefault(record["ind_name"], []).append(record)
 
-        return result
+        # 業種名（大分類|小分類）の昇順で返す
+        return dict(sorted(result.items(), key=lambda item: item[0] or ""))
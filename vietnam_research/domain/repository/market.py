@@ -1,11 +1,15 @@
+from datetime import date
+
+from django.db import connection, transaction
 from django.db.models import F, Value, CharField, Sum
-from django.db.models import Max
+from django.db.models import Count, Max
 from django.db.models.functions import Round, Concat
 from django.db.models.query import QuerySet
 
 from vietnam_research.models import (
     Articles,
     BasicInformation,
+    IndustryMonthlySummary,
     VnIndex,
     Uptrend,
     VietnamStatistics,
@@ -17,8 +21,17 @@ class MarketRepository:
     """
     マーケット情報のリポジトリクラス。
     記事、基本情報、ウォッチリスト、VN-INDEX、統計データなどのDB操作・集計を担当します。
+
+    業種別集計は IndustryMonthlySummary に永続化し、締まった月（当月より前）の集計は
+    二度と変わらないため、さらにプロセス内にもキャッシュします。
+    上昇トレンド銘柄は日次バッチで入れ替わるため、件数と最大IDが変わるまでキャッシュします。
     """
 
+    # (月末日, 集計フィールド, エイリアス, 分母フィールド) → (業種別集計, 分母の合計)
+    _closed_month_cache: dict[tuple, tuple[list[dict], float]] = {}
+    # ((件数, 最大ID), annotated_uptrend の結果)
+    _uptrend_cache: tuple[tuple, list[dict]] | None = None
+
     @staticmethod
     def articles(login_id):
         """
@@ -125,30 +138,83 @@ class MarketRepository:
             element="consumer price index"
         ).order_by("period")
 
+    @classmethod
+    def industry_summary_for(
+        cls,
+        month: int,
+        aggregate_field: str,
+        aggregate_alias: str,
+        denominator_field: str,
+    ) -> tuple[list[dict], float]:
+        """
+        指定された月の業種別集計（分子）と全業種合計（分母）をまとめて取得します。
+        レーダーチャート（業種別マクロ分析）の1レイヤー分に当たります。
+
+        集計は IndustryMonthlySummary から読み、その月末日の集計がまだ無ければ作って保存します。
+        月末日が当月より前の月の結果はさらにプロセス内にキャッシュし、2回目以降は
+        月末日の特定（1クエリ）だけで返します。
+
+        Args:
+            month (int): 何ヶ月前の月末データを取得するか（0: 当月末, -1: 先月末 ...）
+            aggregate_field (str): 分子とする集計列（'symbol_count' または 'marketcap_sum'）
+            aggregate_alias (str): 分子の集計結果に付与するエイリアス名
+            denominator_field (str): 分母として合計する集計列
+
+        Returns:
+            tuple[list[dict], float]: (ind_name と集計値の辞書のリスト, 分母の合計)
+
+        Raises:
+            Industry.DoesNotExist: 指定された月のデータが存在しない場合
+        """
+        month_end = Industry.objects.slipped_month_end(month).recorded_date
+        key = (month_end, aggregate_field, aggregate_alias, denominator_field)
+        if key in cls._closed_month_cache:
+            return cls._closed_month_cache[key]
+
+        rows = list(
+            IndustryMonthlySummary.objects.filter(recorded_date=month_end)
+            .order_by("ind_name")
+            .values("ind_name", "symbol_count", "marketcap_sum")
+        )
+        if not rows:
+            rows = cls.save_industry_summary(month_end)
+
+        # 分子と母集団が同じ（業種クラスが定義された銘柄）なので、分母は業種別集計の合計になる
+        summary = (
+            [
+                {"ind_name": row["ind_name"], aggregate_alias: row[aggregate_field]}
+                for row in rows
+            ],
+            sum(row[denominator_field] or 0 for row in rows),
+        )
+        today = date.today()
+        if (month_end.year, month_end.month) < (today.year, today.month):
+            cls._closed_month_cache[key] = summary
+        return summary
+
     @staticmethod
-    def industry_records_for(
-        month: int, aggregate_field: str, aggregate_alias: str
-    ) -> QuerySet:
+    def save_industry_summary(recorded_date) -> list[dict]:
         """
-        指定された月（現在からXヶ月前）の業種別集計データを取得します。
-        主にレーダーチャート（業種別マクロ分析）の各項目の構成比（分子）を計算するために使用されます。
+        指定日の業種別集計（銘柄数・時価総額の合計）を IndustryMonthlySummary に保存します。
 
-        業種クラス（ind_class）が定義されていないシンボルは、正確な比率を算出する際のノイズとなるため
-        symbol__ind_class__isnull=False で明示的に除外しています。
+        同じ月の古い集計（当月の前日分など）は入れ替えます。日次の取り込み後に当日分を
+        作り直すことで、当月の集計も取り込みに合わせて更新されます。
+        同じ日の集計が既にあれば（同時のリクエストなど）一意制約違反にせず上書きします。
 
         Args:
-            month (int): 何ヶ月前の月末データを取得するか（0: 当月末, 1: 先月末 ...）
-            aggregate_field (str): 集計対象のフィールド名（例: 'stocks_count', 'stocks_price'）
-            aggregate_alias (str): 集計結果に付与するエイリアス名
+            recorded_date: 集計する計上日（その月の最終データ日）
 
         Returns:
-            QuerySet: 業種名（ind_name）でグループ化され、指定されたフィールドが合計された結果
+            list[dict]: 保存した集計（ind_name, symbol_count, marketcap_sum）。ind_name の昇順
         """
-        return (
-            Industry.objects.filter(
-                recorded_date=Industry.objects.slipped_month_end(
-                    month
-                ).formatted_recorded_date(),
+        rows = [
+            {
+                "ind_name": record["ind_name"],
+                "symbol_count": record["symbol_count"],
+                "marketcap_sum": record["marketcap_sum"],
+            }
+            for record in Industry.objects.filter(
+                recorded_date=recorded_date,
                 symbol__ind_class__isnull=False,
             )
             .annotate(
@@ -160,42 +226,30 @@ class MarketRepository:
                 )
             )
             .values("ind_name")
-            .annotate(**{aggregate_alias: Sum(aggregate_field)})
+            .annotate(symbol_count=Count("id"), marketcap_sum=Sum("marketcap"))
             .order_by("ind_name")
-        )
-
-    @staticmethod
-    def sum_of_industry_field_for(month: int, aggregate_field: str) -> float:
-        """
-        指定された月（現在からXヶ月前）の全業種合計値を算出します。
-        レーダーチャート（業種別マクロ分析）の構成比を計算する際の「分母」として使用します。
-
-        分子側（industry_records_for）と母集団を一致させるため、
-        業種クラス（ind_class）が定義されていないシンボルは集計から除外しています。
-
-        Args:
-            month (int): 何ヶ月前の月末データを計算するか
-            aggregate_field (str): 合計を算出する対象のフィールド名
-
-        Returns:
-            float: 指定された月の全業種の合計値
-        """
-        # 指定された月（過去Xヶ月前）の月末日付を取得
-        target_date = Industry.objects.slipped_month_end(
-            month
-        ).formatted_recorded_date()
-
-        # 指定された日付のレコードで、業種が定義されており、かつ集計対象の数値が null でないものを抽出
-        valid_industry_records = Industry.objects.filter(
-            recorded_date=target_date,
-            symbol__ind_class__isnull=False,
-            **{f"{aggregate_field}__isnull": False},
-        )
-
-        # 集計対象のフィールド値のみを取得し、その合計を算出
-        values_to_sum = valid_industry_records.values_list(aggregate_field, flat=True)
-
-        return sum(values_to_sum)
+        ]
+        with transaction.atomic():
+            IndustryMonthlySummary.objects.filter(
+                recorded_date__year=recorded_date.year,
+                recorded_date__month=recorded_date.month,
+            ).delete()
+            # 画面表示で初めて集計する月は、同時のリクエストが同じ行を作ることがあるので上書きする
+            IndustryMonthlySummary.objects.bulk_create(
+                [
+                    IndustryMonthlySummary(recorded_date=recorded_date, **row)
+                    for row in rows
+                ],
+                update_conflicts=True,
+                # MySQL の ON DUPLICATE KEY UPDATE は一意キーを指定できない
+                unique_fields=(
+                    ["recorded_date", "ind_name"]
+                    if connection.features.supports_update_conflicts_with_target
+                    else None
+                ),
+                update_fields=["symbol_count", "marketcap_sum"],
+            )
+        return rows
 
     @staticmethod
     def annotated_uptrend():
@@ -245,25 +299,15 @@ class MarketRepository:
             )
         )
 
-    @staticmethod
-    def industry_names():
+    @classmethod
+    def cached_uptrend(cls) -> list[dict]:
         """
-        上昇トレンド銘柄が存在する業種名（大分類|小分類）のユニークな一覧を取得します。
-
-        Returns:
-            list: 業種名のリスト（ソート済み）。
-            アノテーション `ind_name` (大分類|小分類) のリストが返ります。
+        annotated_uptrend の結果をリストで返します。
+        Uptrend は日次バッチで全件入れ替わるため、件数と最大IDが変わるまでは再取得しません。
         """
-        return (
-            Uptrend.objects.annotate(
-                ind_name=Concat(
-                    F("symbol__ind_class__industry_class"),
-                    Value("|"),
-                    F("symbol__ind_class__industry1"),
-                    output_field=CharField(),
-                )
-            )
-            .distinct()
-            .order_by("ind_name")
-            .values_list("ind_name", flat=True)
+        version = tuple(
+            Uptrend.objects.aggregate(count=Count("id"), max_id=Max("id")).values()
         )
+        if cls._uptrend_cache is None or cls._uptrend_cache[0] != version:
+            cls._uptrend_cache = (version, list(cls.annotated_uptrend()))
+        return cls._uptrend_cache[1]
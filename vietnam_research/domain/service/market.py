@@ -2,14 +2,16 @@ import json
 import logging
 from datetime import datetime, timezone
 
-import feedparser
 import requests
 
+from lib.rss.feed_store import RssFeedStore
 from vietnam_research.domain.dataprovider.market import VietnamMarketDataProvider
 from vietnam_research.domain.repository.market import MarketRepository
 from vietnam_research.domain.valueobject.vietkabu import RssEntryVO
 from vietnam_research.forms import ExchangeForm
 
+VIETKABU_RSS_URL = "https://www.viet-kabu.com/rss/latest.rdf"
+
 
 class MarketRetrievalService:
     """
@@ -23,23 +25,17 @@ class MarketRetrievalService:
     @staticmethod
     def rss_feed() -> dict:
         """
-        viet-kabu のRSSをタイムアウト付きで取得し、
+        viet-kabu のRSSを RssFeedStore の保存済みコピーから読み、
         VietnamMarketDataProvider.rss() に渡せる辞書形式で返します。
-        取得に失敗した場合は、例外を送出します（タイムアウトなど）。
+        コピーが古ければ裏で取り直すので、画面表示は外部フィードの応答を待ちません。
+        コピーが無いときだけタイムアウト付きで取得し、失敗した場合は例外を送出します。
 
         Notes:
             - feedparserはFeedParserDictを返すが辞書のように扱える。
-            - parsed.get("bozo") は、RSSがXMLとして正しく構成されていない場合にTrueとなります。
+            - 定期的な取り直しは `python manage.py daily_fetch_vietkabu_rss` で行う。
         """
-        url = "https://www.viet-kabu.com/rss/latest.rdf"
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            parsed = feedparser.parse(response.content)
-            if parsed.get("bozo"):
-                logging.warning(
-                    f"RSSのパース中に不完全なデータが検出されました: {parsed.bozo_exception}"
-                )
+            parsed = RssFeedStore.default().get(VIETKABU_RSS_URL)
         except requests.exceptions.RequestException as e:
             logging.error(f"RSS取得時のネットワークエラー: {e}")
             raise
@@ -86,9 +82,9 @@ class MarketRetrievalService:
                     for x in vietnam_market_data_provider.radar_chart(
                         rec_type="企業数",
                         months_dating_back=[0, -1, -4, -7],
-                        aggregate_field="id",
+                        aggregate_field="symbol_count",
                         aggregate_alias="count",
-                        denominator_field="id",
+                        denominator_field="symbol_count",
                     )
                 ]
             ),
@@ -98,9 +94,9 @@ class MarketRetrievalService:
                     for x in vietnam_market_data_provider.radar_chart(
                         rec_type="時価総額",
                         months_dating_back=[0, -1, -4, -7],
-                        aggregate_field="marketcap",
+                        aggregate_field="marketcap_sum",
                         aggregate_alias="marketcap_sum",
-                        denominator_field="marketcap",
+                        denominator_field="marketcap_sum",
                     )
                 ]
             ),
@@ -158,9 +154,9 @@ class MarketRetrievalService:
                     for x in vietnam_market_data_provider.radar_chart(
                         rec_type="企業数",
                         months_dating_back=[0, -1, -4, -7],
-                        aggregate_field="id",
+                        aggregate_field="symbol_count",
                         aggregate_alias="count",
-                        denominator_field="id",
+                        denominator_field="symbol_count",
                     )
                 ]
             ),
@@ -170,9 +166,9 @@ class MarketRetrievalService:
                     for x in vietnam_market_data_provider.radar_chart(
                         rec_type="時価総額",
                         months_dating_back=[0, -1, -4, -7],
-                        aggregate_field="marketcap",
+                        aggregate_field="marketcap_sum",
                         aggregate_alias="marketcap_sum",
-                        denominator_field="marketcap",
+                        denominator_field="marketcap_sum",
                     )
                 ]
             ),
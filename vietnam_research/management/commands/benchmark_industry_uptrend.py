@@ -0,0 +1,102 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from vietnam_research.management.commands.daily_industry_chart_and_uptrend import (
+    group_closing_prices,
+)
+
+
+class Command(BaseCommand):
+    help = "daily_industry_chart_and_uptrend の銘柄ごとの集約処理をベンチマーク"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tickers",
+            type=int,
+            default=1000,
+            help="銘柄数（デフォルト: 1000）",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=250,
+            help="1銘柄あたりの日数（デフォルト: 250）",
+        )
+        parser.add_argument(
+            "--legacy-sample",
+            type=int,
+            default=100,
+            help="従来方式を実測する銘柄数。全銘柄分は線形に換算する（デフォルト: 100）",
+        )
+
+    def handle(self, *args, **options):
+        """
+        合成データ（DBは使わない）で、銘柄ごとの終値の集約とシンボル参照の時間を比較する
+
+        比較内容:
+        - 従来方式: 銘柄ごとに industry_records 全体を走査（O(n²)）し、
+          シンボルも銘柄ごとに線形探索で引く（DBでは1銘柄1クエリに相当）
+        - 現行方式: group_closing_prices で1回だけ走査し、シンボルは辞書で引く
+
+        従来方式は全銘柄だと時間が掛かりすぎるため、--legacy-sample 銘柄分を実測して
+        全銘柄分へ線形に換算する（1銘柄あたりの処理量は銘柄によらず一定）。
+        """
+        ticker_count = options["tickers"]
+        days = options["days"]
+        sample = min(options["legacy_sample"], ticker_count)
+
+        tickers = [f"T{i:04d}" for i in range(ticker_count)]
+        industry_records = self._create_records(tickers, days)
+        symbols = [{"code": ticker} for ticker in tickers]
+
+        started = time.perf_counter()
+        for ticker in tickers[:sample]:
+            closing_price = [
+                x["closing_price"]
+                for x in industry_records
+                if x["symbol_code"] == ticker
+            ]
+            symbol = next(s for s in symbols if s["code"] == ticker)
+        legacy = (time.perf_counter() - started) * ticker_count / sample
+
+        started = time.perf_counter()
+        closing_prices_by_ticker = group_closing_prices(industry_records)
+        symbols_by_code = {s["code"]: s for s in symbols}
+        for ticker in tickers:
+            closing_price = closing_prices_by_ticker.get(ticker, [])
+            symbol = symbols_by_code.get(ticker)
+        grouped = time.perf_counter() - started
+
+        assert len(closing_price) == days and symbol["code"] == tickers[-1]
+
+        print(
+            f"records={len(industry_records):,} ({ticker_count} tickers x {days} days)"
+        )
+        print(f"  legacy scan : {legacy:.2f} s (measured on {sample} tickers)")
+        print(f"  grouped     : {grouped:.3f} s")
+        if grouped > 0:
+            print(f"  speedup     : {legacy / grouped:.0f}x")
+
+    @staticmethod
+    def _create_records(tickers: list[str], days: int) -> list[dict]:
+        """
+        get_symbol_details と同じ並び（業種→銘柄→日付）の辞書リストを作る
+        """
+        rng = random.Random(0)
+        start_date = date(2024, 1, 1)
+        records = []
+        for ticker in tickers:
+            price = rng.uniform(10, 100)
+            for offset in range(days):
+                price *= 1 + rng.uniform(-0.05, 0.05)
+                records.append(
+                    {
+                        "symbol_code": ticker,
+                        "recorded_date": start_date + timedelta(days=offset),
+                        "closing_price": round(price, 2),
+                    }
+                )
+        return records
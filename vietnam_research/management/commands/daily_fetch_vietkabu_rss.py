@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from lib.rss.feed_store import RssFeedStore
+from vietnam_research.domain.service.market import VIETKABU_RSS_URL
+
+
+class Command(BaseCommand):
+    help = "Refresh the cached viet-kabu RSS feed"
+
+    def handle(self, *args, **options):
+        """
+        viet-kabu のRSSを取り直し、RssFeedStore に保存します。
+
+        ダッシュボードは保存済みのコピーを表示に使うため、このコマンドを定期実行しておけば
+        画面表示時に外部フィードへアクセスすることはありません。
+        取得に失敗した場合、前回のコピーはそのまま残ります。
+        """
+        changed = RssFeedStore.default().refresh(VIETKABU_RSS_URL)
+        message = "更新しました" if changed else "変更はありませんでした"
+        self.stdout.write(self.style.SUCCESS(f"{VIETKABU_RSS_URL}: {message}"))
@@ -1,9 +1,13 @@
+import time
 import urllib.request
+from pathlib import Path
 
 from bs4 import BeautifulSoup
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.management import BaseCommand
+from django.db import connection, transaction
 from django.utils.timezone import now, localtime
+
+from vietnam_research.domain.repository.market import MarketRepository
 from vietnam_research.domain.valueobject.vietkabu import (
     TransactionDate,
     MarketDataTableHeader,
@@ -13,10 +17,24 @@ from vietnam_research.domain.valueobject.vietkabu import (
 )
 from vietnam_research.models import Symbol, Industry, Market, IndClass
 
+BULK_BATCH_SIZE = 500
+
 
 class Command(BaseCommand):
     help = "industry from viet-kabu"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--html-dir",
+            default=None,
+            help="スクレイピングせず、保存済みのHTML（hcm.html, hn.html）を読むディレクトリ",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="DBに書き込まず、取得・解析・保存準備の時間だけを表示する",
+        )
+
     def handle(self, *args, **options):
         """
         viet-kabuから株価情報（シンボル・業種・計数）を取得してIndustryテーブルを整備
@@ -24,6 +42,10 @@ class Command(BaseCommand):
         .table_list_right には計数が入っている
 
         Notes: シンボル名には「＊」がついていることがあるので除外する（注意銘柄）
+        Notes: マスタは辞書にして先読みし、行ごとのクエリは発行しない。
+            計数は市場ごとに1回の bulk_create で登録する（同じ銘柄の行が重複したら先の行を採用し、
+            同じ日の登録済みの行は上書きする）
+        Notes: --html-dir と --dry-run を組み合わせると、保存済みHTMLでオフライン計測できる
 
         See Also: https://www.viet-kabu.com/stock/hcm.html
         See Also: https://www.viet-kabu.com/stock/hn.html
@@ -31,17 +53,33 @@ class Command(BaseCommand):
         See Also: https://docs.djangoproject.com/en/5.1/topics/testing/tools/#topics-testing-management-commands
         """
 
+        dry_run = options["dry_run"]
+        html_dir = options["html_dir"]
+
         m_market = Market.objects.filter(code__in=["HOSE", "HNX"])
-        m_ind_class = IndClass.objects.all()
+        # 業種マスタは (industry1, industry2) → IndClass の辞書にして1回だけ読む
+        ind_classes = {
+            (ind_class.industry1, ind_class.industry2): ind_class
+            for ind_class in IndClass.objects.all()
+        }
         for market in m_market:
-            m_symbol_list = Symbol.objects.filter(market__code=market.code)
+            started = time.perf_counter()
+            if html_dir:
+                # 保存済みHTMLから読む（オフラインでの確認・計測用）
+                html_path = Path(html_dir) / f"{market.url_file_name}.html"
+                if not html_path.exists():
+                    print(
+                        f"{html_path} がないため {market.code} は処理対象外になりました"
+                    )
+                    continue
+                html = html_path.read_bytes()
+            else:
+                # scraping
+                url = f"https://www.viet-kabu.com/stock/{market.url_file_name}.html"
+                html = urllib.request.urlopen(url).read()
+            fetched = time.perf_counter()
 
-            # scraping
-            url = f"https://www.viet-kabu.com/stock/{market.url_file_name}.html"
-            soup = BeautifulSoup(
-                urllib.request.urlopen(url).read(),
-                "lxml",
-            )
+            soup = BeautifulSoup(html, "lxml")
 
             # 市場情報の更新日
             transaction_date = TransactionDate(
@@ -82,56 +120,138 @@ class Command(BaseCommand):
                     skip_count += 1
                     debug_message = f"スキップした行 {i}: {str(e)} - データ: {e.get_simplified_html()}"
                     print(debug_message)
+            parsed = time.perf_counter()
 
-            processed_count = 0
-            for market_data_row in market_data_rows:
-                # STEP1: 業種マスタを引いて
-                try:
-                    ind_class = m_ind_class.get(
-                        industry1=market_data_row.industry1,
-                        industry2=market_data_row.industry2,
-                    )
-                except ObjectDoesNotExist:
-                    # 新規業種が出てきたタイミングで登録できないのは m_symbol.industry_class を人間が決める必要があるからです
-                    message = f"{market_data_row.industry_title} が業種マスタに存在しないため {market_data_row.code} が処理対象外になりました"
-                    print(message)
-                    continue
+            processed_count = self._save_market_rows(
+                market, transaction_date, market_data_rows, ind_classes, dry_run
+            )
+            saved = time.perf_counter()
+
+            total_rows = len(market_data_rows) + skip_count
+            final_message = f"{market.code}の処理が完了しました。全{total_rows}件中{processed_count}件が処理されました（スキップ{skip_count}件）"
+            if dry_run:
+                final_message = f"[dry-run] {final_message}"
+            print(final_message)
+            print(
+                f"  fetch: {(fetched - started) * 1000:.1f} ms,"
+                f" parse: {(parsed - fetched) * 1000:.1f} ms,"
+                f" save: {(saved - parsed) * 1000:.1f} ms"
+            )
+
+    @staticmethod
+    def _save_market_rows(
+        market: Market,
+        transaction_date,
+        market_data_rows: list[MarketDataRow],
+        ind_classes: dict[tuple[str, str], IndClass],
+        dry_run: bool,
+    ) -> int:
+        """
+        1市場分の行をまとめて保存する
 
-                # STEP2: Symbol table に存在チェック
-                if not m_symbol_list.filter(code=market_data_row.code).exists():
-                    # 新規の顔ぶれが出たら登録
-                    symbol = Symbol.objects.create(
+        シンボルマスタは市場ごとに1回だけ読み、新規シンボルの登録・社名変更・計数の登録を
+        それぞれ1回の bulk 操作で行う。同じ銘柄が2回出てきた場合は先の行を採用する。
+
+        Returns:
+            int: 処理した（Industryを登録した）件数
+        """
+        symbols = {
+            symbol.code: symbol for symbol in Symbol.objects.filter(market=market)
+        }
+
+        rows_by_code: dict[str, MarketDataRow] = {}
+        new_symbols = []
+        renamed_symbols = []
+        for market_data_row in market_data_rows:
+            if market_data_row.code in rows_by_code:
+                continue
+
+            # STEP1: 業種マスタを引いて
+            ind_class = ind_classes.get(
+                (market_data_row.industry1, market_data_row.industry2)
+            )
+            if ind_class is None:
+                # 新規業種が出てきたタイミングで登録できないのは m_symbol.industry_class を人間が決める必要があるからです
+                message = f"{market_data_row.industry_title} が業種マスタに存在しないため {market_data_row.code} が処理対象外になりました"
+                print(message)
+                continue
+            rows_by_code[market_data_row.code] = market_data_row
+
+            # STEP2: Symbol table に存在チェック
+            symbol = symbols.get(market_data_row.code)
+            if symbol is None:
+                # 新規の顔ぶれが出たら登録
+                new_symbols.append(
+                    Symbol(
                         code=market_data_row.code,  # AAA
                         name=market_data_row.name,  # アンファット・バイオプラスチック
                         ind_class=ind_class,
-                        market=m_market.get(code=market.code),
+                        market=market,
                     )
-                    message = (
-                        f"{market_data_row.code} {market_data_row.name} を追加しました"
+                )
+                message = (
+                    f"{market_data_row.code} {market_data_row.name} を追加しました"
+                )
+                print(message)
+            elif symbol.name != market_data_row.name:
+                # 既存先でも会社名が変わっていることがある
+                symbol.name = market_data_row.name
+                renamed_symbols.append(symbol)
+
+        if dry_run:
+            return len(rows_by_code)
+
+        with transaction.atomic():
+            if new_symbols:
+                Symbol.objects.bulk_create(new_symbols, ignore_conflicts=True)
+                # MySQL では bulk_create で主キーが返らないので引き直す
+                symbols.update(
+                    (symbol.code, symbol)
+                    for symbol in Symbol.objects.filter(
+                        market=market, code__in=[s.code for s in new_symbols]
                     )
-                    print(message)
-                else:
-                    # 既存先でも会社名が変わっていることがある
-                    symbol = m_symbol_list.get(code=market_data_row.code)
-                    if symbol.name != market_data_row.name:
-                        symbol.name = market_data_row.name
-                        symbol.save(update_fields=["name"])
-
-                # STEP3: Industry table（計数）
-                Industry.objects.create(
-                    recorded_date=transaction_date,
-                    created_at=localtime(now()).strftime("%Y-%m-%d %a %H:%M:%S"),
-                    symbol=symbol,
-                    open_price=market_data_row.open_price,
-                    high_price=market_data_row.high_price,
-                    low_price=market_data_row.low_price,
-                    closing_price=market_data_row.closing_price,
-                    volume=market_data_row.volume,
-                    marketcap=market_data_row.marketcap,
-                    per=market_data_row.per,
                 )
-                processed_count += 1
+            if renamed_symbols:
+                Symbol.objects.bulk_update(renamed_symbols, ["name"])
 
-            total_rows = len(market_data_rows) + skip_count
-            final_message = f"{market.code}の処理が完了しました。全{total_rows}件中{processed_count}件が処理されました（スキップ{skip_count}件）"
-            print(final_message)
+            # STEP3: Industry table（計数）
+            created_at = localtime(now()).strftime("%Y-%m-%d %a %H:%M:%S")
+            Industry.objects.bulk_create(
+                [
+                    Industry(
+                        recorded_date=transaction_date,
+                        created_at=created_at,
+                        symbol=symbols[code],
+                        open_price=market_data_row.open_price,
+                        high_price=market_data_row.high_price,
+                        low_price=market_data_row.low_price,
+                        closing_price=market_data_row.closing_price,
+                        volume=market_data_row.volume,
+                        marketcap=market_data_row.marketcap,
+                        per=market_data_row.per,
+                    )
+                    for code, market_data_row in rows_by_code.items()
+                ],
+                batch_size=BULK_BATCH_SIZE,
+                # 同じ日に取り込み直したときは、重複させずに計数を上書きする
+                update_conflicts=True,
+                # MySQL の ON DUPLICATE KEY UPDATE は一意キーを指定できない
+                unique_fields=(
+                    ["recorded_date", "symbol"]
+                    if connection.features.supports_update_conflicts_with_target
+                    else None
+                ),
+                update_fields=[
+                    "open_price",
+                    "high_price",
+                    "low_price",
+                    "closing_price",
+                    "volume",
+                    "marketcap",
+                    "per",
+                ],
+            )
+
+        # STEP4: 当月の業種別集計（レーダーチャート用）を当日分で作り直す
+        MarketRepository.save_industry_summary(transaction_date)
+        return len(rows_by_code)
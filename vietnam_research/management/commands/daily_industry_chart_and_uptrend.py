@@ -1,13 +1,18 @@
-﻿import logging
+﻿import hashlib
+import json
+import logging
 import os
-from glob import glob
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 import matplotlib
 import pandas as pd
-from PIL import Image
 from django.core.management.base import BaseCommand
-from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 from config.settings import MEDIA_ROOT
 from vietnam_research.domain.repository.vietkabu import IndustryRepository
@@ -35,6 +40,104 @@ def calc_price(price_for_several_days: pd.Series) -> dict:
     return {"initial": initial_price, "latest": latest_price, "delta": delta_pct}
 
 
+def group_closing_prices(industry_records: Iterable[dict]) -> dict[str, list]:
+    """
+    get_symbol_details の結果を1回走査し、銘柄ごとの終値リストにまとめる\n
+    レコードの並び順（recorded_date 昇順）はそのまま保たれる
+
+    Returns:
+        dict: {'AAA': [7.17, 7.14, ...], 'BBB': [...]}
+    """
+    closing_prices = defaultdict(list)
+    for record in industry_records:
+        closing_prices[record["symbol_code"]].append(record["closing_price"])
+    return closing_prices
+
+
+# 描画処理やサイズを変えたら上げる（既存チャートのダイジェストが一致しなくなり、描き直される）
+CHART_VERSION = 1
+# 出力サイズ w250, h200。従来の 640x480 相当のレイアウトを縮小したのと同じ見た目になるよう、
+# 図の大きさ（インチ）はそのままに DPI だけを下げて直接描画する
+CHART_FIGSIZE = (6.4, 5.12)
+CHART_DPI = 250 / 6.4
+CHART_MANIFEST = "charts.json"
+REGRESSION_DAYS = [14, 7, 3]
+SMA_PERIODS = [20, 40]
+
+
+@dataclass(frozen=True)
+class ChartJob:
+    """
+    1銘柄分のチャート描画の入力（プロセスプールへ渡すため、DBやpandasに依存しない値だけを持つ）
+    """
+
+    ticker: str
+    closing_prices: tuple[float, ...]
+    out_path: str
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps([CHART_VERSION, self.closing_prices])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_chart(job: ChartJob) -> str:
+    """
+    終値・移動平均線・回帰直線のチャートを最終サイズ（250x200）のPNGとして保存する\n
+    pyplot の状態を使わず Figure を直接作るので、別プロセスで並列に呼び出せる
+
+    Returns:
+        str: 描画した銘柄コード
+    """
+    industry_graph_vo = IndustryGraphVO(
+        job.ticker, pd.Series(job.closing_prices, name="closing_price", dtype=float)
+    )
+    figure = Figure(figsize=CHART_FIGSIZE, dpi=CHART_DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+
+    # closing_price を使って、赤色の点としてプロット
+    x_range, closing_price = industry_graph_vo.plot_values()
+    axes.plot(x_range, closing_price, "ro")
+
+    # 20日と40日の移動平均を計算・プロット
+    for sma, color, label in zip(
+        industry_graph_vo.plot_sma(SMA_PERIODS),
+        ["r-", "g-"],
+        ["20 Simple Moving Average", "40 Simple Moving Average"],
+    ):
+        axes.plot(x_range, sma, color, label=label)
+
+    axes.legend(loc="upper left")
+    reversed_labels = [str(i) for i in reversed(x_range)]
+    axes.set_xticks(ticks=list(x_range), labels=reversed_labels)
+    axes.set_ylabel("closing_price")
+    axes.grid()
+
+    # 回帰直線を緑の点線でプロットする
+    for day in REGRESSION_DAYS:
+        if len(closing_price) < day:
+            continue
+        _, regression_range, regression_values = (
+            industry_graph_vo.plot_regression_slope(day)
+        )
+        axes.plot(regression_range, regression_values, "g--")
+
+    out_path = Path(job.out_path)
+    try:
+        figure.savefig(out_path)
+    except Exception:
+        if out_path.exists():
+            out_path.unlink()
+        raise
+    return job.ticker
+
+
+def _init_render_worker():
+    matplotlib.use("Agg")
+    matplotlib.rcParams["font.family"] = "DejaVu Sans"
+
+
 def _format_number(value: object) -> str:
     if value == "-" or value is None:
         return "-"
@@ -55,12 +158,25 @@ def formatted_text(code: str, slopes: list, passed: int, price: dict) -> str:
 class Command(BaseCommand):
     help = "industry uptrend"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="チャート描画のプロセス数（1なら同一プロセスで描画）",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="入力が変わっていない銘柄のチャートも描き直す",
+        )
+
     def handle(self, *args, **options):
         """
         Industryテーブルから上昇トレンドの銘柄を抽出し、チャートを生成する
 
         処理内容:
-        1. 既存のPNGファイルとUptrendレコードを削除
+        1. Uptrendレコードを削除
         2. 各銘柄の終値データを取得
         3. 線形回帰による傾きを14日、7日、3日で計算
         4. 全期間で上昇傾向またはウォッチリスト銘柄のチャートを生成
@@ -70,20 +186,18 @@ class Command(BaseCommand):
         Notes:
         - matplotlib.use('Agg'): Anti-Grain Geometry バックエンドを使用
           GUI環境不要でPNGファイル生成に特化したレンダリングエンジン
-        - チャートサイズ: 640x480 → 250x200にリサイズ
+        - チャートサイズ: 250x200 を直接描画（リサイズはしない）
+        - チャートはプロセスプールで並列に描画する。入力（終値の並び）のダイジェストを
+          charts.json に残しておき、前回と同じ銘柄は描き直さない
+        - 今回チャート対象から外れた銘柄のPNGは削除する
 
         See Also: https://docs.djangoproject.com/en/4.2/howto/custom-management-commands/
         See Also: https://docs.djangoproject.com/en/4.2/topics/testing/tools/#topics-testing-management-commands
         """
 
-        matplotlib.use("Agg")  # GUIを使わないバックエンドを指定
-        plt.rcParams["font.family"] = "DejaVu Sans"
-        # フォルダ作成 - MEDIAディレクトリを掃除
+        _init_render_worker()  # GUIを使わないバックエンドを指定
         out_folder = Path(MEDIA_ROOT) / "vietnam_research" / "charts"
         out_folder.mkdir(parents=True, exist_ok=True)
-        for filepath in glob(str(out_folder / "*.png")):
-            print(f"Removing file: {filepath}")
-            os.remove(filepath)
         Uptrend.objects.all().delete()
 
         # sbi tickers are plotting by matplotlib
@@ -91,91 +205,65 @@ class Command(BaseCommand):
         tickers = IndustryRepository.get_industry_tickers(markets)
         industry_records = IndustryRepository.get_symbol_details(markets)
 
-        m_symbol = Symbol.objects.filter(market__in=markets).prefetch_related(
-            "market", "ind_class"
-        )
-        watchlist_symbols = Watchlist.objects.all().values_list(
-            "symbol__code", flat=True
+        closing_prices_by_ticker = group_closing_prices(industry_records)
+
+        symbols_by_code = {
+            symbol.code: symbol
+            for symbol in Symbol.objects.filter(market__in=markets).select_related(
+                "market", "ind_class"
+            )
+        }
+        watchlist_symbols = set(
+            Watchlist.objects.all().values_list("symbol__code", flat=True)
         )
 
-        days = [14, 7, 3]
         passed_records = []
+        chart_jobs = []
         print("\n🔍 Detecting uptrend stocks...")
         for ticker in tickers:
-            closing_price = [
-                x["closing_price"]
-                for x in industry_records
-                if x["symbol_code"] == ticker
-            ]
-            closing_price = pd.Series(closing_price, name="closing_price")
-            plt.clf()
-
-            # closing_price を使って、赤色の点としてプロット
+            closing_prices = tuple(
+                float(x) for x in closing_prices_by_ticker.get(ticker, [])
+            )
+            closing_price = pd.Series(closing_prices, name="closing_price", dtype=float)
             industry_graph_vo = IndustryGraphVO(ticker, closing_price)
-            x_range, closing_price = industry_graph_vo.plot_values()
-            plt.plot(x_range, closing_price, "ro")
-
-            # 20日と40日の移動平均を計算・プロット
-            for sma, color, label in zip(
-                industry_graph_vo.plot_sma([20, 40]),
-                ["r-", "g-"],
-                ["20 Simple Moving Average", "40 Simple Moving Average"],
-            ):
-                plt.plot(x_range, sma, color, label=label)
-
-            plt.legend(loc="upper left")
-            reversed_labels = [str(i) for i in reversed(x_range)]
-            plt.xticks(ticks=x_range, labels=reversed_labels)
-            plt.ylabel("closing_price")
-            plt.grid()
 
             slopes = []
             attempts = passed = 0
-            for attempts, day in enumerate(days, start=1):
+            for attempts, day in enumerate(REGRESSION_DAYS, start=1):
                 if len(closing_price) < day:
                     continue
-                slope, regression_range, regression_values = (
-                    industry_graph_vo.plot_regression_slope(day)
-                )
+                slope, _, _ = industry_graph_vo.plot_regression_slope(day)
                 slopes.append(slope)
 
-                # 傾きが正の場合は 'passed' を増やし、傾きのラインを緑の点線でプロットする
+                # 傾きが正の場合は 'passed' を増やす
                 if slope > 0:
                     passed += 1
-                plt.plot(regression_range, regression_values, "g--")
             if attempts == passed or ticker in watchlist_symbols:
                 # 処理した株価の傾斜（線形回帰による）がdaysすべてにおいて正（つまり上昇傾向）だった場合
-                recent_days_length = max(days)
-                closing_price = closing_price[-recent_days_length:].reset_index(
-                    drop=True
+                recent_days_length = max(REGRESSION_DAYS)
+                price = calc_price(
+                    closing_price[-recent_days_length:].reset_index(drop=True)
                 )
-                price = calc_price(closing_price)
-                try:
+                symbol = symbols_by_code.get(ticker)
+                if symbol is None:
+                    logging.critical(formatted_text(ticker, slopes, passed, price))
+                else:
                     passed_records.append(
                         Uptrend(
-                            symbol=m_symbol.get(code=ticker),
+                            symbol=symbol,
                             stocks_price_oldest=price["initial"],
                             stocks_price_latest=price["latest"],
                             stocks_price_delta=price["delta"],
                         )
                     )
-                except Symbol.DoesNotExist:
-                    logging.critical(formatted_text(ticker, slopes, passed, price))
 
-                # png save - MEDIAディレクトリに保存 w640, h480
-                out_path = Path(out_folder) / f"{ticker}.png"
-                try:
-                    plt.savefig(out_path)
-                    # resize png as w250, h200
-                    Image.open(out_path).resize((250, 200), Image.LANCZOS).save(
-                        out_path
+                chart_jobs.append(
+                    ChartJob(
+                        ticker=ticker,
+                        closing_prices=closing_prices,
+                        out_path=str(out_folder / f"{ticker}.png"),
                     )
-                except Exception as e:
-                    plt.close()
-                    if out_path.exists():
-                        out_path.unlink()
-                    self.stdout.write(self.style.ERROR(f"Failed to save {ticker}: {e}"))
-                    raise
+                )
 
                 # Log detailed info to a file only (for charts generated)
                 spaces = "  "
@@ -187,9 +275,74 @@ class Command(BaseCommand):
                 )
         Uptrend.objects.bulk_create(passed_records)
 
+        rendered, skipped = self._render_charts(
+            chart_jobs, tickers, out_folder, options["workers"], options["force"]
+        )
+
         caller_file_name = Path(__file__).stem
 
         # Console output: Summary
         print(f"\n✅ {caller_file_name} completed successfully.")
         print(f"   - Total tickers processed: {len(tickers)}")
         print(f"   - Charts generated: {len(passed_records)}")
+        print(f"   - Charts rendered: {rendered} (unchanged: {skipped})")
+
+    def _render_charts(
+        self,
+        chart_jobs: list[ChartJob],
+        tickers: list[str],
+        out_folder: Path,
+        workers: int,
+        force: bool,
+    ) -> tuple[int, int]:
+        """
+        入力が前回から変わった銘柄のチャートだけを描画し、対象外になった銘柄のPNGを削除する
+
+        Returns:
+            tuple[int, int]: (描画した数, 変更なしで飛ばした数)
+        """
+        manifest_path = out_folder / CHART_MANIFEST
+        manifest = {}
+        if manifest_path.exists() and not force:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+        charted = {job.ticker for job in chart_jobs}
+        for ticker in tickers:
+            out_path = out_folder / f"{ticker}.png"
+            if ticker not in charted and out_path.exists():
+                print(f"Removing file: {out_path}")
+                out_path.unlink()
+
+        pending = [
+            job
+            for job in chart_jobs
+            if manifest.get(job.ticker) != job.digest or not Path(job.out_path).exists()
+        ]
+        new_manifest = {
+            job.ticker: manifest[job.ticker]
+            for job in chart_jobs
+            if job.ticker in manifest
+        }
+        try:
+            if workers > 1 and len(pending) > 1:
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_render_worker
+                ) as executor:
+                    results = executor.map(render_chart, pending, chunksize=8)
+                    for job, _ in zip(pending, results):
+                        new_manifest[job.ticker] = job.digest
+            else:
+                for job in pending:
+                    render_chart(job)
+                    new_manifest[job.ticker] = job.digest
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Failed to render charts: {e}"))
+            raise
+        finally:
+            # 途中で失敗しても、描き終えた分は次回飛ばせるよう記録する
+            for job in pending:
+                if new_manifest.get(job.ticker) != job.digest:
+                    new_manifest.pop(job.ticker, None)
+            manifest_path.write_text(json.dumps(new_manifest), encoding="utf-8")
+
+        return len(pending), len(chart_jobs) - len(pending)
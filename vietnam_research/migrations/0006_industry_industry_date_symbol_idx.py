@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vietnam_research", "0005_delete_sbiusa"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="industry",
+            index=models.Index(
+                fields=["recorded_date", "symbol"], name="industry_date_symbol_idx"
+            ),
+        ),
+    ]
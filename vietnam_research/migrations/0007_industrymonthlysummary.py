@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vietnam_research", "0006_industry_industry_date_symbol_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndustryMonthlySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("recorded_date", models.DateField()),
+                ("ind_name", models.CharField(max_length=50)),
+                ("symbol_count", models.IntegerField()),
+                ("marketcap_sum", models.FloatField(null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("recorded_date", "ind_name"),
+                        name="recorded_date_ind_name_unique",
+                    )
+                ],
+            },
+        ),
+    ]
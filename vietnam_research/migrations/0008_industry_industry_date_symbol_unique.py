@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+def delete_duplicate_industries(apps, schema_editor):
+    """
+    同じ日・同じ銘柄の重複行（同じ日に取り込み直したもの）を、最後に登録した1行だけ残して削除する
+    """
+    Industry = apps.get_model("vietnam_research", "Industry")
+    duplicated_dates = (
+        Industry.objects.values("recorded_date", "symbol")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .values_list("recorded_date", flat=True)
+        .distinct()
+    )
+    for recorded_date in list(duplicated_dates):
+        seen_symbols = set()
+        duplicate_ids = []
+        for industry_id, symbol_id in (
+            Industry.objects.filter(recorded_date=recorded_date)
+            .order_by("symbol", "-id")
+            .values_list("id", "symbol")
+        ):
+            if symbol_id in seen_symbols:
+                duplicate_ids.append(industry_id)
+            seen_symbols.add(symbol_id)
+        Industry.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("vietnam_research", "0007_industrymonthlysummary"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_industries, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="industry",
+            name="industry_date_symbol_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="industry",
+            constraint=models.UniqueConstraint(
+                fields=("recorded_date", "symbol"), name="industry_date_symbol_unique"
+            ),
+        ),
+    ]
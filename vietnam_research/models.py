@@ -125,6 +125,14 @@ class Industry(models.Model):
 
     objects = IndustryQuerySet.as_manager()
 
+    class Meta:
+        constraints = [
+            # 1日1銘柄1行。月末日での絞り込みと、銘柄→業種への結合（業種別集計）にも使う
+            models.UniqueConstraint(
+                fields=["recorded_date", "symbol"], name="industry_date_symbol_unique"
+            )
+        ]
+
     def formatted_recorded_date(self, format_at="%Y-%m-%d") -> str:
         """
         指定した書式で recorded_date を返す
@@ -138,6 +146,33 @@ class Industry(models.Model):
         return self.recorded_date.strftime(format_at)
 
 
+class IndustryMonthlySummary(models.Model):
+    """
+    月末日（Industryにデータが存在する、その月の最終日）時点の業種別集計\n
+    レーダーチャート（業種別マクロ分析）は生のIndustryではなくこの集計から描く。
+    締まった月は一度作れば変わらず、当月は日次の取り込みのたびに作り直す。
+
+    recorded_date: 集計した計上日（slipped_month_end の recorded_date）\n
+    ind_name: 業種名（大分類|小分類）e.g. 2|製造業\n
+    symbol_count: 銘柄数\n
+    marketcap_sum: 時価総額の合計（億円）。全銘柄が null なら null
+    """
+
+    recorded_date = models.DateField()
+    ind_name = models.CharField(max_length=50)
+    symbol_count = models.IntegerField()
+    marketcap_sum = models.FloatField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recorded_date", "ind_name"],
+                name="recorded_date_ind_name_unique",
+            )
+        ]
+
+
 class VnIndexQuerySet(models.QuerySet):
     """VN-INDEXデータのQuerySet拡張"""
 
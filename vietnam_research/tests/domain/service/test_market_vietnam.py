@@ -1,6 +1,19 @@
+from datetime import date
+from unittest.mock import patch
+
+from dateutil.relativedelta import relativedelta
 from django.test import TestCase
 
+from vietnam_research.domain.repository.market import MarketRepository
 from vietnam_research.domain.service.market import VietnamMarketDataProvider
+from vietnam_research.models import (
+    IndClass,
+    Industry,
+    IndustryMonthlySummary,
+    Market,
+    Symbol,
+    Uptrend,
+)
 
 
 class TestMarketVietnam(TestCase):
@@ -18,3 +31,160 @@ class TestMarketVietnam(TestCase):
         self.assertEqual(
             1320000, VietnamMarketDataProvider.calculate_transaction_fee(50000000)
         )
+
+
+class TestMarketVietnamAggregation(TestCase):
+    """
+    レーダーチャートの業種別集計と上昇トレンドのグルーピングをテストする
+
+    先月末に3銘柄（製造業2、金融業1）、当月に1銘柄のIndustryを用意する。
+    """
+
+    def setUp(self):
+        MarketRepository._closed_month_cache.clear()
+        MarketRepository._uptrend_cache = None
+
+        market = Market.objects.create(code="HOSE", name="ホーチミン証券取引所")
+        manufacturing = IndClass.objects.create(
+            industry1="製造業", industry2="プラスチック製品", industry_class=2
+        )
+        finance = IndClass.objects.create(
+            industry1="金融業", industry2="証券業", industry_class=3
+        )
+        self.symbols = [
+            Symbol.objects.create(
+                code=code, name=code, ind_class=ind_class, market=market
+            )
+            for code, ind_class in [
+                ("AAA", manufacturing),
+                ("BBB", manufacturing),
+                ("CCC", finance),
+            ]
+        ]
+        last_month_end = date.today() + relativedelta(months=-1, day=31)
+        for symbol, marketcap in zip(self.symbols, [100.0, 200.0, None]):
+            Industry.objects.create(
+                recorded_date=last_month_end, symbol=symbol, marketcap=marketcap
+            )
+        Industry.objects.create(
+            recorded_date=date.today(), symbol=self.symbols[0], marketcap=50.0
+        )
+
+    def test_radar_chart_uses_monthly_summary(self):
+        """nullを除いた時価総額の合計を分母に、業種別の構成比が返る。"""
+        layers = VietnamMarketDataProvider().radar_chart(
+            rec_type="時価総額",
+            months_dating_back=[-1],
+            aggregate_field="marketcap_sum",
+            aggregate_alias="marketcap_sum",
+            denominator_field="marketcap_sum",
+        )
+        self.assertEqual(
+            {"2|製造業": 100.0, "3|金融業": None},
+            {axis.axis: axis.value for axis in layers[0].axes},
+        )
+
+        layers = VietnamMarketDataProvider().radar_chart(
+            rec_type="企業数",
+            months_dating_back=[-1],
+            aggregate_field="symbol_count",
+            aggregate_alias="count",
+            denominator_field="symbol_count",
+        )
+        self.assertEqual(
+            {"2|製造業": 66.67, "3|金融業": 33.33},
+            {axis.axis: axis.value for axis in layers[0].axes},
+        )
+
+    def test_closed_month_summary_is_persisted_and_cached(self):
+        """
+        初回に業種別集計を保存し、締まった月は2回目以降、月末日の特定だけで返る。
+        当月はプロセス内にはキャッシュせず、保存済みの集計を読む。
+        """
+        args = ("marketcap_sum", "marketcap_sum", "marketcap_sum")
+        expected = (
+            [
+                {"ind_name": "2|製造業", "marketcap_sum": 300.0},
+                {"ind_name": "3|金融業", "marketcap_sum": None},
+            ],
+            300.0,
+        )
+        self.assertEqual(expected, MarketRepository.industry_summary_for(-1, *args))
+        last_month_end = date.today() + relativedelta(months=-1, day=31)
+        self.assertEqual(
+            [("2|製造業", 2), ("3|金融業", 1)],
+            list(
+                IndustryMonthlySummary.objects.filter(recorded_date=last_month_end)
+                .order_by("ind_name")
+                .values_list("ind_name", "symbol_count")
+            ),
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(expected, MarketRepository.industry_summary_for(-1, *args))
+
+        MarketRepository.industry_summary_for(0, *args)
+        with self.assertNumQueries(2):
+            MarketRepository.industry_summary_for(0, *args)
+
+    def test_save_industry_summary_replaces_same_month(self):
+        """同じ月の集計は新しい計上日の分で入れ替わる（前日分は残らない）。"""
+        for recorded_date in [date(2024, 5, 30), date(2024, 5, 31)]:
+            Industry.objects.create(
+                recorded_date=recorded_date, symbol=self.symbols[0], marketcap=10.0
+            )
+            MarketRepository.save_industry_summary(recorded_date)
+        self.assertEqual(
+            [date(2024, 5, 31)],
+            list(
+                IndustryMonthlySummary.objects.filter(
+                    recorded_date__year=2024, recorded_date__month=5
+                ).values_list("recorded_date", flat=True)
+            ),
+        )
+
+    def test_save_industry_summary_overwrites_concurrent_rows(self):
+        """
+        シナリオ:
+        - 入力: 同時のリクエストが、削除の後に同じ計上日の集計を先に保存した状態。
+        - 処理: save_industry_summary で同じ計上日の集計を保存する。
+        - 期待値: 一意制約違反にならず、既存の行が集計結果で上書きされること。
+        """
+        # Given
+        last_month_end = date.today() + relativedelta(months=-1, day=31)
+        IndustryMonthlySummary.objects.create(
+            recorded_date=last_month_end,
+            ind_name="2|製造業",
+            symbol_count=0,
+            marketcap_sum=0,
+        )
+
+        # When
+        with patch("django.db.models.query.QuerySet.delete", return_value=(0, {})):
+            MarketRepository.save_industry_summary(last_month_end)
+
+        # Then
+        self.assertEqual(
+            [("2|製造業", 2, 300.0), ("3|金融業", 1, None)],
+            list(
+                IndustryMonthlySummary.objects.filter(recorded_date=last_month_end)
+                .order_by("ind_name")
+                .values_list("ind_name", "symbol_count", "marketcap_sum")
+            ),
+        )
+
+    def test_uptrend_grouped_by_industry(self):
+        """業種名ごとに上昇率の降順でまとまり、Uptrendが入れ替わるまで再取得しない。"""
+        for symbol, delta in zip(self.symbols, [5.0, 10.0, 1.0]):
+            Uptrend.objects.create(
+                symbol=symbol,
+                stocks_price_oldest=1,
+                stocks_price_latest=1,
+                stocks_price_delta=delta,
+            )
+        provider = VietnamMarketDataProvider()
+        result = provider.uptrend()
+        self.assertEqual(["2|製造業", "3|金融業"], list(result))
+        self.assertEqual(["BBB", "AAA"], [x["code"] for x in result["2|製造業"]])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(result, provider.uptrend())
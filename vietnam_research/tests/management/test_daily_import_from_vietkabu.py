@@ -1,6 +1,10 @@
-from datetime import datetime
+from datetime import date, datetime
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
 from bs4 import BeautifulSoup
+from django.core.management import call_command
 from django.test import TestCase
 
 from vietnam_research.domain.valueobject.vietkabu import (
@@ -12,7 +16,15 @@ from vietnam_research.domain.valueobject.vietkabu import (
 from vietnam_research.management.commands.daily_import_from_vietkabu import (
     TransactionDate,
 )
-from vietnam_research.models import Symbol, IndClass, Market
+from vietnam_research.models import (
+    Symbol,
+    IndClass,
+    Industry,
+    IndustryMonthlySummary,
+    Market,
+)
+
+FIXTURE_HTML_DIR = Path(__file__).resolve().parent / "fixtures" / "vietkabu"
 
 
 class TestCounting(TestCase):
@@ -183,3 +195,111 @@ class TestMarketDataRow(TestCase):
 
         with self.assertRaises(MarketDataHeaderError):
             MarketDataTableHeader.validate_from_soup(soup)
+
+
+class TestDailyImportFromVietkabuCommand(TestCase):
+    """
+    保存済みHTML（fixtures/vietkabu/hcm.html）を使ったコマンド全体のテスト
+
+    HTMLの内容:
+    - AAA: 既存シンボル（社名が変わっている）。同じ銘柄の行が2回出てくる
+    - APG: 新規シンボル
+    - ZZZ: 業種マスタに無い業種
+    """
+
+    def setUp(self):
+        self.market = Market.objects.create(
+            code="HOSE", name="ホーチミン証券取引所", url_file_name="hcm"
+        )
+        IndClass.objects.create(
+            industry1="製造業", industry2="プラスチック製品", industry_class=1
+        )
+        IndClass.objects.create(
+            industry1="金融業", industry2="証券業", industry_class=1
+        )
+        self.symbol = Symbol.objects.create(
+            code="AAA",
+            name="アンファット・バイオプラスチック",
+            ind_class=IndClass.objects.get(industry1="製造業"),
+            market=self.market,
+        )
+
+    def _call(self, *args):
+        with patch("urllib.request.urlopen") as urlopen, patch(
+            "sys.stdout", new_callable=StringIO
+        ) as stdout:
+            call_command(
+                "daily_import_from_vietkabu", "--html-dir", str(FIXTURE_HTML_DIR), *args
+            )
+        urlopen.assert_not_called()
+        return stdout.getvalue()
+
+    def test_import_from_saved_html(self):
+        """
+        シナリオ:
+        - 入力: 既存シンボルの社名変更・新規シンボル・未登録業種を含む保存済みHTML。
+        - 処理: コマンドを2回実行する。
+        - 期待値: 1回目でシンボルの追加・社名変更・計数と業種別集計がまとめて登録され、
+          当日データがある2回目は処理されないこと。
+        """
+        # Given / When
+        output = self._call()
+
+        # Then
+        self.assertIn("全4件中2件が処理されました", output)
+        self.assertTrue(Symbol.objects.filter(code="APG", market=self.market).exists())
+        self.symbol.refresh_from_db()
+        self.assertEqual("アンファット・バイオプラスチック（新社名）", self.symbol.name)
+
+        industries = Industry.objects.order_by("symbol__code")
+        self.assertEqual(["AAA", "APG"], [i.symbol.code for i in industries])
+        self.assertEqual(9.04, industries[0].closing_price)
+        self.assertEqual(date(2019, 8, 16), industries[0].recorded_date)
+
+        # レーダーチャート用の業種別集計も当日分で作られる
+        summaries = IndustryMonthlySummary.objects.all()
+        self.assertEqual({date(2019, 8, 16)}, {s.recorded_date for s in summaries})
+        self.assertEqual(2, sum(s.symbol_count for s in summaries))
+
+        # 当日データがあるので2回目は処理しない
+        self.assertIn("当日データがあったので処理対象外", self._call())
+        self.assertEqual(2, Industry.objects.count())
+
+    def test_reimport_same_day_updates_without_duplicates(self):
+        """
+        シナリオ:
+        - 入力: 取り込み済みの日の計数を書き換えた状態と、同じ保存済みHTML。
+        - 処理: 当日データの有無の確認をすり抜けて（並行実行など）もう一度取り込む。
+        - 期待値: 同じ日・同じ銘柄の行は増えずに計数が上書きされ、業種別集計も重複しないこと。
+        """
+        # Given
+        self._call()
+        Industry.objects.update(closing_price=0)
+
+        # When
+        with patch("django.db.models.query.QuerySet.exists", return_value=False):
+            self._call()
+
+        # Then
+        industries = Industry.objects.order_by("symbol__code")
+        self.assertEqual(["AAA", "APG"], [i.symbol.code for i in industries])
+        self.assertEqual(9.04, industries[0].closing_price)
+        self.assertEqual(
+            2, sum(s.symbol_count for s in IndustryMonthlySummary.objects.all())
+        )
+
+    def test_dry_run_does_not_write(self):
+        """
+        シナリオ:
+        - 入力: 保存済みHTMLと --dry-run オプション。
+        - 処理: コマンドを実行する。
+        - 期待値: 件数と処理時間だけが表示され、DBには書き込まれないこと。
+        """
+        # Given / When
+        output = self._call("--dry-run")
+
+        # Then
+        self.assertIn("[dry-run] HOSEの処理が完了しました", output)
+        self.assertIn("parse:", output)
+        self.assertFalse(Industry.objects.exists())
+        self.assertFalse(Symbol.objects.filter(code="APG").exists())
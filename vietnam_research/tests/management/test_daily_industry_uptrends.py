@@ -1,10 +1,17 @@
+import tempfile
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+from PIL import Image
 from django.test import TestCase
 
 from vietnam_research.management.commands.daily_industry_chart_and_uptrend import (
+    ChartJob,
+    Command,
     calc_price,
     formatted_text,
+    group_closing_prices,
 )
 
 
@@ -74,3 +81,53 @@ class Test(TestCase):
         price = {}
         expected = f"{code}｜slopes: [-0.12, 0.25, -0.10], passed: {passed}, initial: -, latest: -, delta: -"
         self.assertEqual(formatted_text(code, slopes, passed, price), expected)
+
+    def test_group_closing_prices(self):
+        """
+        シナリオ:
+        - 入力: 複数銘柄が混在した日付昇順のレコード。
+        - 処理: group_closing_prices を呼び出す。
+        - 期待値: 銘柄ごとの終値リストが元の並び順のまま返されること。
+        """
+        records = [
+            {"symbol_code": "AAA", "closing_price": 1.0},
+            {"symbol_code": "BBB", "closing_price": 10.0},
+            {"symbol_code": "AAA", "closing_price": 2.0},
+            {"symbol_code": "BBB", "closing_price": 11.0},
+            {"symbol_code": "AAA", "closing_price": 3.0},
+        ]
+        actual = group_closing_prices(records)
+        self.assertEqual({"AAA": [1.0, 2.0, 3.0], "BBB": [10.0, 11.0]}, dict(actual))
+        self.assertEqual([], actual.get("CCC", []))
+
+    def test_render_charts_skips_unchanged_input(self):
+        """
+        シナリオ:
+        - 入力: 2銘柄分のチャート描画ジョブ。
+        - 処理: _render_charts を2回呼び出し、2回目の前に1銘柄だけ終値を変える。
+        - 期待値: 250x200 のPNGが直接出力され、2回目は入力が変わった銘柄だけ描き直されること。
+          チャート対象から外れた銘柄のPNGは削除されること。
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out_folder = Path(tmpdir)
+            prices = tuple(float(10 + i % 5) for i in range(30))
+            jobs = [
+                ChartJob(ticker, prices, str(out_folder / f"{ticker}.png"))
+                for ticker in ["AAA", "BBB"]
+            ]
+            (out_folder / "CCC.png").write_bytes(b"")
+            command = Command()
+
+            rendered, skipped = command._render_charts(
+                jobs, ["AAA", "BBB", "CCC"], out_folder, workers=1, force=False
+            )
+            self.assertEqual((2, 0), (rendered, skipped))
+            with Image.open(out_folder / "AAA.png") as image:
+                self.assertEqual((250, 200), image.size)
+            self.assertFalse((out_folder / "CCC.png").exists())
+
+            jobs[1] = ChartJob("BBB", prices + (20.0,), jobs[1].out_path)
+            rendered, skipped = command._render_charts(
+                jobs, ["AAA", "BBB"], out_folder, workers=1, force=False
+            )
+            self.assertEqual((1, 1), (rendered, skipped))